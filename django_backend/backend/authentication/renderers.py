@@ -1,8 +1,69 @@
 from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from asgiref.sync import sync_to_async
 from collections import defaultdict
+from itertools import islice
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements, stdlib json is the fallback
+    orjson = None
+
+
+ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+# orjson handles dicts, lists, UUIDs and numbers natively. Datetimes are passed
+# through to DRF's encoder so the output matches JSONRenderer byte-for-byte
+# (millisecond precision, 'Z' suffix), as do Decimals, lazy strings and querysets.
+_drf_default = JSONEncoder().default
+
+
+def dumps(data):
+    """Encode `data` to compact JSON bytes exactly as DRF's JSONRenderer would."""
+    ret = orjson.dumps(data, default=_drf_default, option=ORJSON_OPTIONS)
+    # Keep the output a strict JavaScript subset, like JSONRenderer
+    if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+        ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return ret
+
+
+def stream_envelope(rows, message="Request successful", status_code=200):
+    """
+    Yield a success envelope whose `data` is a JSON array built from `rows`,
+    one encoded row at a time, so large lists never sit in memory as one payload.
+    """
+    yield b'{"message":' + dumps(message) + b',"errors":null,"data":['
+    first = True
+    for row in rows:
+        yield (b'' if first else b',') + dumps(row)
+        first = False
+    yield b'],"status":"success","status_code":' + str(status_code).encode() + b'}'
+
+
+async def astream_envelope(rows, message="Request successful", status_code=200, chunk_rows=500):
+    """
+    stream_envelope() as an async iterator, for ASGI, which reads a sync
+    iterator to the end before sending any of it. `rows` (typically a database
+    iterator) are read and encoded `chunk_rows` at a time in the sync thread.
+    """
+    parts = stream_envelope(rows, message, status_code)
+    read = sync_to_async(lambda: b''.join(islice(parts, chunk_rows)))
+    while chunk := await read():
+        yield chunk
 
 
 class CustomJSONRenderer(JSONRenderer):
+    use_orjson = orjson is not None
+
+    def encode(self, data, accepted_media_type=None, renderer_context=None):
+        """Fast path through orjson; indented output and anything orjson rejects use JSONRenderer."""
+        if self.use_orjson and data is not None and self.get_indent(accepted_media_type, renderer_context or {}) is None:
+            try:
+                return dumps(data)
+            except (TypeError, orjson.JSONEncodeError):
+                pass
+        return super().render(data, accepted_media_type, renderer_context)
+
     def flatten_errors(self, errors):
         if isinstance(errors, list):
             flattened = []
@@ -70,7 +131,7 @@ class CustomJSONRenderer(JSONRenderer):
                 "status": "error",
                 "status_code": status_code
             }
-            return super().render(error_data, accepted_media_type, renderer_context)
+            return self.encode(error_data, accepted_media_type, renderer_context)
 
         success_data = {
             "message": message or "Request successful",
@@ -80,4 +141,4 @@ class CustomJSONRenderer(JSONRenderer):
             "status_code": status_code
         }
 
-        return super().render(success_data, accepted_media_type, renderer_context)
+        return self.encode(success_data, accepted_media_type, renderer_context)
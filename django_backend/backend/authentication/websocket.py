@@ -0,0 +1,48 @@
+"""
+JWT authentication for WebSocket connections.
+
+Browsers cannot set an Authorization header on a WebSocket handshake, so the
+access token is offered as a subprotocol after `bearer`:
+
+    new WebSocket(url, ['bearer', accessToken])
+
+It travels in the Sec-WebSocket-Protocol header, which, unlike the URL, isn't
+written to server, proxy or access logs. Consumers accept the connection with
+the `bearer` subprotocol (browsers close it otherwise).
+"""
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+SUBPROTOCOL = 'bearer'
+
+
+@database_sync_to_async
+def get_user_for_token(raw_token):
+    authentication = JWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, TokenError):
+        return AnonymousUser()
+
+
+def token_from_subprotocols(subprotocols):
+    """The token offered right after `bearer`, or None."""
+    if SUBPROTOCOL in subprotocols:
+        index = subprotocols.index(SUBPROTOCOL)
+        if index + 1 < len(subprotocols):
+            return subprotocols[index + 1]
+    return None
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    async def __call__(self, scope, receive, send):
+        subprotocols = list(scope.get('subprotocols') or [])
+        token = token_from_subprotocols(subprotocols)
+        # The consumer only needs to know the client speaks `bearer`
+        scope['subprotocols'] = [protocol for protocol in subprotocols if protocol != token]
+        scope['user'] = await get_user_for_token(token) if token else AnonymousUser()
+        return await super().__call__(scope, receive, send)
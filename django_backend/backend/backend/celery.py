@@ -13,6 +13,10 @@ app.conf.broker_url = settings.CELERY_BROKER_URL
 
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 
+# Register task duration/retry metrics for worker processes
+from . import metrics  # noqa: E402,F401
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
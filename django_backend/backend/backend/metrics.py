@@ -0,0 +1,111 @@
+"""
+Prometheus metrics for the Django API and Celery workers.
+
+Django and Celery run in separate processes. With PROMETHEUS_MULTIPROC_DIR
+set (settings.py sets it up by default), every process writes its samples to
+that directory and the /metrics/ endpoint aggregates them, so a single local
+scrape covers both.
+
+The endpoint only answers scrapes from METRICS_ALLOWED_IPS, or carrying the
+service secret in X-Service-Secret.
+"""
+import hmac
+import os
+import time
+
+from celery import signals as celery_signals
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+TASK_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 200, 300)
+
+REQUEST_LATENCY = Histogram(
+    'django_http_request_duration_seconds',
+    'Request latency by view',
+    ['view', 'method', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    'django_http_request_db_queries',
+    'Number of database queries executed per request',
+    ['view', 'method'],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    'django_http_request_db_duration_seconds',
+    'Total time spent in database queries per request',
+    ['view', 'method'],
+    buckets=LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'django_http_response_size_bytes',
+    'Response body size by view',
+    ['view', 'method'],
+    buckets=SIZE_BUCKETS,
+)
+
+TASK_DURATION = Histogram(
+    'celery_task_duration_seconds',
+    'Celery task run time',
+    ['task', 'state'],
+    buckets=TASK_BUCKETS,
+)
+TASK_RETRIES = Counter(
+    'celery_task_retries_total',
+    'Celery task retries',
+    ['task'],
+)
+
+
+def scrape_allowed(request):
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    secret = request.headers.get('X-Service-Secret', '')
+    return bool(secret) and hmac.compare_digest(secret, settings.DJANGO_SERVICE_SECRET)
+
+
+def metrics_view(request):
+    """Expose collected metrics in the Prometheus text format."""
+    if not scrape_allowed(request):
+        return HttpResponseForbidden()
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+_task_started = {}
+
+
+@celery_signals.task_prerun.connect
+def _on_task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@celery_signals.task_postrun.connect
+def _on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    TASK_DURATION.labels(task=task.name, state=state or 'UNKNOWN').observe(time.perf_counter() - started)
+
+
+@celery_signals.task_retry.connect
+def _on_task_retry(sender=None, **kwargs):
+    if sender is not None:
+        TASK_RETRIES.labels(task=sender.name).inc()
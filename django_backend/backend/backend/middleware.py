@@ -0,0 +1,62 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .metrics import REQUEST_DB_DURATION, REQUEST_DB_QUERIES, REQUEST_LATENCY, RESPONSE_SIZE
+
+
+class QueryCounter:
+    """Database execute wrapper that counts queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class RequestMetricsMiddleware:
+    """
+    Record per-view latency, database query count/time and response size.
+
+    Views are labelled by URL name (e.g. 'bgv-request-detail') so the label set
+    stays bounded regardless of the ids in the path.
+
+    Streaming responses are measured up to the point the view returns: queries
+    run while their content is sent (the rows of a streamed BGV list) are not
+    counted, and their size isn't recorded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == '/metrics/':
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.url_name or match.view_name) if match else 'unresolved'
+        method = request.method
+
+        REQUEST_LATENCY.labels(view=view, method=method, status=str(response.status_code)).observe(elapsed)
+        REQUEST_DB_QUERIES.labels(view=view, method=method).observe(counter.count)
+        REQUEST_DB_DURATION.labels(view=view, method=method).observe(counter.duration)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(view=view, method=method).observe(len(response.content))
+
+        return response
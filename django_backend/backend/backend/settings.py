@@ -10,8 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -33,6 +34,7 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -45,6 +47,7 @@ INSTALLED_APPS = [
     'corsheaders',
     'django_celery_results',
     'django_celery_beat',
+    'channels',
 
     'authentication',
     'backgroundverification',
@@ -59,6 +62,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'backend.middleware.RequestMetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -79,6 +83,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
 
 
 # Database
@@ -199,12 +204,60 @@ SIMPLE_JWT = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Document storage: local MEDIA_ROOT by default. With USE_S3_STORAGE, files live in an
+# S3-compatible bucket (AWS, MinIO), candidates upload straight to it with presigned
+# POSTs and API responses carry presigned, time-limited download URLs.
+USE_S3_STORAGE = config('USE_S3_STORAGE', default=False, cast=bool)
+DOCUMENT_MAX_UPLOAD_SIZE = config('DOCUMENT_MAX_UPLOAD_SIZE', default=10 * 1024 * 1024, cast=int)
+DOCUMENT_UPLOAD_URL_EXPIRY = config('DOCUMENT_UPLOAD_URL_EXPIRY', default=600, cast=int)
+DOCUMENT_URL_EXPIRY = config('DOCUMENT_URL_EXPIRY', default=900, cast=int)
+
+# Resumable uploads: part files are assembled here (shared by all web workers) until finalized
+DOCUMENT_UPLOAD_TEMP_DIR = config('DOCUMENT_UPLOAD_TEMP_DIR', default=str(BASE_DIR / 'tmp' / 'uploads'))
+DOCUMENT_UPLOAD_CHUNK_SIZE = config('DOCUMENT_UPLOAD_CHUNK_SIZE', default=5 * 1024 * 1024, cast=int)
+DOCUMENT_UPLOAD_SESSION_TTL_HOURS = config('DOCUMENT_UPLOAD_SESSION_TTL_HOURS', default=24, cast=int)
+
+# How long a document submission's Idempotency-Key is remembered
+IDEMPOTENCY_RECEIPT_TTL_HOURS = config('IDEMPOTENCY_RECEIPT_TTL_HOURS', default=24, cast=int)
+
+# Post-processing of submitted documents (backgroundverification.documents)
+DOCUMENT_IMAGE_MAX_DIMENSION = config('DOCUMENT_IMAGE_MAX_DIMENSION', default=2000, cast=int)
+DOCUMENT_IMAGE_QUALITY = config('DOCUMENT_IMAGE_QUALITY', default=85, cast=int)
+DOCUMENT_THUMBNAIL_SIZE = config('DOCUMENT_THUMBNAIL_SIZE', default=320, cast=int)
+
+if USE_S3_STORAGE:
+    STORAGES = {
+        'default': {'BACKEND': 'storages.backends.s3.S3Storage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    }
+    AWS_STORAGE_BUCKET_NAME = config('AWS_STORAGE_BUCKET_NAME')
+    AWS_S3_ENDPOINT_URL = config('AWS_S3_ENDPOINT_URL', default=None)
+    AWS_S3_REGION_NAME = config('AWS_S3_REGION_NAME', default='us-east-1')
+    AWS_S3_ACCESS_KEY_ID = config('AWS_S3_ACCESS_KEY_ID', default=None)
+    AWS_S3_SECRET_ACCESS_KEY = config('AWS_S3_SECRET_ACCESS_KEY', default=None)
+    AWS_S3_SIGNATURE_VERSION = 's3v4'
+    AWS_DEFAULT_ACL = None
+    AWS_S3_FILE_OVERWRITE = False
+    AWS_QUERYSTRING_AUTH = True
+    AWS_QUERYSTRING_EXPIRE = DOCUMENT_URL_EXPIRY
+
 RESUME_PARSER_URL = config('RESUME_PARSER_URL', default='http://localhost:8001/parse-resume')
 FASTAPI_AGENT_URL = config('FASTAPI_AGENT_URL', default='http://localhost:8002')
 
 # Service-to-service authentication
 DJANGO_SERVICE_SECRET = config('DJANGO_SERVICE_SECRET', default='shared_secret_key_bgv_2024')
 
+# Prometheus metrics (backend.metrics). Web and Celery worker processes write their samples to
+# PROMETHEUS_MULTIPROC_DIR, which /metrics/ aggregates; set it to '' for per-process metrics.
+# Empty the directory when restarting the services, it keeps a file per process.
+PROMETHEUS_MULTIPROC_DIR = config('PROMETHEUS_MULTIPROC_DIR', default=str(BASE_DIR / 'tmp' / 'prometheus'))
+if PROMETHEUS_MULTIPROC_DIR:
+    # Read by prometheus_client when it is first imported, after the settings
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = PROMETHEUS_MULTIPROC_DIR
+# Client addresses (REMOTE_ADDR) allowed to scrape /metrics/; others must send X-Service-Secret
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1', cast=Csv())
+
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://127.0.0.1:6379/0')
 CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
@@ -215,6 +268,31 @@ CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_BROKER_CONNECTION_MAX_RETRIES = 100
 CELERY_BROKER_CONNECTION_TIMEOUT = 10
 
+# Transactional outbox relay (backgroundverification.outbox)
+OUTBOX_RELAY_INTERVAL = config('OUTBOX_RELAY_INTERVAL', default=30, cast=int)
+OUTBOX_RELAY_BATCH_SIZE = config('OUTBOX_RELAY_BATCH_SIZE', default=50, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+OUTBOX_RETRY_BASE_DELAY = config('OUTBOX_RETRY_BASE_DELAY', default=30, cast=int)
+# Seconds a relay worker has to deliver a claimed event before another worker may claim it again
+OUTBOX_LEASE_SECONDS = config('OUTBOX_LEASE_SECONDS', default=300, cast=int)
+# An event handed to an agent job counts as a failed attempt if the job's callback hasn't arrived by then
+OUTBOX_CALLBACK_TIMEOUT = config('OUTBOX_CALLBACK_TIMEOUT', default=900, cast=int)
+
+CELERY_BEAT_SCHEDULE = {
+    'relay-outbox': {
+        'task': 'backgroundverification.tasks.relay_outbox',
+        'schedule': OUTBOX_RELAY_INTERVAL,
+    },
+    'expire-document-upload-sessions': {
+        'task': 'backgroundverification.tasks.expire_document_upload_sessions',
+        'schedule': 60 * 60,
+    },
+    'expire-idempotency-receipts': {
+        'task': 'backgroundverification.tasks.expire_idempotency_receipts',
+        'schedule': 60 * 60,
+    },
+}
+
 ADMIN_EMAIL = config('ADMIN_EMAIL', default='abheysharmanika@gmail.com')
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
 DEFAULT_FROM_EMAIL = 'RemoteEngine <noreply@remoteengine.co>'
@@ -225,6 +303,22 @@ AWS_SES_ACCESS_KEY_ID = config('AWS_SES_ACCESS_KEY_ID')
 AWS_SES_SECRET_ACCESS_KEY = config('AWS_SES_SECRET_ACCESS_KEY')
 AWS_SES_REGION_NAME = 'us-east-1'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('CACHE_URL', default='redis://127.0.0.1:6379/1'),
+    }
+}
+
+# Seconds a serialized BGV list/detail payload stays in the cache
+BGV_CACHE_TIMEOUT = config('BGV_CACHE_TIMEOUT', default=300, cast=int)
+if USE_S3_STORAGE:
+    # Cached detail payloads carry presigned URLs, keep them well inside their expiry
+    BGV_CACHE_TIMEOUT = min(BGV_CACHE_TIMEOUT, DOCUMENT_URL_EXPIRY // 3)
+
+# BGV lists longer than this are streamed row by row and not cached
+BGV_STREAM_LIST_THRESHOLD = config('BGV_STREAM_LIST_THRESHOLD', default=500, cast=int)
+
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
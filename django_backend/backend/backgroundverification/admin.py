@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import BGVRequest, WorkExperience, Education, Skill, Project, Document, AgentLog
+from .models import (
+    BGVRequest, WorkExperience, Education, Skill, Project, Document, AgentLog, CanonicalSkill, SkillAlias, ProfileSnapshot
+)
+from .search import search_ids
 
 
 class WorkExperienceInline(admin.TabularInline):
@@ -38,34 +41,64 @@ class BGVRequestAdmin(admin.ModelAdmin):
     list_display = ['first_name', 'last_name', 'email', 'role', 'status', 'recruiter', 'user', 'created_at']
     list_filter = ['status', 'created_at']
     search_fields = ['first_name', 'last_name', 'email', 'phone_number']
-    readonly_fields = ['created_at', 'updated_at']
-    inlines = [WorkExperienceInline, EducationInline, SkillInline, ProjectInline, DocumentInline, AgentLogInline]
+    readonly_fields = ['created_at', 'updated_at', 'resume_hash']
+    raw_id_fields = ['profile']
+    inlines = [DocumentInline, AgentLogInline]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the candidate search index (search.py) instead of icontains scans over every row
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(pk__in=search_ids(search_term)), False
+
+
+@admin.register(ProfileSnapshot)
+class ProfileSnapshotAdmin(admin.ModelAdmin):
+    # Snapshots are shared by every request with the same profile; edits here apply to all of them
+    list_display = ['digest', 'created_at']
+    search_fields = ['digest']
+    readonly_fields = ['digest', 'created_at']
+    inlines = [WorkExperienceInline, EducationInline, SkillInline, ProjectInline]
 
 
 @admin.register(WorkExperience)
 class WorkExperienceAdmin(admin.ModelAdmin):
-    list_display = ['bgv_request', 'role', 'company_name', 'start_date', 'end_date']
+    list_display = ['profile', 'role', 'company_name', 'start_date', 'end_date']
     list_filter = ['start_date']
     search_fields = ['role', 'company_name']
 
 
 @admin.register(Education)
 class EducationAdmin(admin.ModelAdmin):
-    list_display = ['bgv_request', 'degree', 'field_of_study', 'institute', 'end_date']
+    list_display = ['profile', 'degree', 'field_of_study', 'institute', 'end_date']
     list_filter = ['degree']
     search_fields = ['degree', 'institute']
 
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
-    list_display = ['bgv_request', 'skill_name', 'years_of_experience', 'competency']
-    list_filter = ['competency']
+    list_display = ['profile', 'skill_name', 'canonical', 'years_of_experience', 'competency']
+    list_filter = ['canonical', 'competency']
+    list_select_related = ['profile', 'canonical']
     search_fields = ['skill_name']
+    raw_id_fields = ['profile', 'canonical']
+
+
+class SkillAliasInline(admin.TabularInline):
+    model = SkillAlias
+    extra = 0
+
+
+@admin.register(CanonicalSkill)
+class CanonicalSkillAdmin(admin.ModelAdmin):
+    list_display = ['name']
+    search_fields = ['name', 'aliases__key']
+    inlines = [SkillAliasInline]
 
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
-    list_display = ['bgv_request', 'name', 'role_name']
+    list_display = ['profile', 'name', 'role_name']
     search_fields = ['name']
 
 
@@ -0,0 +1,386 @@
+"""
+Benchmark harness for the BGV pipeline.
+
+Runs each scenario in-process against a throwaway test database, with local
+stand-ins for the resume parser and the FastAPI agent service, and reports
+throughput, latency percentiles and DB queries per operation.
+"""
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections, transaction
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.models import CustomUser
+from authentication.renderers import CustomJSONRenderer
+from backend.middleware import QueryCounter
+from .models import BGVRequest, WorkExperience, Education, Skill, Project, AgentLog, ProfileSnapshot
+from .projections import list_rows, detail_payload
+from .serializers import DETAIL_PREFETCH, BGVRequestListSerializer, BGVRequestDetailSerializer
+from . import search, stats
+
+
+SKILL_NAMES = ['Python', 'Django', 'React', 'AWS', 'PostgreSQL', 'Docker', 'Kubernetes', 'TypeScript']
+
+
+def fake_parsed_resume(index):
+    """Parser response in the same shape as the resume parser service."""
+    return {
+        'status': 'success',
+        'data': {
+            'firstName': 'Bench',
+            'lastName': f'Candidate{index}',
+            'email': f'bench.candidate{index}@example.com',
+            'phoneNumber': '9999999999',
+            'dateOfBirth': '1994-05-17',
+            'about': 'Backend engineer working on distributed systems.',
+            'maritalStatus': 'Single',
+            'hobbies': 'Chess',
+            'countryOfCitizenship': 'India',
+            'countryOfResidence': 'India',
+            'role': 'Senior Software Engineer',
+            'totalWorkExperience': 6,
+            'totalWorkExperienceInMonths': 72,
+            'professionalBackground': [
+                {
+                    'role': 'Software Engineer',
+                    'companyName': f'Company {n}',
+                    'startDate': f'201{n}-01-01',
+                    'endDate': f'201{n + 2}-01-01',
+                    'description': 'Built and operated services.',
+                }
+                for n in range(3)
+            ],
+            'educationalBackground': [
+                {
+                    'degree': 'B.Tech',
+                    'fieldOfStudy': 'Computer Science',
+                    'institute': 'IIT Delhi',
+                    'startDate': '2008-07-01',
+                    'endDate': '2012-05-01',
+                    'gpa': '8.4',
+                }
+            ],
+            'skills': [
+                {'skillName': name, 'yearsOfExperience': 3, 'competency': 'Advanced'}
+                for name in SKILL_NAMES
+            ],
+            'projects': [
+                {
+                    'name': f'Project {n}',
+                    'description': 'Internal platform work.',
+                    'link': 'https://example.com',
+                    'role': {'name': 'Lead'},
+                    'skills': {'skillNames': SKILL_NAMES[:3]},
+                }
+                for n in range(2)
+            ],
+        },
+    }
+
+
+class FakeAgentResponse:
+    """Stand-in for the FastAPI agent's HTTP response."""
+
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._payload
+
+
+def fake_agent_post(url, json=None, **kwargs):
+    """Workflow endpoints accept a job (202); the rest answer synchronously."""
+    json = json or {}
+    if url.endswith(('/agent/send-credentials', '/agent/send-reminder')):
+        return FakeAgentResponse({
+            'job_id': f"bench-{json.get('bgv_request_id')}",
+            'kind': url.rsplit('/', 1)[-1],
+            'status': 'queued',
+            'bgv_request_id': json.get('bgv_request_id'),
+            'callback_ref': json.get('callback_ref'),
+        }, status_code=202)
+    return FakeAgentResponse({
+        'status': 'success',
+        'bgv_request_id': json.get('bgv_request_id'),
+        'agent_output': 'scripted',
+    })
+
+
+def percentile(samples, pct):
+    """Linear-interpolated percentile of a sorted list."""
+    if not samples:
+        return 0.0
+    rank = (len(samples) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(samples) - 1)
+    return samples[low] + (samples[high] - samples[low]) * (rank - low)
+
+
+def measure(operation, iterations, warmup=3):
+    """Run `operation(i)` and return throughput, latency percentiles (ms) and queries per op."""
+    for i in range(warmup):
+        operation(-(i + 1))
+
+    timings = []
+    queries = 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            op_started = time.perf_counter()
+            operation(i)
+            timings.append(time.perf_counter() - op_started)
+        queries += counter.count
+    total = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'throughput_per_sec': round(iterations / total, 2) if total else 0.0,
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'max_ms': round(timings[-1] * 1000, 3),
+        'queries_per_op': round(queries / iterations, 2),
+    }
+
+
+class BenchmarkSuite:
+    """Seeds a dataset and exposes one callable per scenario."""
+
+    def __init__(self, seed_requests=200):
+        self.seed_requests = seed_requests
+        self.recruiter = CustomUser.objects.create_user(
+            'bench.recruiter@example.com', 'bench-password', role=CustomUser.Role.RECRUITER
+        )
+        self.candidate = CustomUser.objects.create_user(
+            'bench.candidate@example.com', 'bench-password', role=CustomUser.Role.CANDIDATE
+        )
+        self.recruiter_client = self._client_for(self.recruiter)
+        self.candidate_client = self._client_for(self.candidate)
+        self.service_client = Client(HTTP_X_SERVICE_SECRET=settings.DJANGO_SERVICE_SECRET)
+        self.requests = self._seed()
+
+    def _client_for(self, user):
+        return Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    def _seed(self):
+        data = fake_parsed_resume(0)['data']
+        # One snapshot per request, like candidates with distinct resumes
+        snapshots = ProfileSnapshot.objects.bulk_create([
+            ProfileSnapshot(digest=f'seed-{n}') for n in range(self.seed_requests)
+        ])
+        bgv_requests = BGVRequest.objects.bulk_create([
+            BGVRequest(
+                user=self.candidate,
+                recruiter=self.recruiter,
+                profile=snapshot,
+                first_name=data['firstName'],
+                last_name=f'Seed{n}',
+                email=self.candidate.email,
+                role=data['role'],
+                total_work_experience=data['totalWorkExperience'],
+                status=BGVRequest.Status.DOCUMENTS_REQUESTED,
+            )
+            for n, snapshot in enumerate(snapshots)
+        ])
+        WorkExperience.objects.bulk_create([
+            WorkExperience(profile=snapshot, role='Engineer', company_name=f'Company {n}')
+            for snapshot in snapshots for n in range(3)
+        ])
+        Education.objects.bulk_create([
+            Education(profile=snapshot, degree='B.Tech', institute='IIT Delhi') for snapshot in snapshots
+        ])
+        Skill.objects.bulk_create([
+            Skill(profile=snapshot, skill_name=name, years_of_experience=3)
+            for snapshot in snapshots for name in SKILL_NAMES
+        ])
+        Project.objects.bulk_create([
+            Project(profile=snapshot, name=f'Project {n}', skill_names=SKILL_NAMES[:3])
+            for snapshot in snapshots for n in range(2)
+        ])
+        AgentLog.objects.bulk_create([
+            AgentLog(bgv_request=bgv, action=AgentLog.Action.REQUEST_SENT, message='Documents requested')
+            for bgv in bgv_requests
+        ])
+        BGVRequest.objects.update(
+            created_at=timezone.now() - timedelta(days=5), status_changed_at=timezone.now() - timedelta(days=5)
+        )
+        # bulk_create skips the signals that keep the dashboard summaries and search index current
+        stats.rebuild()
+        search.rebuild()
+        return list(BGVRequest.objects.order_by('id'))
+
+    def _render_rows(self, count=1000):
+        # Serialized list rows (datetimes, nested users) cycled up to `count`
+        if not hasattr(self, '_rows'):
+            queryset = BGVRequest.objects.select_related('user', 'recruiter').order_by('id')
+            rows = list(BGVRequestListSerializer(queryset, many=True).data)
+            self._rows = [rows[n % len(rows)] for n in range(count)]
+        return self._rows
+
+    def _render(self, use_orjson):
+        renderer = CustomJSONRenderer()
+        renderer.use_orjson = use_orjson
+        response = mock.Mock(status_code=200)
+        content = renderer.render(self._render_rows(), 'application/json', {'response': response})
+        assert content.startswith(b'{"message":'), content[:100]
+
+    def render_list_stdlib(self, i):
+        self._render(use_orjson=False)
+
+    def render_list_orjson(self, i):
+        self._render(use_orjson=True)
+
+    def serialize_list_drf(self, i):
+        queryset = BGVRequest.objects.filter(recruiter=self.recruiter).select_related('user', 'recruiter')
+        assert len(BGVRequestListSerializer(queryset, many=True).data) >= self.seed_requests
+
+    def serialize_list_values(self, i):
+        assert len(list(list_rows(BGVRequest.objects.filter(recruiter=self.recruiter)))) >= self.seed_requests
+
+    def serialize_detail_drf(self, i):
+        bgv_request = (
+            BGVRequest.objects.select_related('user', 'recruiter').prefetch_related(*DETAIL_PREFETCH)
+            .get(pk=self._pick(i).id)
+        )
+        assert BGVRequestDetailSerializer(bgv_request).data['id'] == bgv_request.id
+
+    def serialize_detail_values(self, i):
+        pk = self._pick(i).id
+        assert detail_payload(BGVRequest.objects.all(), pk)['id'] == pk
+
+    def _pick(self, i):
+        return self.requests[i % len(self.requests)]
+
+    def upload_resume(self, i, content=None):
+        # A new file each time; the parsed profile (experience, skills, ...) is the same for all
+        content = content or b'%%PDF-1.4 bench %d' % i
+        resume = SimpleUploadedFile('resume.pdf', content, content_type='application/pdf')
+        with mock.patch('backgroundverification.views.parse_resume_file', return_value=fake_parsed_resume(i + 1000)), \
+                mock.patch('backgroundverification.tasks.relay_outbox.delay'):
+            response = self.recruiter_client.post('/api/bgv/upload/', {'file': resume})
+        assert response.status_code == 201, response.content
+
+    def reupload_resume(self, i):
+        # The same file every time: parsed once, then reused
+        self.upload_resume(i, content=b'%PDF-1.4 bench repeated')
+
+    def list_requests(self, i):
+        response = self.recruiter_client.get('/api/bgv/')
+        assert response.status_code == 200, response.content
+
+    def dashboard_stats(self, i):
+        response = self.recruiter_client.get('/api/bgv/stats/')
+        assert response.status_code == 200 and response.json()['data']['total'] >= self.seed_requests, response.content
+
+    def search_requests(self, i):
+        # A rare term (one candidate) and a common one (every candidate), alternately
+        query = self._pick(i).last_name if i % 2 else 'python aws'
+        response = self.recruiter_client.get('/api/bgv/search/', {'q': query, 'limit': 20})
+        assert response.status_code == 200 and response.json()['data'], response.content
+
+    def skill_search(self, i):
+        response = self.recruiter_client.get('/api/bgv/search/', {'skills': 'python,aws', 'limit': 20})
+        assert response.status_code == 200 and response.json()['data'], response.content
+
+    def detail_request(self, i):
+        response = self.recruiter_client.get(f'/api/bgv/{self._pick(i).id}/')
+        assert response.status_code == 200, response.content
+
+    def detail_revalidate(self, i):
+        url = f'/api/bgv/{self._pick(i).id}/'
+        etag = self.recruiter_client.get(url)['ETag']
+        response = self.recruiter_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, response.status_code
+
+    def agent_detail_request(self, i):
+        response = self.service_client.get(f'/api/bgv/{self._pick(i).id}/')
+        assert response.status_code == 200, response.content
+
+    def submit_documents(self, i):
+        files = {
+            'pan': SimpleUploadedFile('pan.jpg', b'\xff\xd8pan', content_type='image/jpeg'),
+            'aadhaar': SimpleUploadedFile('aadhaar.jpg', b'\xff\xd8aadhaar', content_type='image/jpeg'),
+        }
+        with mock.patch('backgroundverification.tasks.process_document.delay'), \
+                mock.patch('backgroundverification.tasks.relay_outbox.delay'):
+            response = self.candidate_client.post(f'/api/bgv/{self._pick(i).id}/submit-documents/', files)
+        assert response.status_code == 200, response.content
+
+    def onboarding(self, i):
+        from .outbox import callback_ref, deliver, emit
+
+        bgv_request = self._pick(i)
+        with mock.patch('backgroundverification.tasks.relay_outbox.delay'), transaction.atomic():
+            log = AgentLog.objects.create(
+                bgv_request=bgv_request,
+                action=AgentLog.Action.ANALYSIS,
+                message='Candidate account created, credentials queued for delivery',
+                metadata={'credentials_sent': False},
+            )
+            event = emit(
+                'credentials.dispatch', bgv_request, {'agent_log_id': log.id},
+                dedup_key=f'credentials:bench-{log.id}', secret='bench-password',
+            )
+        with mock.patch('backgroundverification.outbox.requests.post', side_effect=fake_agent_post):
+            assert deliver(event), event.last_error
+        # The agent's completion callback
+        response = self.service_client.post('/api/bgv/agent-jobs/callback/', {
+            'job_id': event.payload['job_id'],
+            'kind': 'send-credentials',
+            'status': 'succeeded',
+            'bgv_request_id': bgv_request.id,
+            'callback_ref': callback_ref(event),
+            'result': {'status': 'success'},
+        }, content_type='application/json')
+        assert response.status_code == 200 and response.json()['data']['event_status'] == 'dispatched', response.content
+
+    def reminder_sweep(self, i):
+        from .tasks import check_pending_document_requests
+
+        BGVRequest.objects.update(status=BGVRequest.Status.DOCUMENTS_REQUESTED)
+        AgentLog.objects.filter(action=AgentLog.Action.REMINDER_SENT).delete()
+        with mock.patch('backgroundverification.tasks.requests.post', side_effect=fake_agent_post):
+            check_pending_document_requests()
+
+    SCENARIOS = {
+        'upload_resume': 'upload_resume',
+        'reupload_resume': 'reupload_resume',
+        'list': 'list_requests',
+        'stats': 'dashboard_stats',
+        'search': 'search_requests',
+        'skill_search': 'skill_search',
+        'detail': 'detail_request',
+        'detail_revalidate': 'detail_revalidate',
+        'agent_detail': 'agent_detail_request',
+        'submit_documents': 'submit_documents',
+        'onboarding': 'onboarding',
+        'reminder_sweep': 'reminder_sweep',
+        'render_list_stdlib': 'render_list_stdlib',
+        'render_list_orjson': 'render_list_orjson',
+        'serialize_list_drf': 'serialize_list_drf',
+        'serialize_list_values': 'serialize_list_values',
+        'serialize_detail_drf': 'serialize_detail_drf',
+        'serialize_detail_values': 'serialize_detail_values',
+    }
+
+    def run(self, names, iterations):
+        results = {}
+        for name in names:
+            results[name] = measure(getattr(self, self.SCENARIOS[name]), iterations)
+        return results
@@ -0,0 +1,117 @@
+"""
+Response caching for BGV list and detail reads.
+
+Detail payloads are keyed by request id plus `updated_at`. Any write to a
+child row (experience, skill, document, agent log, ...) touches the parent's
+`updated_at`, so stale keys are simply never read again and expire on their
+own. With S3 storage the key also rolls over every BGV_CACHE_TIMEOUT seconds,
+since detail payloads carry presigned document URLs. List payloads are keyed
+by a per-user version number that is bumped whenever one of that user's BGV
+requests is saved or deleted. Edits to the nested user profiles are picked up
+when entries expire (BGV_CACHE_TIMEOUT).
+
+The cache is an optimisation only: if Redis is unavailable every helper
+degrades to a miss and the view serializes from the database.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+
+logger = logging.getLogger(__name__)
+
+
+def _audience(request):
+    # Agent service responses include secrets stripped for users (temp_password)
+    return 'service' if request.auth == 'fastapi_agent_service' else 'user'
+
+
+def detail_cache_key(request, pk, updated_at):
+    key = f"bgv:detail:{pk}:{updated_at.timestamp()}:{_audience(request)}:{request.get_host()}"
+    if settings.USE_S3_STORAGE:
+        # Presigned file URLs expire, so the key (and ETag) rolls over every cache window
+        key += f":{int(timezone.now().timestamp()) // settings.BGV_CACHE_TIMEOUT}"
+    return key
+
+
+def _list_version_key(user_id):
+    return f"bgv:list-version:{user_id}"
+
+
+def list_cache_key(request):
+    """Cache key for the current user's list, or None if the version can't be read."""
+    try:
+        version = cache.get_or_set(_list_version_key(request.user.id), 1, timeout=None)
+    except Exception as e:
+        logger.warning(f"BGV cache unavailable: {e}")
+        return None
+    return f"bgv:list:{request.user.id}:v{version}:{request.get_host()}"
+
+
+def get_cached(key):
+    if key is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning(f"BGV cache read failed: {e}")
+        return None
+
+
+def set_cached(key, value):
+    if key is None:
+        return
+    try:
+        cache.set(key, value, timeout=settings.BGV_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"BGV cache write failed: {e}")
+
+
+def make_etag(key):
+    return '"%s"' % hashlib.md5(key.encode()).hexdigest()
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+
+
+def add_validators(response, etag):
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def touch_bgv_requests(*bgv_request_ids):
+    """Bump `updated_at` so cached detail payloads for these requests are no longer used."""
+    from .models import BGVRequest
+
+    ids = {pk for pk in bgv_request_ids if pk}
+    if ids:
+        BGVRequest.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+
+
+def _bump_list_versions(user_ids):
+    for user_id in user_ids:
+        key = _list_version_key(user_id)
+        try:
+            if not cache.add(key, 2, timeout=None):
+                cache.incr(key)
+        except Exception as e:
+            logger.warning(f"BGV cache invalidation failed for user {user_id}: {e}")
+
+
+def invalidate_lists(*user_ids):
+    """
+    Bump the list version of every given user once the transaction commits, so a
+    concurrent read can't re-cache pre-commit data under the new version.
+    """
+    user_ids = {uid for uid in user_ids if uid}
+    if user_ids:
+        transaction.on_commit(lambda: _bump_list_versions(user_ids))
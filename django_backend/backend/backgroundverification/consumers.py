@@ -0,0 +1,30 @@
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from authentication.websocket import SUBPROTOCOL
+from .events import user_group
+
+
+class BGVEventsConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Pushes status transitions and new agent logs for the connected user's BGV requests.
+
+    Clients authenticate with their access token as a subprotocol (see
+    authentication/websocket.py): `new WebSocket(url, ['bearer', accessToken])`.
+    Messages have the shape {"type": "bgv.status" | "bgv.agent_log", "bgv_request_id": ..., ...}.
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        self.group_name = user_group(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept(subprotocol=SUBPROTOCOL)
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def bgv_event(self, message):
+        await self.send_json(message['event'])
@@ -0,0 +1,205 @@
+"""
+Candidate documents: attaching uploads to a BGV request and post-processing them.
+
+Every submitted document is processed in the background (tasks.process_document):
+- images are re-encoded as optimised JPEGs no larger than
+  DOCUMENT_IMAGE_MAX_DIMENSION and get a thumbnail for recruiter previews
+- PDFs have their content streams compressed (when pypdf is installed)
+- the original's sha256 and the before/after sizes are recorded
+
+A document whose content hash matches an already processed one reuses that
+document's stored files instead of keeping another copy. The processed file
+only replaces the original when it is actually smaller.
+
+Each request holds at most one document per type; resubmissions replace it.
+"""
+import hashlib
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+try:
+    import pypdf
+except ImportError:  # pragma: no cover - PDFs are stored as uploaded without it
+    pypdf = None
+
+from .cache import touch_bgv_requests
+from .models import BGVRequest, Document
+from .outbox import emit
+
+logger = logging.getLogger(__name__)
+
+
+PROCESSED_FIELDS = ['thumbnail', 'content_hash', 'original_size', 'size', 'processed_at']
+
+
+def attach_documents(bgv_request, files):
+    """
+    Store `{document_type: uploaded file or storage name}` on the request, mark it
+    submitted and emit a `documents.submitted` outbox event. Call inside a transaction.
+
+    There is one document per type: resubmitting a type replaces the previous
+    file in place (one upsert statement), and the replaced files are deleted
+    from storage once the transaction commits.
+    """
+    replaced = list(
+        Document.objects.select_for_update()
+        .filter(bgv_request=bgv_request, document_type__in=list(files))
+        .values_list('file', 'thumbnail')
+    )
+
+    documents = Document.objects.bulk_create(
+        [
+            Document(bgv_request=bgv_request, document_type=document_type, file=file)
+            for document_type, file in files.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['bgv_request', 'document_type'],
+        update_fields=['file', 'uploaded_at', *PROCESSED_FIELDS],
+    )
+
+    bgv_request.status = BGVRequest.Status.DOCUMENTS_SUBMITTED
+    bgv_request.save(update_fields=['status', 'updated_at'])
+    emit('documents.submitted', bgv_request, {'document_types': sorted(files)})
+
+    document_ids = [document.id for document in documents]
+    replaced_names = {name for names in replaced for name in names if name}
+    storage = Document._meta.get_field('file').storage
+
+    def after_commit():
+        for name in replaced_names:
+            delete_if_unreferenced(storage, name)
+        queue_processing(document_ids)
+
+    transaction.on_commit(after_commit)
+    return documents
+
+
+def queue_processing(document_ids):
+    from .tasks import process_document
+
+    for document_id in document_ids:
+        try:
+            process_document.delay(document_id)
+        except Exception as e:
+            # The original stays in place, so the document is still usable unprocessed
+            logger.error(f"Failed to queue processing for document #{document_id}: {e}")
+
+
+def _flatten(image):
+    """RGB copy of `image` with any transparency composited onto white."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _jpeg(image, **options):
+    out = io.BytesIO()
+    image.save(out, 'JPEG', optimize=True, **options)
+    return out.getvalue()
+
+
+def compress_image(data):
+    """Return `(jpeg_bytes, thumbnail_bytes)` for image data, or `(None, None)` if it isn't an image."""
+    try:
+        image = Image.open(io.BytesIO(data))
+        image = _flatten(ImageOps.exif_transpose(image))
+    except (UnidentifiedImageError, OSError):
+        return None, None
+
+    max_dimension = settings.DOCUMENT_IMAGE_MAX_DIMENSION
+    image.thumbnail((max_dimension, max_dimension))
+    compressed = _jpeg(image, quality=settings.DOCUMENT_IMAGE_QUALITY, progressive=True)
+
+    image.thumbnail((settings.DOCUMENT_THUMBNAIL_SIZE, settings.DOCUMENT_THUMBNAIL_SIZE))
+    thumbnail = _jpeg(image, quality=75)
+    return compressed, thumbnail
+
+
+def compress_pdf(data):
+    """Return the PDF with compressed content streams and shared objects deduplicated, or None."""
+    if pypdf is None:
+        return None
+    try:
+        writer = pypdf.PdfWriter(clone_from=pypdf.PdfReader(io.BytesIO(data)))
+        for page in writer.pages:
+            page.compress_content_streams()
+        writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+        out = io.BytesIO()
+        writer.write(out)
+    except Exception as e:
+        logger.warning(f"PDF compression failed, keeping original: {e}")
+        return None
+    return out.getvalue()
+
+
+def delete_if_unreferenced(storage, name):
+    """Delete a stored file unless a document (possibly a deduplicated one) still points at it."""
+    if name and not Document.objects.filter(Q(file=name) | Q(thumbnail=name)).exists():
+        storage.delete(name)
+
+
+def postprocess(document):
+    """Hash, compress and thumbnail one document in place. Returns the fields that were set."""
+    with document.file.open('rb') as fh:
+        data = fh.read()
+
+    original_name = document.file.name
+    document.original_size = len(data)
+    document.content_hash = hashlib.sha256(data).hexdigest()
+
+    duplicate = (
+        Document.objects.filter(content_hash=document.content_hash, processed_at__isnull=False)
+        .exclude(pk=document.pk)
+        .only('file', 'thumbnail', 'size')
+        .first()
+    )
+    if duplicate:
+        document.file.name = duplicate.file.name
+        document.thumbnail.name = duplicate.thumbnail.name
+        document.size = duplicate.size
+    else:
+        base_name = os.path.splitext(os.path.basename(original_name))[0]
+        if data.startswith(b'%PDF'):
+            processed, thumbnail, extension = compress_pdf(data), None, '.pdf'
+        else:
+            (processed, thumbnail), extension = compress_image(data), '.jpg'
+
+        if processed is not None and len(processed) < len(data):
+            document.file.save(f"{base_name}{extension}", ContentFile(processed), save=False)
+        document.size = len(processed) if document.file.name != original_name else len(data)
+        if thumbnail:
+            document.thumbnail.save(f"{base_name}.jpg", ContentFile(thumbnail), save=False)
+
+    document.processed_at = timezone.now()
+    # Only apply the result if the document wasn't resubmitted while we worked on it
+    updated = Document.objects.filter(pk=document.pk, file=original_name).update(
+        file=document.file.name, **{field: getattr(document, field) for field in PROCESSED_FIELDS}
+    )
+    storage = document.file.storage
+    if not updated:
+        if not duplicate:
+            for name in {document.file.name, document.thumbnail.name} - {original_name}:
+                delete_if_unreferenced(storage, name)
+        return {'stale': True}
+
+    touch_bgv_requests(document.bgv_request_id)
+    if document.file.name != original_name:
+        delete_if_unreferenced(storage, original_name)
+
+    return {
+        'content_hash': document.content_hash,
+        'original_size': document.original_size,
+        'size': document.size,
+        'deduplicated': duplicate is not None,
+    }
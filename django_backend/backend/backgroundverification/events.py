@@ -0,0 +1,63 @@
+"""
+Real-time BGV events pushed to WebSocket subscribers.
+
+Every BGV request event is sent to the groups of both its candidate and its
+recruiter, so each connected user receives updates for exactly the requests
+they can read through the REST API.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def user_group(user_id):
+    return f'bgv_user_{user_id}'
+
+
+def _send(user_ids, event):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        for user_id in user_ids:
+            async_to_sync(channel_layer.group_send)(user_group(user_id), {'type': 'bgv.event', 'event': event})
+    except Exception as e:
+        # Delivery is best-effort; clients fall back to REST reads
+        logger.warning(f"Failed to publish BGV event {event.get('type')}: {e}")
+
+
+def publish(user_ids, event):
+    """Send `event` to the given users' groups once the transaction commits."""
+    user_ids = set(user_ids)
+    transaction.on_commit(lambda: _send(user_ids, event))
+
+
+def publish_status_change(bgv_request, previous_status):
+    publish((bgv_request.user_id, bgv_request.recruiter_id), {
+        'type': 'bgv.status',
+        'bgv_request_id': bgv_request.id,
+        'status': bgv_request.status,
+        'previous_status': previous_status,
+        'updated_at': bgv_request.updated_at.isoformat() if bgv_request.updated_at else None,
+    })
+
+
+def publish_agent_log(agent_log, user_ids=None):
+    """
+    Publish a new agent log. Pass `user_ids` (candidate and recruiter) when they are
+    already known to avoid loading the parent request.
+    """
+    from .serializers import AgentLogSerializer
+
+    if user_ids is None:
+        user_ids = (agent_log.bgv_request.user_id, agent_log.bgv_request.recruiter_id)
+    publish(user_ids, {
+        'type': 'bgv.agent_log',
+        'bgv_request_id': agent_log.bgv_request_id,
+        # Serialized without a service request context, so temp_password is stripped
+        'log': AgentLogSerializer(agent_log).data,
+    })
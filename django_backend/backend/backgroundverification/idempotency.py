@@ -0,0 +1,43 @@
+"""
+Idempotency-Key support for document submission.
+
+A client that retries a submission with the same `Idempotency-Key` header gets
+the original outcome replayed instead of a second write. The receipt is
+stored in the same transaction as the documents, so a key is only "used" once
+the submission has actually committed. Reusing a key for a different request
+(other endpoint, other files) is rejected with 422.
+"""
+import hashlib
+import json
+
+from rest_framework.exceptions import ValidationError
+
+from .models import IdempotencyReceipt
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+def idempotency_key(request):
+    key = request.headers.get(IDEMPOTENCY_HEADER, '').strip()
+    if len(key) > 255:
+        raise ValidationError({'idempotency_key': f'{IDEMPOTENCY_HEADER} must be at most 255 characters'})
+    return key or None
+
+
+def request_fingerprint(request, payload):
+    """Hash of the endpoint plus a JSON-serializable summary of what was submitted."""
+    body = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def find_receipt(user, key):
+    if not key:
+        return None
+    return IdempotencyReceipt.objects.filter(user=user, key=key).first()
+
+
+def record_receipt(user, key, fingerprint, bgv_request, status_code=200):
+    """Store the outcome for `key`. Raises IntegrityError if a concurrent request stored it first."""
+    return IdempotencyReceipt.objects.create(
+        user=user, key=key, fingerprint=fingerprint, bgv_request=bgv_request, status_code=status_code
+    )
@@ -0,0 +1,68 @@
+import json
+import platform
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from backgroundverification.benchmarking import BenchmarkSuite
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the BGV pipeline (upload, list/detail reads, document submission, '
+        'onboarding and reminder sweeps) against a throwaway test database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--seed-requests', type=int, default=200)
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            choices=sorted(BenchmarkSuite.SCENARIOS),
+            help='Scenario to run (repeatable). Defaults to all.'
+        )
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        scenarios = options['scenarios'] or list(BenchmarkSuite.SCENARIOS)
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(
+                MEDIA_ROOT=media_root,
+                CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            ):
+                suite = BenchmarkSuite(seed_requests=options['seed_requests'])
+                results = suite.run(scenarios, options['iterations'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'seed_requests': options['seed_requests'],
+            'scenarios': results,
+        }
+
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<24} {stats['throughput_per_sec']:>9.1f}/s  "
+                f"p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms  "
+                f"queries/op={stats['queries_per_op']}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
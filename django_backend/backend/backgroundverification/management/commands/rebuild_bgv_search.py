@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from backgroundverification import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the candidate search documents and skill index from the BGV requests (e.g. after bulk imports).'
+
+    def handle(self, *args, **options):
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS('Candidate search and skill index rebuilt'))
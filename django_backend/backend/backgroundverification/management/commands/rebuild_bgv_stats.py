@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from backgroundverification import stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the recruiter dashboard summary tables from the BGV requests (e.g. after bulk updates).'
+
+    def handle(self, *args, **options):
+        stats.rebuild()
+        self.stdout.write(self.style.SUCCESS('Recruiter stats rebuilt'))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backgroundverification', '0008_outboxevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxevent',
+            name='dedup_key',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='outboxevent',
+            name='secret',
+            field=models.TextField(blank=True),
+        ),
+    ]
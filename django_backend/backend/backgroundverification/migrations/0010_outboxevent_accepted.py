@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backgroundverification', '0009_outbox_dedup_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxevent',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted (awaiting agent callback)'), ('dispatched', 'Dispatched'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+    ]
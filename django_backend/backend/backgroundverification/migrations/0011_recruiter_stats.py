@@ -0,0 +1,83 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+
+
+def backfill_stats(apps, schema_editor):
+    """Use updated_at as the best guess for when existing requests got their status, and fill the summaries."""
+    BGVRequest = apps.get_model('backgroundverification', 'BGVRequest')
+    RecruiterStatusSummary = apps.get_model('backgroundverification', 'RecruiterStatusSummary')
+    RecruiterDailyIntake = apps.get_model('backgroundverification', 'RecruiterDailyIntake')
+
+    BGVRequest.objects.update(status_changed_at=F('updated_at'))
+    RecruiterStatusSummary.objects.bulk_create([
+        RecruiterStatusSummary(recruiter_id=row['recruiter_id'], status=row['status'], count=row['n'])
+        for row in BGVRequest.objects.values('recruiter_id', 'status').annotate(n=Count('id')).order_by()
+    ])
+    RecruiterDailyIntake.objects.bulk_create([
+        RecruiterDailyIntake(recruiter_id=row['recruiter_id'], date=row['date'], count=row['n'])
+        for row in BGVRequest.objects.annotate(date=TruncDate('created_at'))
+        .values('recruiter_id', 'date').annotate(n=Count('id')).order_by()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backgroundverification', '0010_outboxevent_accepted'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecruiterDailyIntake',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecruiterStatusSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending_analysis', 'Pending Analysis'), ('documents_requested', 'Documents Requested'), ('documents_submitted', 'Documents Submitted'), ('completed', 'Completed')], max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('exits', models.IntegerField(default=0)),
+                ('seconds_in_status', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='bgvrequest',
+            name='status_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='bgvrequest',
+            index=models.Index(fields=['recruiter', 'status', 'status_changed_at'], name='bgv_recruiter_status_idx'),
+        ),
+        migrations.AddField(
+            model_name='recruiterdailyintake',
+            name='recruiter',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bgv_daily_intake', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='recruiterstatussummary',
+            name='recruiter',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bgv_status_summaries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='recruiterdailyintake',
+            constraint=models.UniqueConstraint(fields=('recruiter', 'date'), name='unique_daily_intake_per_recruiter'),
+        ),
+        migrations.AddConstraint(
+            model_name='recruiterstatussummary',
+            constraint=models.UniqueConstraint(fields=('recruiter', 'status'), name='unique_status_summary_per_recruiter'),
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
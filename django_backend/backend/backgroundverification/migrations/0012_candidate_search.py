@@ -0,0 +1,105 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+DOCUMENT_TABLE = 'backgroundverification_candidatesearchdocument'
+
+SQLITE_INDEX = [
+    f"""CREATE VIRTUAL TABLE bgv_candidate_search_fts USING fts5(
+        recruiter_id, body,
+        content='{DOCUMENT_TABLE}', content_rowid='bgv_request_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER bgv_candidate_search_ai AFTER INSERT ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO bgv_candidate_search_fts (rowid, recruiter_id, body)
+        VALUES (new.bgv_request_id, new.recruiter_id, new.body);
+    END""",
+    f"""CREATE TRIGGER bgv_candidate_search_ad AFTER DELETE ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO bgv_candidate_search_fts (bgv_candidate_search_fts, rowid, recruiter_id, body)
+        VALUES ('delete', old.bgv_request_id, old.recruiter_id, old.body);
+    END""",
+    f"""CREATE TRIGGER bgv_candidate_search_au AFTER UPDATE ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO bgv_candidate_search_fts (bgv_candidate_search_fts, rowid, recruiter_id, body)
+        VALUES ('delete', old.bgv_request_id, old.recruiter_id, old.body);
+        INSERT INTO bgv_candidate_search_fts (rowid, recruiter_id, body)
+        VALUES (new.bgv_request_id, new.recruiter_id, new.body);
+    END""",
+]
+
+SQLITE_DROP_INDEX = [
+    "DROP TRIGGER IF EXISTS bgv_candidate_search_au",
+    "DROP TRIGGER IF EXISTS bgv_candidate_search_ad",
+    "DROP TRIGGER IF EXISTS bgv_candidate_search_ai",
+    "DROP TABLE IF EXISTS bgv_candidate_search_fts",
+]
+
+POSTGRES_INDEX = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX bgv_candidate_search_tsv ON {DOCUMENT_TABLE} USING gin (to_tsvector('simple', body))",
+    f"CREATE INDEX bgv_candidate_search_trgm ON {DOCUMENT_TABLE} USING gin (body gin_trgm_ops)",
+]
+
+POSTGRES_DROP_INDEX = [
+    "DROP INDEX IF EXISTS bgv_candidate_search_trgm",
+    "DROP INDEX IF EXISTS bgv_candidate_search_tsv",
+]
+
+
+def _execute(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    _execute(schema_editor, {'sqlite': SQLITE_INDEX, 'postgresql': POSTGRES_INDEX})
+
+
+def drop_search_index(apps, schema_editor):
+    _execute(schema_editor, {'sqlite': SQLITE_DROP_INDEX, 'postgresql': POSTGRES_DROP_INDEX})
+
+
+def build_search_documents(apps, schema_editor):
+    """Index the existing requests (the same text as search.document_bodies)."""
+    BGVRequest = apps.get_model('backgroundverification', 'BGVRequest')
+    CandidateSearchDocument = apps.get_model('backgroundverification', 'CandidateSearchDocument')
+    texts = {
+        row['id']: (row['recruiter_id'], [row['first_name'], row['last_name'], row['email'], row['phone_number']])
+        for row in BGVRequest.objects.values('id', 'recruiter_id', 'first_name', 'last_name', 'email', 'phone_number')
+    }
+    for model_name, field in [('Skill', 'skill_name'), ('WorkExperience', 'company_name'), ('Education', 'institute')]:
+        model = apps.get_model('backgroundverification', model_name)
+        for bgv_request_id, value in model.objects.values_list('bgv_request_id', field):
+            texts[bgv_request_id][1].append(value)
+    Project = apps.get_model('backgroundverification', 'Project')
+    for bgv_request_id, skill_names in Project.objects.values_list('bgv_request_id', 'skill_names'):
+        texts[bgv_request_id][1].extend(str(name) for name in skill_names or [])
+
+    CandidateSearchDocument.objects.bulk_create([
+        CandidateSearchDocument(
+            bgv_request_id=pk, recruiter_id=recruiter_id, body=' '.join(dict.fromkeys(v for v in parts if v))
+        )
+        for pk, (recruiter_id, parts) in texts.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backgroundverification', '0011_recruiter_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateSearchDocument',
+            fields=[
+                ('bgv_request', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='backgroundverification.bgvrequest')),
+                ('body', models.TextField()),
+                ('recruiter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+    ]
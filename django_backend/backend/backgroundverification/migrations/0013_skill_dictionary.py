@@ -0,0 +1,131 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:27
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Canonical name: other spellings (beyond those with the same key as the name)
+SEED_SKILLS = {
+    'JavaScript': ['js', 'ecmascript', 'es6'],
+    'TypeScript': ['ts'],
+    'React': ['reactjs'],
+    'React Native': ['reactnativejs'],
+    'Angular': ['angularjs', 'angular2'],
+    'Vue.js': ['vue', 'vuejs'],
+    'Next.js': ['next', 'nextjs'],
+    'Node.js': ['node', 'nodejs'],
+    'Express': ['expressjs'],
+    'Python': ['python3', 'py'],
+    'Django': ['djangorestframework', 'drf'],
+    'Go': ['golang'],
+    'C++': ['cpp'],
+    'C#': ['csharp'],
+    '.NET': ['dotnet', 'dotnetcore', 'aspnet'],
+    'PostgreSQL': ['postgres', 'psql', 'postgre'],
+    'MySQL': ['mysqldb'],
+    'MongoDB': ['mongo'],
+    'Kubernetes': ['k8s'],
+    'AWS': ['amazonwebservices'],
+    'GCP': ['googlecloud', 'googlecloudplatform'],
+    'Azure': ['microsoftazure'],
+    'Machine Learning': ['ml'],
+    'HTML': ['html5'],
+    'CSS': ['css3'],
+}
+
+
+def skill_key(name):
+    # Same normalization as skills.skill_key
+    return re.sub(r'[^a-z0-9+#]', '', str(name or '').lower())[:100]
+
+
+def seed_skills(apps, schema_editor):
+    CanonicalSkill = apps.get_model('backgroundverification', 'CanonicalSkill')
+    SkillAlias = apps.get_model('backgroundverification', 'SkillAlias')
+    for name, spellings in SEED_SKILLS.items():
+        skill = CanonicalSkill.objects.create(name=name)
+        SkillAlias.objects.bulk_create(
+            [SkillAlias(key=key, skill=skill) for key in {skill_key(name), *map(skill_key, spellings)}]
+        )
+
+
+def index_existing_skills(apps, schema_editor):
+    """Link existing skills to canonical skills and build the index (the same as skills.index_profiles)."""
+    CanonicalSkill = apps.get_model('backgroundverification', 'CanonicalSkill')
+    SkillAlias = apps.get_model('backgroundverification', 'SkillAlias')
+    CandidateSkill = apps.get_model('backgroundverification', 'CandidateSkill')
+    Skill = apps.get_model('backgroundverification', 'Skill')
+    Project = apps.get_model('backgroundverification', 'Project')
+
+    canonical = dict(SkillAlias.objects.values_list('key', 'skill_id'))
+
+    def canonical_id(name):
+        key = skill_key(name)
+        if key and key not in canonical:
+            skill, _ = CanonicalSkill.objects.get_or_create(name=str(name).strip()[:100])
+            canonical[key] = SkillAlias.objects.create(key=key, skill=skill).skill_id
+        return canonical.get(key)
+
+    pairs = set()
+    for skill in Skill.objects.only('id', 'bgv_request_id', 'skill_name').iterator():
+        skill.canonical_id = canonical_id(skill.skill_name)
+        if skill.canonical_id:
+            skill.save(update_fields=['canonical'])
+            pairs.add((skill.bgv_request_id, skill.canonical_id))
+    for bgv_request_id, skill_names in Project.objects.values_list('bgv_request_id', 'skill_names').iterator():
+        for name in skill_names or []:
+            skill_id = canonical_id(name)
+            if skill_id:
+                pairs.add((bgv_request_id, skill_id))
+
+    CandidateSkill.objects.bulk_create(
+        [CandidateSkill(bgv_request_id=bgv_request_id, skill_id=skill_id) for bgv_request_id, skill_id in pairs],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backgroundverification', '0012_candidate_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CanonicalSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='canonical',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='skills', to='backgroundverification.canonicalskill'),
+        ),
+        migrations.CreateModel(
+            name='SkillAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='backgroundverification.canonicalskill')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CandidateSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bgv_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_index', to='backgroundverification.bgvrequest')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candidates', to='backgroundverification.canonicalskill')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('skill', 'bgv_request'), name='unique_candidate_skill')],
+            },
+        ),
+        migrations.RunPython(seed_skills, migrations.RunPython.noop),
+        migrations.RunPython(index_existing_skills, migrations.RunPython.noop),
+    ]
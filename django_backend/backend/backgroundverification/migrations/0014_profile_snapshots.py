@@ -0,0 +1,74 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backgroundverification', '0013_skill_dictionary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='bgvrequest',
+            name='resume_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='bgvrequest',
+            name='profile',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bgv_requests', to='backgroundverification.profilesnapshot'),
+        ),
+        migrations.AddField(
+            model_name='workexperience',
+            name='profile',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='work_experiences', to='backgroundverification.profilesnapshot'),
+        ),
+        migrations.AddField(
+            model_name='education',
+            name='profile',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='educations', to='backgroundverification.profilesnapshot'),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='profile',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='skills', to='backgroundverification.profilesnapshot'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='profile',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='projects', to='backgroundverification.profilesnapshot'),
+        ),
+        # Nullable so 0016 can be reverted: the column comes back empty, and 0015's reverse
+        # fills it in before this is reverted
+        migrations.AlterField(
+            model_name='workexperience',
+            name='bgv_request',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='work_experiences', to='backgroundverification.bgvrequest'),
+        ),
+        migrations.AlterField(
+            model_name='education',
+            name='bgv_request',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='educations', to='backgroundverification.bgvrequest'),
+        ),
+        migrations.AlterField(
+            model_name='skill',
+            name='bgv_request',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='skills', to='backgroundverification.bgvrequest'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='bgv_request',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='projects', to='backgroundverification.bgvrequest'),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:41
+
+import hashlib
+import json
+
+from django.db import migrations
+
+# Same relations, fields and hashing as profiles.PROFILE_MODELS / profiles.snapshot_digest
+PROFILE_MODELS = {
+    'work_experiences': ('WorkExperience', ['role', 'company_name', 'start_date', 'end_date', 'description']),
+    'educations': ('Education', ['degree', 'field_of_study', 'institute', 'start_date', 'end_date', 'gpa']),
+    'skills': ('Skill', ['skill_name', 'years_of_experience', 'competency']),
+    'projects': ('Project', ['name', 'description', 'link', 'role_name', 'skill_names']),
+}
+
+
+def snapshot_digest(rows):
+    return hashlib.sha256(
+        json.dumps(rows, sort_keys=True, separators=(',', ':'), default=str).encode()
+    ).hexdigest()
+
+
+def move_rows_to_snapshots(apps, schema_editor):
+    """
+    Give every request with profile rows a snapshot. Requests whose rows are
+    identical share one, and the duplicate rows are deleted.
+    """
+    BGVRequest = apps.get_model('backgroundverification', 'BGVRequest')
+    ProfileSnapshot = apps.get_model('backgroundverification', 'ProfileSnapshot')
+    models_by_relation = {
+        relation: (apps.get_model('backgroundverification', model_name), fields)
+        for relation, (model_name, fields) in PROFILE_MODELS.items()
+    }
+
+    snapshots = {}
+    for bgv_request in BGVRequest.objects.only('id').order_by('id').iterator():
+        rows = {
+            relation: list(model.objects.filter(bgv_request_id=bgv_request.id).order_by('id').values('id', *fields))
+            for relation, (model, fields) in models_by_relation.items()
+        }
+        if not any(rows.values()):
+            continue
+        digest = snapshot_digest({
+            relation: [{key: value for key, value in row.items() if key != 'id'} for row in relation_rows]
+            for relation, relation_rows in rows.items()
+        })
+        created = digest not in snapshots
+        if created:
+            snapshots[digest] = ProfileSnapshot.objects.create(digest=digest)
+        for relation, (model, _) in models_by_relation.items():
+            ids = [row['id'] for row in rows[relation]]
+            if created:
+                model.objects.filter(id__in=ids).update(profile=snapshots[digest])
+            else:
+                model.objects.filter(id__in=ids).delete()
+        BGVRequest.objects.filter(id=bgv_request.id).update(profile=snapshots[digest])
+
+
+def copy_rows_to_requests(apps, schema_editor):
+    """
+    Reverse of move_rows_to_snapshots(): give every request its own copy of
+    its snapshot's rows again. Rows of snapshots no request points at are deleted.
+    """
+    BGVRequest = apps.get_model('backgroundverification', 'BGVRequest')
+    requests_by_profile = {}
+    for bgv_request_id, profile_id in (
+        BGVRequest.objects.filter(profile__isnull=False).order_by('id').values_list('id', 'profile_id').iterator()
+    ):
+        requests_by_profile.setdefault(profile_id, []).append(bgv_request_id)
+
+    for model_name, _ in PROFILE_MODELS.values():
+        model = apps.get_model('backgroundverification', model_name)
+        fields = [field.attname for field in model._meta.concrete_fields if not field.primary_key]
+        for profile_id, bgv_request_ids in requests_by_profile.items():
+            rows = model.objects.filter(profile_id=profile_id).order_by('id')
+            copies = list(rows.values(*fields))
+            rows.update(bgv_request_id=bgv_request_ids[0])
+            model.objects.bulk_create([
+                model(**{**row, 'bgv_request_id': bgv_request_id})
+                for bgv_request_id in bgv_request_ids[1:]
+                for row in copies
+            ])
+        model.objects.filter(bgv_request__isnull=True).delete()
+
+
+# A migration of its own: PostgreSQL can't ALTER a table in the transaction that updated its rows
+# ("pending trigger events"), so the schema changes around this are in 0014 and 0016
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backgroundverification', '0014_profile_snapshots'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_rows_to_snapshots, copy_rows_to_requests),
+    ]
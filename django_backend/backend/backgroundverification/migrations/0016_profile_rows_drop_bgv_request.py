@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backgroundverification', '0015_move_profile_rows_to_snapshots'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='workexperience',
+            name='bgv_request',
+        ),
+        migrations.RemoveField(
+            model_name='education',
+            name='bgv_request',
+        ),
+        migrations.RemoveField(
+            model_name='skill',
+            name='bgv_request',
+        ),
+        migrations.RemoveField(
+            model_name='project',
+            name='bgv_request',
+        ),
+        migrations.AlterField(
+            model_name='workexperience',
+            name='profile',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='work_experiences', to='backgroundverification.profilesnapshot'),
+        ),
+        migrations.AlterField(
+            model_name='education',
+            name='profile',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='educations', to='backgroundverification.profilesnapshot'),
+        ),
+        migrations.AlterField(
+            model_name='skill',
+            name='profile',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skills', to='backgroundverification.profilesnapshot'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='profile',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='projects', to='backgroundverification.profilesnapshot'),
+        ),
+    ]
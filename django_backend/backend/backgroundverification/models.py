@@ -1,7 +1,24 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
+from django.utils import timezone
 from authentication.models import CustomUser
 
 
+class ProfileSnapshot(models.Model):
+    """
+    The work experience, education, skills and projects parsed from a resume,
+    identified by the sha256 of their content and shared by every BGV request
+    with the same profile (see profiles.py).
+    """
+    digest = models.CharField(max_length=64, unique=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Profile {self.digest[:12]}"
+
+
 class BGVRequest(models.Model):
     class Status(models.TextChoices):
         PENDING_ANALYSIS = 'pending_analysis', 'Pending Analysis'
@@ -28,7 +45,12 @@ class BGVRequest(models.Model):
     total_work_experience_months = models.IntegerField(default=0)
 
     resume_file = models.FileField(upload_to='resumes/', null=True, blank=True)
+    resume_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    profile = models.ForeignKey(
+        ProfileSnapshot, on_delete=models.SET_NULL, null=True, blank=True, related_name='bgv_requests'
+    )
     status = models.CharField(max_length=50, choices=Status.choices, default=Status.PENDING_ANALYSIS)
+    status_changed_at = models.DateTimeField(default=timezone.now)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -36,12 +58,24 @@ class BGVRequest(models.Model):
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.email} (by {self.recruiter.email})"
 
+    def save(self, *args, **kwargs):
+        # Stamp status changes; the post_save signal uses the previous stamp for time-in-status stats
+        if self.pk and self.status != getattr(self, '_loaded_status', self.status):
+            self._previous_status_changed_at = self.status_changed_at
+            self.status_changed_at = timezone.now()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'status_changed_at'}
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recruiter', 'status', 'status_changed_at'], name='bgv_recruiter_status_idx'),
+        ]
 
 
 class WorkExperience(models.Model):
-    bgv_request = models.ForeignKey(BGVRequest, on_delete=models.CASCADE, related_name='work_experiences')
+    profile = models.ForeignKey(ProfileSnapshot, on_delete=models.CASCADE, related_name='work_experiences')
     role = models.CharField(max_length=200)
     company_name = models.CharField(max_length=200)
     start_date = models.DateField(null=True, blank=True)
@@ -58,7 +92,7 @@ class WorkExperience(models.Model):
 
 
 class Education(models.Model):
-    bgv_request = models.ForeignKey(BGVRequest, on_delete=models.CASCADE, related_name='educations')
+    profile = models.ForeignKey(ProfileSnapshot, on_delete=models.CASCADE, related_name='educations')
     degree = models.CharField(max_length=200)
     field_of_study = models.CharField(max_length=200, blank=True)
     institute = models.CharField(max_length=200)
@@ -75,9 +109,32 @@ class Education(models.Model):
         ordering = ['-end_date']
 
 
+class CanonicalSkill(models.Model):
+    """One skill however resumes spell it; its spellings are SkillAlias rows (see skills.py)."""
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['name']
+
+
+class SkillAlias(models.Model):
+    """A normalized spelling (`skills.skill_key()`) of a canonical skill."""
+    key = models.CharField(max_length=100, unique=True)
+    skill = models.ForeignKey(CanonicalSkill, on_delete=models.CASCADE, related_name='aliases')
+
+    def __str__(self):
+        return f"{self.key} -> {self.skill_id}"
+
+
 class Skill(models.Model):
-    bgv_request = models.ForeignKey(BGVRequest, on_delete=models.CASCADE, related_name='skills')
+    profile = models.ForeignKey(ProfileSnapshot, on_delete=models.CASCADE, related_name='skills')
     skill_name = models.CharField(max_length=100)
+    canonical = models.ForeignKey(
+        CanonicalSkill, on_delete=models.SET_NULL, null=True, blank=True, related_name='skills'
+    )
     years_of_experience = models.IntegerField(default=0)
     competency = models.CharField(max_length=50, blank=True)
 
@@ -87,8 +144,22 @@ class Skill(models.Model):
         return f"{self.skill_name} - {self.competency}"
 
 
+class CandidateSkill(models.Model):
+    """
+    Inverted skill index: the BGV requests that list a canonical skill, among
+    their skills or any project's `skill_names`. Maintained by skills.py.
+    """
+    skill = models.ForeignKey(CanonicalSkill, on_delete=models.CASCADE, related_name='candidates')
+    bgv_request = models.ForeignKey(BGVRequest, on_delete=models.CASCADE, related_name='skill_index')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'bgv_request'], name='unique_candidate_skill'),
+        ]
+
+
 class Project(models.Model):
-    bgv_request = models.ForeignKey(BGVRequest, on_delete=models.CASCADE, related_name='projects')
+    profile = models.ForeignKey(ProfileSnapshot, on_delete=models.CASCADE, related_name='projects')
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     link = models.URLField(blank=True, null=True)
@@ -109,6 +180,11 @@ class Document(models.Model):
     bgv_request = models.ForeignKey(BGVRequest, on_delete=models.CASCADE, related_name='documents')
     document_type = models.CharField(max_length=20, choices=DocumentType.choices)
     file = models.FileField(upload_to='documents/')
+    thumbnail = models.FileField(upload_to='documents/thumbnails/', blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    original_size = models.BigIntegerField(null=True, blank=True)
+    size = models.BigIntegerField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
 
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
@@ -117,6 +193,65 @@ class Document(models.Model):
 
     class Meta:
         ordering = ['-uploaded_at']
+        constraints = [
+            # One current document per type; resubmissions replace it
+            models.UniqueConstraint(fields=['bgv_request', 'document_type'], name='unique_document_type_per_bgv_request'),
+        ]
+
+
+class IdempotencyReceipt(models.Model):
+    """Outcome of a document submission made with an Idempotency-Key, replayed when the key is reused."""
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='idempotency_receipts')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    bgv_request = models.ForeignKey(BGVRequest, on_delete=models.CASCADE, related_name='+')
+    status_code = models.PositiveSmallIntegerField(default=200)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.key}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+
+
+class DocumentUploadSession(models.Model):
+    """A resumable document upload, assembled chunk by chunk until it is finalized."""
+    class Status(models.TextChoices):
+        UPLOADING = 'uploading', 'Uploading'
+        COMPLETED = 'completed', 'Completed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    bgv_request = models.ForeignKey(BGVRequest, on_delete=models.CASCADE, related_name='upload_sessions')
+    document_type = models.CharField(max_length=20, choices=Document.DocumentType.choices)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    total_size = models.BigIntegerField()
+    received_size = models.BigIntegerField(default=0)
+    checksum = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.UPLOADING)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.bgv_request_id} - {self.document_type} ({self.received_size}/{self.total_size})"
+
+
+class AgentLogQuerySet(models.QuerySet):
+    def merge_metadata(self, pk, updates):
+        """
+        Merge `updates` into a log's metadata under a row lock and write only that column,
+        so concurrent writers don't drop each other's keys.
+        """
+        with transaction.atomic():
+            log = self.select_for_update().only('id', 'metadata').get(pk=pk)
+            log.metadata = {**(log.metadata or {}), **updates}
+            log.save(update_fields=['metadata'])
+        return log
 
 
 class AgentLog(models.Model):
@@ -124,6 +259,7 @@ class AgentLog(models.Model):
         ANALYSIS = 'analysis', 'Profile Analysis'
         REQUEST_SENT = 'request_sent', 'Document Request Sent'
         REMINDER_SENT = 'reminder_sent', 'Reminder Sent'
+        DOCUMENTS_ACKNOWLEDGED = 'documents_acknowledged', 'Documents Acknowledged'
 
     bgv_request = models.ForeignKey(BGVRequest, on_delete=models.CASCADE, related_name='agent_logs')
     action = models.CharField(max_length=50, choices=Action.choices)
@@ -132,8 +268,102 @@ class AgentLog(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = AgentLogQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.bgv_request.email} - {self.action}"
 
     class Meta:
         ordering = ['-created_at']
+
+
+class RecruiterStatusSummary(models.Model):
+    """
+    Running per-recruiter totals for one status, kept up to date by stats.py as
+    requests are created, change status or are deleted.
+
+    `exits` counts requests that have left the status and `seconds_in_status`
+    the time they spent in it, so their ratio is the average time in the status.
+    """
+    recruiter = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='bgv_status_summaries')
+    status = models.CharField(max_length=50, choices=BGVRequest.Status.choices)
+    count = models.IntegerField(default=0)
+    exits = models.IntegerField(default=0)
+    seconds_in_status = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.recruiter_id} - {self.status}: {self.count}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['recruiter', 'status'], name='unique_status_summary_per_recruiter'),
+        ]
+
+
+class RecruiterDailyIntake(models.Model):
+    """BGV requests a recruiter created per day, kept up to date by stats.py."""
+    recruiter = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='bgv_daily_intake')
+    date = models.DateField()
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.recruiter_id} - {self.date}: {self.count}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['recruiter', 'date'], name='unique_daily_intake_per_recruiter'),
+        ]
+
+
+class CandidateSearchDocument(models.Model):
+    """
+    The searchable text of one BGV request (names, email, skills, employers,
+    institutes), rebuilt by search.py and full-text indexed by the database.
+    """
+    bgv_request = models.OneToOneField(
+        BGVRequest, on_delete=models.CASCADE, primary_key=True, related_name='search_document'
+    )
+    recruiter = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='+')
+    body = models.TextField()
+
+    def __str__(self):
+        return f"Search document for BGV #{self.bgv_request_id}"
+
+
+class OutboxEvent(models.Model):
+    """
+    An event written in the same transaction as the change it describes and
+    delivered afterwards by the outbox relay (see outbox.py).
+
+    `dedup_key` makes an event unique: emitting the same key twice yields the
+    original event. `secret` holds a value the handler needs but that must not
+    outlive delivery (e.g. a temporary password); it is blanked as soon as the
+    event is dispatched or fails for good.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        ACCEPTED = 'accepted', 'Accepted (awaiting agent callback)'
+        DISPATCHED = 'dispatched', 'Dispatched'
+        FAILED = 'failed', 'Failed'
+
+    topic = models.CharField(max_length=100)
+    bgv_request = models.ForeignKey(BGVRequest, on_delete=models.CASCADE, related_name='outbox_events', null=True, blank=True)
+    dedup_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    secret = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.topic} #{self.pk} ({self.status})"
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_pending_idx'),
+        ]
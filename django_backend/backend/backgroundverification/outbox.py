@@ -0,0 +1,304 @@
+"""
+Transactional outbox.
+
+`emit()` writes an OutboxEvent in the caller's transaction, so the event
+exists if and only if the change it describes committed. After commit the
+`relay_outbox` task is kicked to deliver it right away; Celery Beat runs the
+same task periodically to pick up anything the kick missed (broker down,
+worker restart) and to retry failed deliveries with exponential backoff.
+
+Handlers are registered per topic with `@handler('topic')`, and several relay
+workers can run side by side: each claims its batch with
+`SELECT ... FOR UPDATE SKIP LOCKED` in a short transaction that leases the
+events to it (`available_at` moves OUTBOX_LEASE_SECONDS ahead), so no event is
+handled by two of them at once. Handlers then run outside any transaction,
+and each outcome is recorded in a transaction of its own, so no lock is held
+while a handler waits on the network. A handler may still run more than once
+for the same event (e.g. if the worker dies after delivering but before
+marking it dispatched, or a handler outlives its lease), so receivers must be
+idempotent; events with a `dedup_key` pass it to the receiver as the
+`Idempotency-Key` header.
+
+A handler that hands the work to an agent job returns the job id instead of
+waiting for the outcome. The event is then `accepted` until the agent's
+callback reaches `complete()`. A callback that arrives before the job id is
+recorded is turned away as too early, for the agent to send again. If no
+callback arrives within OUTBOX_CALLBACK_TIMEOUT seconds the delivery counts as
+failed: the event is delivered again after a backoff, like any other failure,
+until OUTBOX_MAX_ATTEMPTS.
+"""
+import logging
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AgentLog, OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+FAILURE_HANDLERS = {}
+COMPLETION_HANDLERS = {}
+
+
+class CallbackTooEarly(Exception):
+    """An agent job reported back before its event recorded the job; the callback should be retried."""
+
+
+def handler(topic, on_failure=None, on_complete=None):
+    """
+    Register the decorated function as the delivery handler for `topic`.
+    `on_failure(event)` is called once if the event fails permanently, and
+    `on_complete(event, result)` when an agent job it started succeeds.
+    """
+    def register(func):
+        HANDLERS[topic] = func
+        if on_failure is not None:
+            FAILURE_HANDLERS[topic] = on_failure
+        if on_complete is not None:
+            COMPLETION_HANDLERS[topic] = on_complete
+        return func
+    return register
+
+
+def emit(topic, bgv_request=None, payload=None, dedup_key=None, secret=''):
+    """
+    Record an event in the current transaction and kick the relay once it commits.
+    If an event with `dedup_key` already exists it is returned instead of adding another.
+    """
+    fields = {'topic': topic, 'bgv_request': bgv_request, 'payload': payload or {}, 'secret': secret}
+    if dedup_key:
+        event, created = OutboxEvent.objects.get_or_create(dedup_key=dedup_key, defaults=fields)
+        if not created:
+            return event
+    else:
+        event = OutboxEvent.objects.create(**fields)
+    transaction.on_commit(kick_relay)
+    return event
+
+
+def kick_relay():
+    from .tasks import relay_outbox
+
+    try:
+        relay_outbox.delay()
+    except Exception as e:
+        # The periodic relay will deliver the event instead
+        logger.warning(f"Failed to kick outbox relay: {e}")
+
+
+def _backoff(attempts):
+    return timedelta(seconds=settings.OUTBOX_RETRY_BASE_DELAY * (2 ** (attempts - 1)))
+
+
+def _fail(event, error):
+    """Record a failed attempt: retry after a backoff, or give up after OUTBOX_MAX_ATTEMPTS."""
+    event.last_error = str(error)[:2000]
+    if event.topic not in HANDLERS or event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        event.status = OutboxEvent.Status.FAILED
+        event.secret = ''
+        logger.error(f"Outbox event {event} failed permanently: {error}")
+        on_failure = FAILURE_HANDLERS.get(event.topic)
+        if on_failure is not None:
+            on_failure(event)
+    else:
+        event.status = OutboxEvent.Status.PENDING
+        event.available_at = timezone.now() + _backoff(event.attempts)
+        logger.warning(f"Outbox event {event} failed (attempt {event.attempts}), retrying: {error}")
+    event.save(update_fields=['attempts', 'last_error', 'status', 'available_at', 'secret'])
+
+
+def _dispatched(event):
+    event.status = OutboxEvent.Status.DISPATCHED
+    event.dispatched_at = timezone.now()
+    event.secret = ''
+    event.save(update_fields=['attempts', 'status', 'dispatched_at', 'secret'])
+
+
+def deliver(event):
+    """
+    Run the handler for one claimed event and record the outcome on it. The
+    handler runs outside any transaction; the outcome is saved (and an agent
+    job id committed, ready for its callback) in one of its own.
+    """
+    func = HANDLERS.get(event.topic)
+    try:
+        if func is None:
+            raise LookupError(f"No outbox handler registered for {event.topic}")
+        job_id = func(event)
+    except Exception as e:
+        with transaction.atomic():
+            _fail(event, e)
+        return False
+
+    with transaction.atomic():
+        if job_id is None:
+            _dispatched(event)
+            return True
+
+        event.status = OutboxEvent.Status.ACCEPTED
+        event.payload = {**event.payload, 'job_id': job_id}
+        event.available_at = timezone.now() + timedelta(seconds=settings.OUTBOX_CALLBACK_TIMEOUT)
+        event.save(update_fields=['attempts', 'status', 'payload', 'available_at'])
+    return True
+
+
+def complete(event, job):
+    """
+    Apply an agent job callback to its locked event. Returns False (and changes
+    nothing) unless the event is still waiting on that job, so late or repeated
+    callbacks are harmless. Raises CallbackTooEarly while the event is pending:
+    it is being delivered and may not have recorded the job id yet.
+    """
+    if event.status == OutboxEvent.Status.PENDING:
+        raise CallbackTooEarly(f"Outbox event {event} is not waiting on a job yet")
+    if event.status != OutboxEvent.Status.ACCEPTED or event.payload.get('job_id') != job['job_id']:
+        return False
+
+    if job['status'] != 'succeeded':
+        _fail(event, job.get('error') or f"Agent job {job['job_id']} {job['status']}")
+        return True
+
+    on_complete = COMPLETION_HANDLERS.get(event.topic)
+    if on_complete is not None:
+        on_complete(event, job.get('result') or {})
+    _dispatched(event)
+    return True
+
+
+def callback_ref(event):
+    """Reference the agent echoes back in its job callback."""
+    return f"outbox:{event.pk}"
+
+
+def event_id_from_callback_ref(ref):
+    prefix, _, event_id = (ref or '').partition(':')
+    return int(event_id) if prefix == 'outbox' and event_id.isdigit() else None
+
+
+def claim(batch_size):
+    """
+    Lease up to `batch_size` due events to the calling worker and count the
+    delivery attempt. Other relays skip them until OUTBOX_LEASE_SECONDS pass.
+
+    Accepted events whose callback is overdue are failed instead (retried
+    after a backoff, or given up on at OUTBOX_MAX_ATTEMPTS). Returns the
+    claimed events and the number of overdue ones.
+    """
+    with transaction.atomic():
+        now = timezone.now()
+        due = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(
+                status__in=[OutboxEvent.Status.PENDING, OutboxEvent.Status.ACCEPTED],
+                available_at__lte=now
+            )
+            .order_by('id')[:batch_size]
+        )
+        events = []
+        for event in due:
+            if event.status == OutboxEvent.Status.ACCEPTED:
+                _fail(event, f"No callback for agent job {event.payload.get('job_id')} "
+                             f"within {settings.OUTBOX_CALLBACK_TIMEOUT}s")
+                continue
+            event.attempts += 1
+            event.available_at = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            events.append(event)
+        OutboxEvent.objects.bulk_update(events, ['attempts', 'available_at'])
+    return events, len(due) - len(events)
+
+
+def relay(batch_size=None):
+    """
+    Deliver every due pending event, and fail every accepted one whose callback
+    is overdue, one claimed batch at a time.
+    """
+    batch_size = batch_size or settings.OUTBOX_RELAY_BATCH_SIZE
+    dispatched = failed = 0
+
+    while True:
+        events, overdue = claim(batch_size)
+        failed += overdue
+        for event in events:
+            if deliver(event):
+                dispatched += 1
+            else:
+                failed += 1
+        if len(events) + overdue < batch_size:
+            break
+
+    return {'dispatched': dispatched, 'failed': failed}
+
+
+@handler('documents.submitted')
+def acknowledge_documents(event):
+    """Let the agent acknowledge the submission to the candidate."""
+    bgv_request = event.bgv_request
+    response = requests.post(
+        f"{settings.FASTAPI_AGENT_URL}/agent/documents-submitted",
+        json={
+            'bgv_request_id': bgv_request.id,
+            'candidate_email': bgv_request.email,
+            'candidate_name': f"{bgv_request.first_name} {bgv_request.last_name}".strip(),
+            'document_types': event.payload.get('document_types', []),
+            'event_id': event.id,
+        },
+        timeout=30
+    )
+    response.raise_for_status()
+
+
+def notify_credentials_failure(event):
+    """Ask an admin to onboard the candidate by hand once delivery has given up."""
+    from .tasks import notify_admin_credential_failure
+
+    bgv_request = event.bgv_request
+
+    def notify():
+        try:
+            notify_admin_credential_failure.delay(
+                bgv_request_id=bgv_request.id,
+                candidate_email=bgv_request.email,
+                candidate_name=f"{bgv_request.first_name} {bgv_request.last_name}".strip(),
+                agent_log_id=event.payload.get('agent_log_id'),
+                error=event.last_error
+            )
+        except Exception as e:
+            logger.error(f"Failed to queue admin notification for {event}: {e}")
+
+    transaction.on_commit(notify)
+
+
+def record_credentials_sent(event, result):
+    AgentLog.objects.merge_metadata(event.payload['agent_log_id'], {
+        'credentials_sent': True,
+        'sent_via': 'agent_service',
+        'job_id': event.payload['job_id']
+    })
+
+
+@handler('credentials.dispatch', on_failure=notify_credentials_failure, on_complete=record_credentials_sent)
+def dispatch_credentials(event):
+    """
+    Have the agent email the candidate their login and request documents.
+    The temporary password only ever lives in `event.secret` until delivery.
+    Returns the agent's job id; the job reports back to AgentJobCallbackView.
+    """
+    bgv_request = event.bgv_request
+    response = requests.post(
+        f"{settings.FASTAPI_AGENT_URL}/agent/send-credentials",
+        json={
+            'bgv_request_id': bgv_request.id,
+            'candidate_email': bgv_request.email,
+            'candidate_name': f"{bgv_request.first_name} {bgv_request.last_name}".strip(),
+            'temp_password': event.secret,
+            'callback_ref': callback_ref(event),
+        },
+        headers={'Idempotency-Key': event.dedup_key},
+        timeout=30
+    )
+    response.raise_for_status()
+    return response.json()['job_id']
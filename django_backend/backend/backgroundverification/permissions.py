@@ -17,6 +17,12 @@ class IsAuthenticatedOrServiceSecret(BasePermission):
         return False
 
 
+class IsAgentService(BasePermission):
+    """Only the FastAPI agent service, authenticated with the service secret."""
+    def has_permission(self, request, view):
+        return request.auth == 'fastapi_agent_service'
+
+
 class IsRecruiter(BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and request.user.role == CustomUser.Role.RECRUITER
@@ -0,0 +1,158 @@
+"""
+Candidate profile snapshots.
+
+The work experiences, educations, skills and projects parsed from a resume
+belong to a ProfileSnapshot identified by the sha256 of their content, and a
+BGV request points at its snapshot. Uploading a resume that parses to a
+profile already on file (the same candidate again, or a resume edited only in
+its personal details) reuses the existing rows instead of inserting another
+copy of each.
+
+Resume files are hashed as well: when a recruiter uploads the same bytes
+again, the new request reuses the earlier request's candidate, parsed fields
+and snapshot without calling the parser; the file itself is stored per
+request. Reuse is scoped to the recruiter, so another recruiter's upload of
+the same file is parsed afresh and shares rows only through the digest.
+
+Snapshots are shared, so the app never edits their rows. Changing one in the
+admin changes every request pointing at it.
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from .models import BGVRequest, Education, ProfileSnapshot, Project, Skill, WorkExperience
+
+# The parsed BGVRequest fields, reused as they are when the same resume is uploaded again
+REQUEST_FIELDS = [
+    'first_name', 'last_name', 'email', 'phone_number', 'date_of_birth', 'about', 'marital_status', 'hobbies',
+    'country_of_citizenship', 'country_of_residence', 'role', 'total_work_experience', 'total_work_experience_months',
+]
+
+# Snapshot rows by relation, with the fields hashed into the digest
+PROFILE_MODELS = {
+    'work_experiences': (WorkExperience, ['role', 'company_name', 'start_date', 'end_date', 'description']),
+    'educations': (Education, ['degree', 'field_of_study', 'institute', 'start_date', 'end_date', 'gpa']),
+    'skills': (Skill, ['skill_name', 'years_of_experience', 'competency']),
+    'projects': (Project, ['name', 'description', 'link', 'role_name', 'skill_names']),
+}
+
+
+def parse_date(date_str):
+    if not date_str:
+        return None
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def request_fields(data):
+    """BGVRequest fields from the resume parser's `data`."""
+    return {
+        'first_name': data.get('firstName', ''),
+        'last_name': data.get('lastName', ''),
+        'email': data.get('email'),
+        'phone_number': data.get('phoneNumber', ''),
+        'date_of_birth': parse_date(data.get('dateOfBirth')),
+        'about': data.get('about', ''),
+        'marital_status': data.get('maritalStatus', ''),
+        'hobbies': data.get('hobbies', ''),
+        'country_of_citizenship': data.get('countryOfCitizenship', ''),
+        'country_of_residence': data.get('countryOfResidence', ''),
+        'role': data.get('role', ''),
+        'total_work_experience': data.get('totalWorkExperience', 0),
+        'total_work_experience_months': data.get('totalWorkExperienceInMonths', 0),
+    }
+
+
+def profile_rows(data):
+    """`{relation: [row fields]}` for the snapshot of the resume parser's `data`."""
+    return {
+        'work_experiences': [
+            {
+                'role': exp.get('role', ''),
+                'company_name': exp.get('companyName', ''),
+                'start_date': parse_date(exp.get('startDate')),
+                'end_date': parse_date(exp.get('endDate')),
+                'description': exp.get('description', ''),
+            }
+            for exp in data.get('professionalBackground', [])
+        ],
+        'educations': [
+            {
+                'degree': edu.get('degree', ''),
+                'field_of_study': edu.get('fieldOfStudy', ''),
+                'institute': edu.get('institute', ''),
+                'start_date': parse_date(edu.get('startDate')),
+                'end_date': parse_date(edu.get('endDate')),
+                'gpa': edu.get('gpa', ''),
+            }
+            for edu in data.get('educationalBackground', [])
+        ],
+        'skills': [
+            {
+                'skill_name': skill.get('skillName', ''),
+                'years_of_experience': skill.get('yearsOfExperience', 0),
+                'competency': skill.get('competency', ''),
+            }
+            for skill in data.get('skills', [])
+        ],
+        'projects': [
+            {
+                'name': project.get('name', ''),
+                'description': project.get('description', ''),
+                'link': project.get('link', ''),
+                'role_name': project.get('role', {}).get('name', ''),
+                'skill_names': project.get('skills', {}).get('skillNames', []),
+            }
+            for project in data.get('projects', [])
+        ],
+    }
+
+
+def snapshot_digest(rows):
+    """sha256 of `profile_rows()`-shaped rows; the order of rows counts, the order of keys doesn't."""
+    payload = {
+        relation: [{field: row.get(field) for field in fields} for row in rows.get(relation, [])]
+        for relation, (_, fields) in PROFILE_MODELS.items()
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str).encode()
+    ).hexdigest()
+
+
+def get_or_create_snapshot(rows):
+    """The snapshot with exactly these rows, inserting it (and them) if it is new. Call inside a transaction."""
+    snapshot, created = ProfileSnapshot.objects.get_or_create(digest=snapshot_digest(rows))
+    if created:
+        for relation, (model, _) in PROFILE_MODELS.items():
+            model.objects.bulk_create([model(profile=snapshot, **row) for row in rows.get(relation, [])])
+    return snapshot
+
+
+def file_sha256(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def previous_upload(resume_hash, recruiter):
+    """
+    The parsed fields, candidate `user_id` and `profile_id` of the latest
+    request `recruiter` uploaded with this exact resume, or None.
+    """
+    return (
+        BGVRequest.objects.filter(recruiter=recruiter, resume_hash=resume_hash, profile__isnull=False)
+        .order_by('-id')
+        .values(*REQUEST_FIELDS, 'user_id', 'profile_id')
+        .first()
+    )
+
+
+def prune(profile_id):
+    """Delete the snapshot once no request points at it."""
+    if profile_id:
+        ProfileSnapshot.objects.filter(pk=profile_id, bgv_requests__isnull=True).delete()
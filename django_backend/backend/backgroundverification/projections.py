@@ -0,0 +1,133 @@
+"""
+Fast read path for the BGV list and detail GETs.
+
+Rows are fetched with `.values()` and turned into plain dicts by the functions
+below instead of going through ModelSerializer field introspection per row.
+The output is the same JSON shape as BGVRequestListSerializer and
+BGVRequestDetailSerializer (tests.py checks parity), so any field added to
+those serializers must be added here as well.
+"""
+from django.utils import timezone
+
+from .models import BGVRequest, WorkExperience, Education, Skill, Project, Document, AgentLog
+
+USER_FIELDS = ['id', 'email', 'full_name', 'phone_number', 'role', 'created_at']
+
+LIST_FIELDS = ['id', 'first_name', 'last_name', 'email', 'phone_number', 'role', 'status', 'created_at']
+
+DETAIL_FIELDS = [
+    'id', 'first_name', 'last_name', 'email', 'phone_number',
+    'date_of_birth', 'about', 'marital_status', 'hobbies', 'country_of_citizenship',
+    'country_of_residence', 'role', 'total_work_experience', 'total_work_experience_months',
+    'resume_file', 'status', 'created_at', 'updated_at',
+]
+
+# name: (model, parent key, fields); profile rows hang off the request's snapshot
+CHILDREN = {
+    'work_experiences': (
+        WorkExperience, 'profile_id', ['id', 'role', 'company_name', 'start_date', 'end_date', 'description']
+    ),
+    'educations': (
+        Education, 'profile_id', ['id', 'degree', 'field_of_study', 'institute', 'start_date', 'end_date', 'gpa']
+    ),
+    'skills': (Skill, 'profile_id', ['id', 'skill_name', 'years_of_experience', 'competency']),
+    'projects': (Project, 'profile_id', ['id', 'name', 'description', 'link', 'role_name', 'skill_names']),
+    'documents': (Document, 'bgv_request_id', ['id', 'document_type', 'file', 'thumbnail', 'size', 'uploaded_at']),
+    'agent_logs': (AgentLog, 'bgv_request_id', ['id', 'action', 'message', 'metadata', 'created_at']),
+}
+
+DATETIME_FIELDS = {'created_at', 'updated_at', 'uploaded_at'}
+DATE_FIELDS = {'date_of_birth', 'start_date', 'end_date'}
+
+
+def format_datetime(value):
+    """Same output as DRF's DateTimeField: current timezone, ISO 8601, 'Z' for UTC."""
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def format_date(value):
+    return value.isoformat() if value is not None else None
+
+
+def file_url(field, name, request=None):
+    """Same output as DRF's FileField: absolute URL when a request is available, None when empty."""
+    if not name:
+        return None
+    url = field.storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def _format_row(row, file_fields=(), request=None, model=None):
+    for key, value in row.items():
+        if key in DATETIME_FIELDS:
+            row[key] = format_datetime(value)
+        elif key in DATE_FIELDS:
+            row[key] = format_date(value)
+        elif key in file_fields:
+            row[key] = file_url(model._meta.get_field(key), value, request)
+    return row
+
+
+def _user_lookups(prefix):
+    return [f'{prefix}__{field}' for field in USER_FIELDS]
+
+
+def _pop_user(row, prefix):
+    user = {field: row.pop(f'{prefix}__{field}') for field in USER_FIELDS}
+    user['created_at'] = format_datetime(user['created_at'])
+    return user
+
+
+def _with_users(row):
+    # Nested users go right after `id`, matching the serializers' field order
+    user, recruiter = _pop_user(row, 'user'), _pop_user(row, 'recruiter')
+    row_id = row.pop('id')
+    return {'id': row_id, 'user': user, 'recruiter': recruiter, **row}
+
+
+def list_rows(queryset):
+    """Yield BGVRequestListSerializer-shaped dicts for every request in `queryset`."""
+    rows = queryset.values(*LIST_FIELDS, *_user_lookups('user'), *_user_lookups('recruiter'))
+    for row in rows.iterator(chunk_size=500):
+        yield _with_users(_format_row(row))
+
+
+def is_service_request(request):
+    return request is not None and getattr(request, 'auth', None) == 'fastapi_agent_service'
+
+
+def detail_payload(queryset, pk, request=None):
+    """
+    BGVRequestDetailSerializer-shaped dict for request `pk` within `queryset`,
+    or None if it isn't there. One query for the request and one per child table
+    (none for the profile tables if the request has no snapshot).
+    """
+    row = queryset.filter(pk=pk).values(
+        *DETAIL_FIELDS, 'profile_id', *_user_lookups('user'), *_user_lookups('recruiter')
+    ).first()
+    if row is None:
+        return None
+
+    parents = {'bgv_request_id': pk, 'profile_id': row.pop('profile_id')}
+    payload = _with_users(_format_row(row, file_fields={'resume_file'}, request=request, model=BGVRequest))
+    for name, (model, parent, fields) in CHILDREN.items():
+        if parents[parent] is None:
+            payload[name] = []
+            continue
+        children = model.objects.filter(**{parent: parents[parent]}).values(*fields)
+        payload[name] = [
+            _format_row(child, file_fields={'file', 'thumbnail'}, request=request, model=model) for child in children
+        ]
+
+    if not is_service_request(request):
+        for log in payload['agent_logs']:
+            if log['metadata'] and 'temp_password' in log['metadata']:
+                log['metadata'] = {k: v for k, v in log['metadata'].items() if k != 'temp_password'}
+    return payload
@@ -0,0 +1,75 @@
+"""
+Reminder context for the agent.
+
+How long a request has been waiting, how many reminders it already got and
+how urgent the next one should be are computed here, in one aggregate query,
+and sent with the reminder. The agent's prompt states them directly instead
+of leaving the model to work them out from the full BGV payload.
+
+Days pending counts calendar days since the request was created, so it stays
+the same for every sweep run on one day (the agent's Idempotency-Key is per
+day too).
+"""
+from datetime import timedelta
+
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import AgentLog, BGVRequest
+from .projections import format_datetime
+
+REMIND_AFTER_DAYS = 3
+REMINDER_INTERVAL = timedelta(hours=48)
+
+# (minimum days pending, tier), most urgent first
+URGENCY_TIERS = [
+    (11, 'urgent'),
+    (6, 'firm'),
+    (0, 'gentle'),
+]
+
+CONTEXT_FIELDS = ['id', 'first_name', 'last_name', 'email', 'role', 'status', 'created_at']
+
+
+def urgency_for(days_pending):
+    return next(tier for min_days, tier in URGENCY_TIERS if days_pending >= min_days)
+
+
+def with_reminder_stats(queryset):
+    """Rows of CONTEXT_FIELDS plus reminder_count and last_reminder_at, in one grouped query."""
+    reminders = Q(agent_logs__action=AgentLog.Action.REMINDER_SENT)
+    return queryset.values(*CONTEXT_FIELDS).annotate(
+        reminder_count=Count('agent_logs', filter=reminders),
+        last_reminder_at=Max('agent_logs__created_at', filter=reminders),
+    ).order_by('id')
+
+
+def reminder_context(row, today=None):
+    """The context sent to the agent for one row of `with_reminder_stats()`."""
+    today = today or timezone.localdate()
+    days_pending = (today - timezone.localdate(row['created_at'])).days
+    return {
+        'candidate_name': f"{row['first_name']} {row['last_name']}".strip(),
+        'candidate_email': row['email'],
+        'role': row['role'] or '',
+        'status': row['status'],
+        'days_pending': days_pending,
+        'reminder_count': row['reminder_count'],
+        'last_reminder_at': format_datetime(row['last_reminder_at']),
+        'urgency': urgency_for(days_pending),
+    }
+
+
+def due_reminders(now=None):
+    """
+    `(row, due)` for every request that has been waiting on documents for
+    REMIND_AFTER_DAYS; `due` is False if it was reminded within REMINDER_INTERVAL.
+    """
+    now = now or timezone.now()
+    rows = with_reminder_stats(BGVRequest.objects.filter(
+        status=BGVRequest.Status.DOCUMENTS_REQUESTED,
+        created_at__lt=now - timedelta(days=REMIND_AFTER_DAYS),
+    ))
+    for row in rows:
+        last = row['last_reminder_at']
+        yield row, last is None or last < now - REMINDER_INTERVAL
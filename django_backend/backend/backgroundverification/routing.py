@@ -0,0 +1,6 @@
+from django.urls import path
+from . import consumers
+
+websocket_urlpatterns = [
+    path('ws/bgv/', consumers.BGVEventsConsumer.as_asgi(), name='bgv-events'),
+]
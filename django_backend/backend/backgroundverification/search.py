@@ -0,0 +1,164 @@
+"""
+Candidate search.
+
+Each BGV request has a CandidateSearchDocument holding the text recruiters
+search by: the candidate's name, email and phone number, skill names
+(including project skills), former employers and institutes. The database
+indexes it:
+- SQLite: the FTS5 table `bgv_candidate_search_fts`, an external-content
+  index over the document table kept in sync by triggers
+- PostgreSQL: a GIN index on `to_tsvector('simple', body)` for words and a
+  pg_trgm index for partial strings (parts of emails, misspelt names)
+
+Both are created by migration 0012. Every query term matches as a prefix and
+all terms must match; results are newest first, which lets the index stop at
+the first `limit` hits instead of ranking every match of a common term.
+
+Documents are rebuilt after commit for each request whose profile changed
+(`reindex_on_commit()`), together with its entries in the skill index
+(skills.py). Bulk writes skip the signals; call it yourself, or run
+`rebuild()` (`manage.py rebuild_bgv_search`).
+"""
+import re
+from collections import defaultdict
+
+from django.db import connection, transaction
+
+from .models import BGVRequest, CandidateSearchDocument, Education, Project, Skill, WorkExperience
+from .skills import index_profiles
+
+FTS_TABLE = 'bgv_candidate_search_fts'
+MAX_RESULTS = 1000
+REBUILD_BATCH_SIZE = 1000
+
+# BGVRequest fields that end up in the search document
+INDEXED_FIELDS = {'first_name', 'last_name', 'email', 'phone_number', 'recruiter', 'profile'}
+
+# Profile rows whose field is searchable, by model
+INDEXED_CHILDREN = [
+    (Skill, 'skill_name'),
+    (WorkExperience, 'company_name'),
+    (Education, 'institute'),
+]
+
+
+def document_bodies(bgv_request_ids):
+    """`{bgv_request_id: (recruiter_id, body)}` for the given requests, one query per table."""
+    texts = {}
+    recruiters = {}
+    requests_by_profile = defaultdict(list)
+    for row in BGVRequest.objects.filter(pk__in=bgv_request_ids).values(
+        'id', 'recruiter_id', 'profile_id', 'first_name', 'last_name', 'email', 'phone_number'
+    ):
+        recruiters[row['id']] = row['recruiter_id']
+        texts[row['id']] = [row['first_name'], row['last_name'], row['email'], row['phone_number']]
+        if row['profile_id']:
+            requests_by_profile[row['profile_id']].append(row['id'])
+
+    profile_texts = defaultdict(list)
+    for model, field in INDEXED_CHILDREN:
+        for profile_id, value in model.objects.filter(
+            profile_id__in=requests_by_profile
+        ).values_list('profile_id', field):
+            profile_texts[profile_id].append(value)
+    for profile_id, skill_names in Project.objects.filter(
+        profile_id__in=requests_by_profile
+    ).values_list('profile_id', 'skill_names'):
+        profile_texts[profile_id].extend(str(name) for name in skill_names or [])
+    for profile_id, pks in requests_by_profile.items():
+        for pk in pks:
+            texts[pk].extend(profile_texts[profile_id])
+
+    return {
+        pk: (recruiters[pk], ' '.join(dict.fromkeys(value for value in parts if value)))
+        for pk, parts in texts.items()
+    }
+
+
+def reindex(bgv_request_ids):
+    """
+    Rebuild the search documents and skill index entries of these requests
+    (deleting a request cascades to both).
+    """
+    index_profiles(bgv_request_ids)
+    bodies = document_bodies(bgv_request_ids)
+    CandidateSearchDocument.objects.bulk_create(
+        [
+            CandidateSearchDocument(bgv_request_id=pk, recruiter_id=recruiter_id, body=body)
+            for pk, (recruiter_id, body) in bodies.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['bgv_request'],
+        update_fields=['recruiter', 'body'],
+    )
+
+
+class _PendingReindex:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def __call__(self):
+        reindex(self.ids)
+
+
+def reindex_on_commit(*bgv_request_ids):
+    """
+    Reindex these requests once the transaction commits. Calls made at the same
+    savepoint level share one reindex, so a request written several times in a
+    transaction is indexed once.
+    """
+    ids = {pk for pk in bgv_request_ids if pk}
+    if not ids:
+        return
+    conn = transaction.get_connection()
+    if conn.in_atomic_block:
+        for savepoint_ids, func, _ in conn.run_on_commit:
+            if isinstance(func, _PendingReindex) and savepoint_ids == set(conn.savepoint_ids):
+                func.ids |= ids
+                return
+    transaction.on_commit(_PendingReindex(ids))
+
+
+def rebuild():
+    """Rebuild every search document and the skill index, in batches."""
+    ids = list(BGVRequest.objects.order_by('id').values_list('id', flat=True))
+    with transaction.atomic():
+        CandidateSearchDocument.objects.exclude(bgv_request_id__in=BGVRequest.objects.values('id')).delete()
+        for start in range(0, len(ids), REBUILD_BATCH_SIZE):
+            reindex(ids[start:start + REBUILD_BATCH_SIZE])
+
+
+def search_terms(query):
+    return re.findall(r'\w+', (query or '').lower())[:10]
+
+
+def search_ids(query, recruiter_id=None, limit=MAX_RESULTS):
+    """
+    Ids of the requests (of `recruiter_id`, if given) matching every term of
+    `query`, newest first.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == 'postgresql':
+        sql = (
+            "SELECT bgv_request_id FROM backgroundverification_candidatesearchdocument "
+            "WHERE (to_tsvector('simple', body) @@ to_tsquery('simple', %s) OR body ILIKE %s)"
+        )
+        params = [' & '.join(f'{term}:*' for term in terms), f"%{' '.join(terms)}%"]
+        if recruiter_id is not None:
+            sql += " AND recruiter_id = %s"
+            params.append(recruiter_id)
+        sql += " ORDER BY bgv_request_id DESC LIMIT %s"
+    else:
+        match = ' '.join(f'"{term}"*' for term in terms)
+        if recruiter_id is not None:
+            match = f'recruiter_id : "{int(recruiter_id)}" AND body : ({match})'
+        sql = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rowid DESC LIMIT %s"
+        params = [match]
+    params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
@@ -1,6 +1,10 @@
+import posixpath
+
+from django.conf import settings
 from rest_framework import serializers
-from .models import BGVRequest, WorkExperience, Education, Skill, Project, Document, AgentLog
+from .models import BGVRequest, WorkExperience, Education, Skill, Project, Document, AgentLog, DocumentUploadSession
 from authentication.serializers import UserSerializer
+from .storage import DOCUMENT_CONTENT_TYPES, is_document_name, uploaded_size
 
 
 class WorkExperienceSerializer(serializers.ModelSerializer):
@@ -30,7 +34,7 @@ class ProjectSerializer(serializers.ModelSerializer):
 class DocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Document
-        fields = ['id', 'document_type', 'file', 'uploaded_at']
+        fields = ['id', 'document_type', 'file', 'thumbnail', 'size', 'uploaded_at']
 
 
 class AgentLogSerializer(serializers.ModelSerializer):
@@ -73,6 +77,28 @@ class AgentLogCreateSerializer(serializers.ModelSerializer):
         return value
 
 
+class AgentLogBulkEntrySerializer(AgentLogCreateSerializer):
+    bgv_request_id = serializers.IntegerField()
+
+    class Meta(AgentLogCreateSerializer.Meta):
+        fields = ['bgv_request_id', 'action', 'message', 'metadata']
+
+
+class AgentLogBulkCreateSerializer(serializers.Serializer):
+    entries = AgentLogBulkEntrySerializer(many=True, allow_empty=False)
+
+    def validate_entries(self, value):
+        """Validate that every referenced BGV request exists, in a single query"""
+        ids = {entry['bgv_request_id'] for entry in value}
+        self.context['bgv_requests'] = {
+            row['id']: row for row in BGVRequest.objects.filter(id__in=ids).values('id', 'user_id', 'recruiter_id')
+        }
+        missing = sorted(ids - self.context['bgv_requests'].keys())
+        if missing:
+            raise serializers.ValidationError(f"BGV requests not found: {', '.join(map(str, missing))}")
+        return value
+
+
 class BGVRequestListSerializer(serializers.ModelSerializer):
     recruiter = UserSerializer(read_only=True)
     user = UserSerializer(read_only=True)
@@ -82,13 +108,20 @@ class BGVRequestListSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'recruiter', 'first_name', 'last_name', 'email', 'phone_number', 'role', 'status', 'created_at']
 
 
+# Relations BGVRequestDetailSerializer renders, for prefetch_related() / prefetch_related_objects()
+DETAIL_PREFETCH = [
+    'profile__work_experiences', 'profile__educations', 'profile__skills', 'profile__projects', 'documents', 'agent_logs',
+]
+
+
 class BGVRequestDetailSerializer(serializers.ModelSerializer):
     recruiter = UserSerializer(read_only=True)
     user = UserSerializer(read_only=True)
-    work_experiences = WorkExperienceSerializer(many=True, read_only=True)
-    educations = EducationSerializer(many=True, read_only=True)
-    skills = SkillSerializer(many=True, read_only=True)
-    projects = ProjectSerializer(many=True, read_only=True)
+    # Profile rows belong to the request's (possibly shared) snapshot; none if nothing was parsed
+    work_experiences = WorkExperienceSerializer(many=True, read_only=True, source='profile.work_experiences', default=list)
+    educations = EducationSerializer(many=True, read_only=True, source='profile.educations', default=list)
+    skills = SkillSerializer(many=True, read_only=True, source='profile.skills', default=list)
+    projects = ProjectSerializer(many=True, read_only=True, source='profile.projects', default=list)
     documents = DocumentSerializer(many=True, read_only=True)
     agent_logs = AgentLogSerializer(many=True, read_only=True)
 
@@ -113,3 +146,88 @@ class BGVRequestUpdateSerializer(serializers.ModelSerializer):
         if value not in dict(BGVRequest.Status.choices):
             raise serializers.ValidationError(f"Invalid status. Must be one of: {', '.join(dict(BGVRequest.Status.choices).keys())}")
         return value
+
+
+class BGVTransitionSerializer(serializers.Serializer):
+    """Status change plus the agent log entry recorded with it"""
+    status = serializers.ChoiceField(choices=BGVRequest.Status.choices)
+    action = serializers.ChoiceField(choices=AgentLog.Action.choices)
+    message = serializers.CharField()
+    metadata = serializers.JSONField(required=False, default=dict)
+
+
+class AgentJobCallbackSerializer(serializers.Serializer):
+    """Finished agent job, as reported by the FastAPI service"""
+    job_id = serializers.CharField(max_length=64)
+    kind = serializers.CharField(max_length=50)
+    status = serializers.ChoiceField(choices=['succeeded', 'failed'])
+    bgv_request_id = serializers.IntegerField()
+    callback_ref = serializers.CharField(max_length=100)
+    result = serializers.JSONField(required=False, allow_null=True)
+    error = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+
+
+class DocumentUploadURLSerializer(serializers.Serializer):
+    document_type = serializers.ChoiceField(choices=Document.DocumentType.choices)
+    content_type = serializers.ChoiceField(choices=DOCUMENT_CONTENT_TYPES)
+    filename = serializers.CharField(required=False, allow_blank=True, max_length=255, default='')
+
+
+class DocumentConfirmEntrySerializer(serializers.Serializer):
+    document_type = serializers.ChoiceField(choices=Document.DocumentType.choices)
+    name = serializers.CharField(max_length=255)
+
+
+class DocumentConfirmSerializer(serializers.Serializer):
+    """Object names returned by the upload-url endpoint, checked against the bucket"""
+    documents = DocumentConfirmEntrySerializer(many=True, allow_empty=False)
+
+    def validate_documents(self, value):
+        bgv_request_id = self.context['bgv_request'].id
+        for entry in value:
+            name = entry['name']
+            # The name encodes the request and document type it was issued for
+            if not is_document_name(name, bgv_request_id, entry['document_type']):
+                raise serializers.ValidationError(f"Invalid document name: {name}")
+            size = uploaded_size(name)
+            if size is None:
+                raise serializers.ValidationError(f"Document not uploaded: {name}")
+            if size > settings.DOCUMENT_MAX_UPLOAD_SIZE:
+                raise serializers.ValidationError(f"Document too large: {name}")
+        return value
+
+
+class DocumentUploadSessionSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source='received_size', read_only=True)
+    chunk_size = serializers.SerializerMethodField()
+    content_type = serializers.ChoiceField(choices=DOCUMENT_CONTENT_TYPES)
+
+    class Meta:
+        model = DocumentUploadSession
+        fields = [
+            'id', 'document_type', 'filename', 'content_type', 'total_size', 'checksum',
+            'offset', 'chunk_size', 'status', 'created_at'
+        ]
+        read_only_fields = ['id', 'status', 'created_at']
+
+    def get_chunk_size(self, obj):
+        return settings.DOCUMENT_UPLOAD_CHUNK_SIZE
+
+    def validate_total_size(self, value):
+        if value < 1 or value > settings.DOCUMENT_MAX_UPLOAD_SIZE:
+            raise serializers.ValidationError(f"File size must be between 1 and {settings.DOCUMENT_MAX_UPLOAD_SIZE} bytes")
+        return value
+
+    def validate_filename(self, value):
+        """Keep only the base name; the stored document's path is chosen by the server"""
+        value = posixpath.basename(value.replace('\\', '/')).strip()
+        if value in ('', '.', '..'):
+            raise serializers.ValidationError("Filename must name a file")
+        return value
+
+    def validate_checksum(self, value):
+        """Optional sha256 hex digest of the whole file, verified on finalize"""
+        value = value.lower()
+        if value and (len(value) != 64 or any(c not in '0123456789abcdef' for c in value)):
+            raise serializers.ValidationError("Checksum must be a sha256 hex digest")
+        return value
@@ -0,0 +1,73 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from authentication.models import CustomUser
+
+from .cache import invalidate_lists, touch_bgv_requests
+from .events import publish_agent_log, publish_status_change
+from .models import BGVRequest, WorkExperience, Education, Skill, Project, Document, AgentLog
+from . import profiles, search, stats
+
+BGV_CHILD_MODELS = (Document, AgentLog)
+PROFILE_MODELS = (WorkExperience, Education, Skill, Project)
+
+
+@receiver(post_init, sender=BGVRequest)
+def remember_loaded_status(sender, instance, **kwargs):
+    instance._loaded_status = instance.status if instance.pk else None
+
+
+@receiver(post_save, sender=BGVRequest)
+def bgv_request_saved(sender, instance, created, **kwargs):
+    previous_status = getattr(instance, '_loaded_status', None)
+    if created:
+        stats.record_created(instance)
+    elif instance.status != previous_status:
+        stats.record_transition(instance, previous_status, getattr(instance, '_previous_status_changed_at', None))
+    if created or instance.status != previous_status:
+        publish_status_change(instance, previous_status)
+    instance._loaded_status = instance.status
+
+    update_fields = kwargs.get('update_fields')
+    if created or update_fields is None or search.INDEXED_FIELDS & set(update_fields):
+        search.reindex_on_commit(instance.pk)
+
+
+@receiver(post_delete, sender=BGVRequest)
+def bgv_request_deleted(sender, instance, origin=None, **kwargs):
+    # A deleted recruiter's summary rows go with them
+    if not (isinstance(origin, CustomUser) and origin.pk == instance.recruiter_id):
+        stats.record_deleted(instance)
+    profiles.prune(instance.profile_id)
+
+
+@receiver(post_save, sender=AgentLog)
+def agent_log_saved(sender, instance, created, **kwargs):
+    if created:
+        publish_agent_log(instance)
+
+
+@receiver(post_save, sender=BGVRequest)
+@receiver(post_delete, sender=BGVRequest)
+def invalidate_bgv_lists(sender, instance, **kwargs):
+    invalidate_lists(instance.user_id, instance.recruiter_id)
+
+
+def touch_parent_bgv_request(sender, instance, **kwargs):
+    touch_bgv_requests(instance.bgv_request_id)
+
+
+def profile_row_changed(sender, instance, **kwargs):
+    # Snapshot rows are shared: every request on the snapshot changed
+    bgv_request_ids = list(BGVRequest.objects.filter(profile_id=instance.profile_id).values_list('id', flat=True))
+    touch_bgv_requests(*bgv_request_ids)
+    search.reindex_on_commit(*bgv_request_ids)
+
+
+for child_model in BGV_CHILD_MODELS:
+    post_save.connect(touch_parent_bgv_request, sender=child_model, dispatch_uid=f'touch_bgv_{child_model.__name__}_save')
+    post_delete.connect(touch_parent_bgv_request, sender=child_model, dispatch_uid=f'touch_bgv_{child_model.__name__}_delete')
+
+for profile_model in PROFILE_MODELS:
+    post_save.connect(profile_row_changed, sender=profile_model, dispatch_uid=f'profile_{profile_model.__name__}_save')
+    post_delete.connect(profile_row_changed, sender=profile_model, dispatch_uid=f'profile_{profile_model.__name__}_delete')
@@ -0,0 +1,105 @@
+"""
+Skill dictionary and inverted skill index.
+
+Resumes spell the same skill many ways ("ReactJS", "React.js", "react"). Each
+name is reduced to a key (`skill_key()`: lowercase letters, digits, `+` and
+`#`) and looked up in SkillAlias, which maps keys to a CanonicalSkill. A key
+seen for the first time becomes a new canonical skill, named as first
+written. Migration 0013 seeds aliases for common spellings (reactjs, k8s,
+postgres, ...); more can be added in the admin.
+
+Skill rows point at their canonical skill, and CandidateSkill indexes which
+BGV requests list each canonical skill, among their skills or in a project's
+`skill_names`. "Candidates with Python and AWS" (`with_skills()`) is then an
+indexed lookup per skill instead of a scan of every Skill row and project
+JSON list.
+
+The index is refreshed with the search documents: `search.reindex()` calls
+`index_profiles()` for every changed request.
+"""
+import re
+from collections import defaultdict
+
+from .models import BGVRequest, CandidateSkill, CanonicalSkill, Project, Skill, SkillAlias
+
+
+def skill_key(name):
+    return re.sub(r'[^a-z0-9+#]', '', str(name or '').lower())[:100]
+
+
+def resolve(names, create=True):
+    """
+    `{key: canonical skill id}` for the given skill names. Unknown keys get a
+    new canonical skill, or are left out if `create` is False.
+    """
+    spellings = {}
+    for name in names:
+        key = skill_key(name)
+        if key:
+            spellings.setdefault(key, str(name).strip()[:100])
+
+    canonical = dict(SkillAlias.objects.filter(key__in=spellings).values_list('key', 'skill_id'))
+    missing = {key: name for key, name in spellings.items() if key not in canonical}
+    if missing and create:
+        # ignore_conflicts: another request may add the same skill concurrently
+        CanonicalSkill.objects.bulk_create(
+            [CanonicalSkill(name=name) for name in set(missing.values())], ignore_conflicts=True
+        )
+        ids = dict(CanonicalSkill.objects.filter(name__in=missing.values()).values_list('name', 'id'))
+        SkillAlias.objects.bulk_create(
+            [SkillAlias(key=key, skill_id=ids[name]) for key, name in missing.items()], ignore_conflicts=True
+        )
+        canonical.update(SkillAlias.objects.filter(key__in=missing).values_list('key', 'skill_id'))
+    return canonical
+
+
+def index_profiles(bgv_request_ids):
+    """Link these requests' skills to canonical skills and rebuild their CandidateSkill rows."""
+    requests_by_profile = defaultdict(list)
+    for pk, profile_id in BGVRequest.objects.filter(
+        pk__in=bgv_request_ids, profile__isnull=False
+    ).values_list('id', 'profile_id'):
+        requests_by_profile[profile_id].append(pk)
+
+    skills = list(Skill.objects.filter(profile_id__in=requests_by_profile).values_list(
+        'id', 'profile_id', 'skill_name', 'canonical_id'
+    ))
+    listed = [(profile_id, name) for _, profile_id, name, _ in skills] + [
+        (profile_id, name)
+        for profile_id, skill_names in Project.objects.filter(
+            profile_id__in=requests_by_profile
+        ).values_list('profile_id', 'skill_names')
+        for name in skill_names or []
+    ]
+    canonical = resolve(name for _, name in listed)
+
+    changed = [
+        Skill(id=pk, canonical_id=canonical.get(skill_key(name)))
+        for pk, _, name, current in skills if canonical.get(skill_key(name)) != current
+    ]
+    if changed:
+        Skill.objects.bulk_update(changed, ['canonical'])
+
+    pairs = {
+        (bgv_request_id, canonical[skill_key(name)])
+        for profile_id, name in listed if skill_key(name) in canonical
+        for bgv_request_id in requests_by_profile[profile_id]
+    }
+    CandidateSkill.objects.filter(bgv_request_id__in=bgv_request_ids).delete()
+    CandidateSkill.objects.bulk_create(
+        [CandidateSkill(bgv_request_id=bgv_request_id, skill_id=skill_id) for bgv_request_id, skill_id in pairs],
+        ignore_conflicts=True
+    )
+
+
+def with_skills(queryset, names):
+    """The requests in `queryset` that list every one of the named skills, under any alias."""
+    keys = {skill_key(name) for name in names} - {''}
+    canonical = resolve(keys, create=False)
+    if len(canonical) < len(keys):
+        return queryset.none()
+    for skill_id in set(canonical.values()):
+        # One join per skill (chained filters on a multi-valued relation), each a lookup
+        # on the unique (skill, bgv_request) index
+        queryset = queryset.filter(skill_index__skill_id=skill_id)
+    return queryset
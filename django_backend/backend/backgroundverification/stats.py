@@ -0,0 +1,126 @@
+"""
+Recruiter dashboard aggregates.
+
+Status counts, average time in each status and daily intake are read from
+RecruiterStatusSummary and RecruiterDailyIntake, which the BGVRequest signals
+update incrementally (one or two single-row updates per change), so a
+dashboard load costs the same however many requests a recruiter has.
+
+Counts of requests pending for more than N days depend on the current time,
+so they are counted directly, on the (recruiter, status, status_changed_at)
+index; only requests currently waiting on documents are scanned.
+
+Bulk writes (`QuerySet.update()`, `bulk_create()`) skip the signals; run
+`rebuild()` (or `manage.py rebuild_bgv_stats`) after them.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import BGVRequest, RecruiterDailyIntake, RecruiterStatusSummary
+
+PENDING_OVER_DAYS = [3, 7, 14]
+INTAKE_DAYS = 30
+
+
+def _bump(model, lookup, **changes):
+    """Add `changes` to the counters of the row matching `lookup`, creating it if needed."""
+    updates = {field: F(field) + value for field, value in changes.items()}
+    if not model.objects.filter(**lookup).update(**updates):
+        model.objects.get_or_create(**lookup)
+        model.objects.filter(**lookup).update(**updates)
+
+
+def record_created(bgv_request):
+    _bump(RecruiterStatusSummary, {'recruiter_id': bgv_request.recruiter_id, 'status': bgv_request.status}, count=1)
+    _bump(
+        RecruiterDailyIntake,
+        {'recruiter_id': bgv_request.recruiter_id, 'date': timezone.localdate(bgv_request.created_at)},
+        count=1
+    )
+
+
+def record_transition(bgv_request, previous_status, previous_changed_at):
+    seconds = 0
+    if previous_changed_at is not None:
+        seconds = max(int((bgv_request.status_changed_at - previous_changed_at).total_seconds()), 0)
+    _bump(
+        RecruiterStatusSummary, {'recruiter_id': bgv_request.recruiter_id, 'status': previous_status},
+        count=-1, exits=1, seconds_in_status=seconds
+    )
+    _bump(RecruiterStatusSummary, {'recruiter_id': bgv_request.recruiter_id, 'status': bgv_request.status}, count=1)
+
+
+def record_deleted(bgv_request):
+    """
+    Take a deleted request out of the counts. Only existing rows are updated:
+    when the recruiter is deleted too, the cascade may already have removed
+    their rows, and re-creating them would point at the deleted recruiter.
+    """
+    RecruiterStatusSummary.objects.filter(
+        recruiter_id=bgv_request.recruiter_id, status=bgv_request.status
+    ).update(count=F('count') - 1)
+    RecruiterDailyIntake.objects.filter(
+        recruiter_id=bgv_request.recruiter_id, date=timezone.localdate(bgv_request.created_at)
+    ).update(count=F('count') - 1)
+
+
+def recruiter_stats(recruiter, now=None):
+    """The `/api/bgv/stats/` payload for one recruiter."""
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+
+    summaries = {row.status: row for row in RecruiterStatusSummary.objects.filter(recruiter=recruiter)}
+    status_counts = {}
+    average_seconds = {}
+    for status in BGVRequest.Status.values:
+        summary = summaries.get(status)
+        status_counts[status] = summary.count if summary else 0
+        average_seconds[status] = (
+            round(summary.seconds_in_status / summary.exits) if summary and summary.exits else None
+        )
+
+    pending = BGVRequest.objects.filter(recruiter=recruiter, status=BGVRequest.Status.DOCUMENTS_REQUESTED).aggregate(**{
+        str(days): Count('id', filter=Q(status_changed_at__lt=now - timedelta(days=days)))
+        for days in PENDING_OVER_DAYS
+    })
+
+    first_day = today - timedelta(days=INTAKE_DAYS - 1)
+    intake = dict(
+        RecruiterDailyIntake.objects.filter(recruiter=recruiter, date__gte=first_day).values_list('date', 'count')
+    )
+
+    return {
+        'total': sum(status_counts.values()),
+        'status_counts': status_counts,
+        'average_seconds_in_status': average_seconds,
+        'pending_over_days': pending,
+        'daily_intake': [
+            {'date': day.isoformat(), 'count': intake.get(day, 0)}
+            for day in (first_day + timedelta(days=n) for n in range(INTAKE_DAYS))
+        ],
+    }
+
+
+def rebuild():
+    """
+    Recompute every recruiter's summary rows from the requests themselves.
+    Time already spent in past statuses isn't recorded anywhere else, so the
+    averages keep their accumulated values.
+    """
+    with transaction.atomic():
+        RecruiterStatusSummary.objects.update(count=0)
+        for row in BGVRequest.objects.values('recruiter_id', 'status').annotate(n=Count('id')).order_by():
+            RecruiterStatusSummary.objects.update_or_create(
+                recruiter_id=row['recruiter_id'], status=row['status'], defaults={'count': row['n']}
+            )
+
+        RecruiterDailyIntake.objects.all().delete()
+        RecruiterDailyIntake.objects.bulk_create([
+            RecruiterDailyIntake(recruiter_id=row['recruiter_id'], date=row['date'], count=row['n'])
+            for row in BGVRequest.objects.annotate(date=TruncDate('created_at'))
+            .values('recruiter_id', 'date').annotate(n=Count('id')).order_by()
+        ])
@@ -0,0 +1,69 @@
+"""
+Direct-to-object-store document uploads.
+
+With USE_S3_STORAGE enabled the candidate's browser asks for a presigned POST,
+uploads PAN/Aadhaar straight to the bucket and then confirms the object names,
+so file bodies never pass through Django workers. Downloads go through the
+storage's presigned GET URLs (AWS_QUERYSTRING_EXPIRE).
+"""
+import os
+import posixpath
+import re
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+
+DOCUMENT_CONTENT_TYPES = ['image/jpeg', 'image/png', 'application/pdf']
+
+
+def supports_direct_upload():
+    return settings.USE_S3_STORAGE
+
+
+def document_prefix(bgv_request_id):
+    """Directory of the documents uploaded directly for this request."""
+    return f"documents/{bgv_request_id}/"
+
+
+def is_document_name(name, bgv_request_id, document_type):
+    """Whether `name` has the form presigned_upload() issues for this request and document type."""
+    pattern = rf"{re.escape(document_prefix(bgv_request_id))}{re.escape(document_type)}-[0-9a-f]{{32}}(\.[^/.]{{0,9}})?"
+    return re.fullmatch(pattern, name) is not None
+
+
+def presigned_upload(bgv_request_id, document_type, content_type, filename=''):
+    """
+    Create a presigned POST for one document.
+
+    Returns the storage `name` to confirm afterwards, plus the `url` and form
+    `fields` the client must send along with the file.
+    """
+    extension = os.path.splitext(filename)[1].lower()[:10]
+    name = f"{document_prefix(bgv_request_id)}{document_type}-{uuid.uuid4().hex}{extension}"
+    key = posixpath.join(default_storage.location, name) if default_storage.location else name
+
+    post = default_storage.bucket.meta.client.generate_presigned_post(
+        Bucket=default_storage.bucket_name,
+        Key=key,
+        Fields={'Content-Type': content_type},
+        Conditions=[
+            {'Content-Type': content_type},
+            ['content-length-range', 1, settings.DOCUMENT_MAX_UPLOAD_SIZE],
+        ],
+        ExpiresIn=settings.DOCUMENT_UPLOAD_URL_EXPIRY,
+    )
+    return {
+        'name': name,
+        'url': post['url'],
+        'fields': post['fields'],
+        'expires_in': settings.DOCUMENT_UPLOAD_URL_EXPIRY,
+    }
+
+
+def uploaded_size(name):
+    """Size of an uploaded object, or None if it doesn't exist."""
+    if not default_storage.exists(name):
+        return None
+    return default_storage.size(name)
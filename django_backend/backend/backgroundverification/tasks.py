@@ -5,71 +5,19 @@ import requests
 from .models import AgentLog
 
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def send_candidate_credentials(self, bgv_request_id, candidate_email, candidate_name, temp_password, agent_log_id):
+@shared_task
+def notify_admin_credential_failure(bgv_request_id, candidate_email, candidate_name, agent_log_id, error):
     """
-    Complete candidate onboarding via AI agent.
-
-    This calls a UNIFIED workflow that:
-    - Sends login credentials to the candidate
-    - Requests required documents (PAN Card, Aadhaar Card)
-    - Updates BGV status to 'documents_requested'
-    All in ONE personalized email.
+    Alert an admin that onboarding email delivery gave up (see the
+    `credentials.dispatch` outbox handler). The temporary password is never
+    included; the admin issues a new one when onboarding the candidate by hand.
     """
     try:
-        response = requests.post(
-            f"{settings.FASTAPI_AGENT_URL}/agent/send-credentials",
-            json={
-                'bgv_request_id': bgv_request_id,
-                'candidate_email': candidate_email,
-                'candidate_name': candidate_name,
-                'temp_password': temp_password
-            },
-            timeout=200  
-        )
-
-        response.raise_for_status()
-
-        log = AgentLog.objects.get(id=agent_log_id)
-        log.metadata['credentials_sent'] = True
-        log.metadata['sent_via'] = 'agent_service'
-        log.save()
-
-        return {
-            'status': 'success',
-            'bgv_request_id': bgv_request_id,
-            'message': 'Credentials sent via agent service'
-        }
-
-    except Exception as exc:
-        if self.request.retries < self.max_retries:
-            raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
-        else:
-            notify_admin_credential_failure.delay(
-                bgv_request_id=bgv_request_id,
-                candidate_email=candidate_email,
-                candidate_name=candidate_name,
-                temp_password=temp_password,
-                agent_log_id=agent_log_id,
-                error=str(exc)
-            )
-
-            return {
-                'status': 'failed',
-                'bgv_request_id': bgv_request_id,
-                'error': str(exc),
-                'message': 'Admin notified'
-            }
-
-
-@shared_task
-def notify_admin_credential_failure(bgv_request_id, candidate_email, candidate_name, temp_password, agent_log_id, error):
-    try:
-        log = AgentLog.objects.get(id=agent_log_id)
-        log.metadata['credentials_sent'] = False
-        log.metadata['failure_reason'] = error
-        log.metadata['admin_notified'] = True
-        log.save()
+        AgentLog.objects.merge_metadata(agent_log_id, {
+            'credentials_sent': False,
+            'failure_reason': error,
+            'admin_notified': True
+        })
     except AgentLog.DoesNotExist:
         pass
 
@@ -87,7 +35,8 @@ Email: {candidate_email}
 Error: {error}
 
 MANUAL ACTION REQUIRED:
-Please manually send the following credentials to the candidate:
+Please reset the candidate's password in the admin and send them the following,
+with the new temporary password filled in:
 
 ---
 Subject: Your Login Credentials for Background Verification
@@ -98,7 +47,7 @@ Please use the following credentials to login and upload your documents:
 
 Login URL: {settings.FRONTEND_URL}/login
 Email: {candidate_email}
-Temporary Password: {temp_password}
+Temporary Password: <new temporary password>
 
 (Please change your password after first login)
 
@@ -131,49 +80,125 @@ This is an automated alert from TraqCheck BGV System.
 def check_pending_document_requests():
     """
     Periodic task to check for pending document requests.
-    Sends automated reminders via FastAPI agent if documents not submitted after 3 days.
+    Sends automated reminders via FastAPI agent if documents not submitted after 3 days,
+    with the reminder context (days pending, previous reminders, urgency) precomputed.
     Runs daily via Celery Beat.
     """
-    from datetime import datetime, timedelta
-    from .models import BGVRequest
-
-    # Find pending requests older than 3 days
-    cutoff_date = datetime.now() - timedelta(days=3)
-
-    pending_requests = BGVRequest.objects.filter(
-        status='documents_requested',
-        created_at__lt=cutoff_date
-    )
+    from django.utils import timezone
+    from .reminders import due_reminders, reminder_context
 
+    today = timezone.localdate()
+    total_pending = 0
     reminder_count = 0
 
-    for bgv_request in pending_requests:
-        # Check if reminder already sent in last 48 hours
-        recent_reminders = AgentLog.objects.filter(
-            bgv_request=bgv_request,
-            action='reminder_sent',
-            created_at__gte=datetime.now() - timedelta(hours=48)
-        ).exists()
-
-        if not recent_reminders:
-            # Call FastAPI to send reminder
-            try:
-                response = requests.post(
-                    f"{settings.FASTAPI_AGENT_URL}/agent/send-reminder",
-                    json={
-                        'bgv_request_id': bgv_request.id,
-                        'trigger': 'automated'
-                    },
-                    timeout=200  # 1 minute timeout for agent execution
-                )
-                response.raise_for_status()
-                reminder_count += 1
-            except Exception as e:
-                # Log error but continue with other requests
-                print(f"Failed to send reminder for BGV #{bgv_request.id}: {e}")
+    for row, due in due_reminders():
+        total_pending += 1
+        if not due:
+            continue
+
+        # Call FastAPI to send reminder
+        try:
+            response = requests.post(
+                f"{settings.FASTAPI_AGENT_URL}/agent/send-reminder",
+                json={
+                    'bgv_request_id': row['id'],
+                    'trigger': 'automated',
+                    'context': reminder_context(row, today)
+                },
+                # At most one automated reminder per request per day, even if the sweep reruns
+                headers={'Idempotency-Key': f"reminder:{row['id']}:{today}"},
+                timeout=30  # the agent accepts the reminder as a job and answers right away
+            )
+            response.raise_for_status()
+            reminder_count += 1
+        except Exception as e:
+            # Log error but continue with other requests
+            print(f"Failed to send reminder for BGV #{row['id']}: {e}")
 
     return {
         'status': 'completed',
-        'total_pending': pending_requests.count(),
+        'total_pending': total_pending,
         'reminders_sent': reminder_count
     }
+
+
+@shared_task
+def expire_document_upload_sessions():
+    """
+    Periodic task to drop resumable upload sessions (and their part files) that
+    have not been touched for DOCUMENT_UPLOAD_SESSION_TTL_HOURS.
+    Runs hourly via Celery Beat.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from .models import DocumentUploadSession
+    from .uploads import discard_part
+
+    cutoff = timezone.now() - timedelta(hours=settings.DOCUMENT_UPLOAD_SESSION_TTL_HOURS)
+    stale_sessions = list(DocumentUploadSession.objects.filter(updated_at__lt=cutoff).only('id'))
+
+    for session in stale_sessions:
+        discard_part(session)
+    DocumentUploadSession.objects.filter(id__in=[session.id for session in stale_sessions]).delete()
+
+    return {
+        'status': 'completed',
+        'expired_sessions': len(stale_sessions)
+    }
+
+
+@shared_task
+def expire_idempotency_receipts():
+    """
+    Periodic task to forget document submission Idempotency-Keys older than
+    IDEMPOTENCY_RECEIPT_TTL_HOURS. Runs hourly via Celery Beat.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from .models import IdempotencyReceipt
+
+    cutoff = timezone.now() - timedelta(hours=settings.IDEMPOTENCY_RECEIPT_TTL_HOURS)
+    deleted, _ = IdempotencyReceipt.objects.filter(created_at__lt=cutoff).delete()
+
+    return {
+        'status': 'completed',
+        'expired_receipts': deleted
+    }
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def process_document(self, document_id):
+    """
+    Compress a submitted document, generate its preview thumbnail and record its
+    content hash and sizes. Queued once the submission transaction commits.
+    """
+    from .documents import postprocess
+    from .models import Document
+
+    try:
+        document = Document.objects.get(pk=document_id)
+    except Document.DoesNotExist:
+        return {'status': 'skipped', 'document_id': document_id, 'reason': 'not found'}
+
+    if document.processed_at:
+        return {'status': 'skipped', 'document_id': document_id, 'reason': 'already processed'}
+
+    try:
+        result = postprocess(document)
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+    if result.get('stale'):
+        return {'status': 'skipped', 'document_id': document_id, 'reason': 'replaced during processing'}
+    return {'status': 'success', 'document_id': document_id, **result}
+
+
+@shared_task
+def relay_outbox():
+    """
+    Deliver pending outbox events. Kicked after each commit that emits an event,
+    and run every OUTBOX_RELAY_INTERVAL seconds via Celery Beat as a fallback.
+    """
+    from .outbox import relay
+
+    return {'status': 'completed', **relay()}
@@ -1,3 +1,1076 @@
-from django.test import TestCase
+import base64
+import hashlib
+import json
+import shutil
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from botocore.exceptions import ClientError
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from storages.backends.s3 import S3Storage
+
+from authentication.models import CustomUser
+from authentication.renderers import astream_envelope, stream_envelope
+from authentication.websocket import JWTAuthMiddleware
+from .models import (
+    BGVRequest, WorkExperience, Education, Skill, Project, Document, AgentLog, ProfileSnapshot, DocumentUploadSession,
+    OutboxEvent, RecruiterDailyIntake, RecruiterStatusSummary
+)
+from . import outbox, profiles, reminders, search, skills, stats
+from .projections import format_datetime, list_rows, detail_payload
+from .routing import websocket_urlpatterns
+from .serializers import DETAIL_PREFETCH, BGVRequestListSerializer, BGVRequestDetailSerializer, DocumentConfirmSerializer
+
+# Redis isn't available under test: in-process backends, so the cache and channel layer code actually runs
+in_memory_backends = override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+)
+
+
+@in_memory_backends
+class ProjectionParityTests(TestCase):
+    """The `.values()` read path must render byte-for-byte like the ModelSerializers."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.recruiter = CustomUser.objects.create_user(
+            'recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER, full_name='Rita Recruiter'
+        )
+        self.candidate = CustomUser.objects.create_user(
+            'candidate@example.com', 'password', role=CustomUser.Role.CANDIDATE
+        )
+        profile = ProfileSnapshot.objects.create(digest='0' * 64)
+        self.bgv_request = BGVRequest.objects.create(
+            user=self.candidate,
+            profile=profile,
+            recruiter=self.recruiter,
+            first_name='Asha',
+            last_name='Rao',
+            email='candidate@example.com',
+            date_of_birth=date(1994, 5, 17),
+            marital_status=None,
+            role='Engineer',
+            total_work_experience=6,
+            resume_file=SimpleUploadedFile('resume.pdf', b'%PDF-1.4'),
+        )
+        BGVRequest.objects.create(user=self.candidate, recruiter=self.recruiter, email='other@example.com')
+        WorkExperience.objects.create(
+            profile=profile, role='Engineer', company_name='Acme', start_date=date(2018, 1, 1)
+        )
+        WorkExperience.objects.create(profile=profile, role='Intern', company_name='Initech')
+        Education.objects.create(profile=profile, degree='B.Tech', institute='IIT', gpa='8.4')
+        Skill.objects.create(profile=profile, skill_name='Python', years_of_experience=4)
+        Project.objects.create(profile=profile, name='Search', link=None, skill_names=['Python'])
+        Document.objects.create(
+            bgv_request=self.bgv_request,
+            document_type=Document.DocumentType.PAN,
+            file=SimpleUploadedFile('pan.jpg', b'\xff\xd8pan'),
+        )
+        AgentLog.objects.create(
+            bgv_request=self.bgv_request,
+            action=AgentLog.Action.ANALYSIS,
+            message='Candidate account created',
+            metadata={'temp_password': 'secret', 'credentials_sent': True},
+        )
+
+    def make_request(self, user=None, auth=None):
+        request = Request(APIRequestFactory().get('/api/bgv/'))
+        request.user = user
+        request.auth = auth
+        return request
+
+    def expected_detail(self, request):
+        # Child writes touch the parent's updated_at, so read it back fresh
+        bgv_request = BGVRequest.objects.get(pk=self.bgv_request.pk)
+        return BGVRequestDetailSerializer(bgv_request, context={'request': request}).data
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_list_matches_serializer(self):
+        queryset = BGVRequest.objects.filter(recruiter=self.recruiter)
+        expected = BGVRequestListSerializer(queryset, many=True).data
+        self.assertEqual(self.render(list(list_rows(queryset))), self.render(expected))
+
+    def test_detail_matches_serializer(self):
+        request = self.make_request(user=self.recruiter)
+        expected = self.expected_detail(request)
+        payload = detail_payload(BGVRequest.objects.all(), self.bgv_request.pk, request)
+        self.assertEqual(self.render(payload), self.render(expected))
+        self.assertNotIn('temp_password', payload['agent_logs'][0]['metadata'])
+
+    def test_detail_without_profile_matches_serializer(self):
+        request = self.make_request(user=self.recruiter)
+        other = BGVRequest.objects.get(email='other@example.com')
+        expected = BGVRequestDetailSerializer(other, context={'request': request}).data
+        payload = detail_payload(BGVRequest.objects.all(), other.pk, request)
+        self.assertEqual(self.render(payload), self.render(expected))
+        self.assertEqual(payload['skills'], [])
+
+    def test_detail_keeps_temp_password_for_service(self):
+        request = self.make_request(auth='fastapi_agent_service')
+        expected = self.expected_detail(request)
+        payload = detail_payload(BGVRequest.objects.all(), self.bgv_request.pk, request)
+        self.assertEqual(self.render(payload), self.render(expected))
+        self.assertEqual(payload['agent_logs'][0]['metadata']['temp_password'], 'secret')
+
+    def test_detail_outside_queryset(self):
+        queryset = BGVRequest.objects.filter(recruiter=self.candidate)
+        self.assertIsNone(detail_payload(queryset, self.bgv_request.pk, self.make_request(user=self.candidate)))
+
+
+@in_memory_backends
+class DocumentConfirmTests(TestCase):
+    """Confirmed object names are checked against the request, the document type and the bucket."""
+
+    def setUp(self):
+        recruiter = CustomUser.objects.create_user('recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER)
+        candidate = CustomUser.objects.create_user('candidate@example.com', 'password', role=CustomUser.Role.CANDIDATE)
+        self.bgv_request = BGVRequest.objects.create(user=candidate, recruiter=recruiter, email='candidate@example.com')
+        self.pan_name = f'documents/{self.bgv_request.id}/pan-{"a" * 32}.jpg'
+
+        storage = S3Storage(bucket_name='bgv', access_key='key', secret_key='secret', region_name='us-east-1')
+        self.objects = {}
+        patcher = mock.patch.object(storage.connection.meta.client, 'head_object', side_effect=self.head_object)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        storage_patcher = mock.patch('backgroundverification.storage.default_storage', storage)
+        storage_patcher.start()
+        self.addCleanup(storage_patcher.stop)
+
+    def head_object(self, Bucket, Key, **kwargs):
+        if Key not in self.objects:
+            raise ClientError({'Error': {'Code': '404'}, 'ResponseMetadata': {'HTTPStatusCode': 404}}, 'HeadObject')
+        return {'ContentLength': self.objects[Key], 'ResponseMetadata': {'HTTPStatusCode': 200}}
+
+    def confirm(self, *documents):
+        return DocumentConfirmSerializer(
+            data={'documents': [{'document_type': document_type, 'name': name} for document_type, name in documents]},
+            context={'bgv_request': self.bgv_request}
+        )
+
+    def test_uploaded_document_is_accepted(self):
+        self.objects[self.pan_name] = 2048
+        self.assertTrue(self.confirm(('pan', self.pan_name)).is_valid())
+
+    def test_name_of_another_document_type_is_rejected(self):
+        self.objects[self.pan_name] = 2048
+        self.assertFalse(self.confirm(('aadhaar', self.pan_name)).is_valid())
+
+    def test_name_of_another_request_is_rejected(self):
+        name = f'documents/{self.bgv_request.id + 1}/pan-{"a" * 32}.jpg'
+        self.objects[name] = 2048
+        self.assertFalse(self.confirm(('pan', name)).is_valid())
+
+    def test_missing_object_is_rejected(self):
+        serializer = self.confirm(('pan', self.pan_name))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('not uploaded', str(serializer.errors))
+
+    @override_settings(DOCUMENT_MAX_UPLOAD_SIZE=1024)
+    def test_oversized_object_is_rejected(self):
+        self.objects[self.pan_name] = 2048
+        serializer = self.confirm(('pan', self.pan_name))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('too large', str(serializer.errors))
+
+
+@in_memory_backends
+class DocumentSubmissionTests(TestCase):
+    """Resubmitting a document type replaces that document in place; Idempotency-Key retries replay."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        recruiter = CustomUser.objects.create_user('recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER)
+        candidate = CustomUser.objects.create_user('candidate@example.com', 'password', role=CustomUser.Role.CANDIDATE)
+        self.bgv_request = BGVRequest.objects.create(user=candidate, recruiter=recruiter, email='candidate@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(candidate)
+        self.queue_processing = self.patch('backgroundverification.documents.queue_processing')
+        self.patch('backgroundverification.outbox.kick_relay')
+
+    def patch(self, target):
+        patcher = mock.patch(target)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def submit(self, content, key=None, **files):
+        url = f'/api/bgv/{self.bgv_request.id}/submit-documents/'
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, {
+                document_type: SimpleUploadedFile(name, content) for document_type, name in files.items()
+            }, format='multipart', **headers)
+
+    def test_resubmitted_type_is_upserted(self):
+        self.assertEqual(self.submit(b'first pan', pan='pan.pdf').status_code, 200)
+        first = Document.objects.get(bgv_request=self.bgv_request)
+        storage = first.file.storage
+        self.assertTrue(storage.exists(first.file.name))
+
+        self.assertEqual(self.submit(b'second pan', pan='pan.pdf', aadhaar='aadhaar.pdf').status_code, 200)
+        pan = Document.objects.get(bgv_request=self.bgv_request, document_type=Document.DocumentType.PAN)
+        self.assertEqual(pan.pk, first.pk)
+        self.assertEqual(pan.file.read(), b'second pan')
+        self.assertEqual(Document.objects.filter(bgv_request=self.bgv_request).count(), 2)
+        # The replaced file is deleted once the upsert commits
+        self.assertFalse(storage.exists(first.file.name))
+        self.assertEqual(
+            list(OutboxEvent.objects.filter(topic='documents.submitted').values_list('payload', flat=True)),
+            [{'document_types': ['pan']}, {'document_types': ['aadhaar', 'pan']}]
+        )
+
+    def test_retry_with_the_same_key_is_replayed(self):
+        self.assertEqual(self.submit(b'pan', key='submit-1', pan='pan.pdf').status_code, 200)
+        retry = self.submit(b'pan', key='submit-1', pan='pan.pdf')
+        self.assertEqual((retry.status_code, retry['Idempotent-Replayed']), (200, 'true'))
+        self.assertEqual(Document.objects.count(), 1)
+        self.assertEqual(self.queue_processing.call_count, 1)
+
+        self.assertEqual(self.submit(b'aadhaar', key='submit-1', aadhaar='aadhaar.pdf').status_code, 422)
+
+
+@in_memory_backends
+class UploadSessionTests(TestCase):
+    """Resumable uploads: resuming at the server's offset, rejected chunks and whole-file checksums."""
+
+    content = b'%PDF-1.4 ' + bytes(range(256)) * 8
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.temp_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(
+            MEDIA_ROOT=f'{cls.temp_root}/media', DOCUMENT_UPLOAD_TEMP_DIR=f'{cls.temp_root}/uploads'
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.temp_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        recruiter = CustomUser.objects.create_user('recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER)
+        candidate = CustomUser.objects.create_user('candidate@example.com', 'password', role=CustomUser.Role.CANDIDATE)
+        self.bgv_request = BGVRequest.objects.create(user=candidate, recruiter=recruiter, email='candidate@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(candidate)
+
+    def open_session(self, checksum=None, filename='pan.pdf'):
+        response = self.client.post(f'/api/bgv/{self.bgv_request.id}/uploads/', {
+            'document_type': 'pan',
+            'filename': filename,
+            'content_type': 'application/pdf',
+            'total_size': len(self.content),
+            'checksum': hashlib.sha256(self.content).hexdigest() if checksum is None else checksum,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['data']['id']
+
+    def send(self, session_id, offset, chunk, checksum=None):
+        headers = {'HTTP_UPLOAD_OFFSET': str(offset)}
+        if checksum is not None:
+            headers['HTTP_UPLOAD_CHECKSUM'] = f'sha256 {base64.b64encode(checksum).decode()}'
+        return self.client.generic(
+            'PATCH', f'/api/bgv/uploads/{session_id}/', chunk, content_type='application/offset+octet-stream', **headers
+        )
+
+    def finalize(self, session_id):
+        return self.client.post(f'/api/bgv/uploads/{session_id}/finalize/')
+
+    def test_resume_from_reported_offset(self):
+        session_id = self.open_session()
+        self.assertEqual(self.send(session_id, 0, self.content[:1000]).status_code, 200)
+
+        offset = int(self.client.head(f'/api/bgv/uploads/{session_id}/')['Upload-Offset'])
+        self.assertEqual(offset, 1000)
+        response = self.send(session_id, offset, self.content[offset:], hashlib.sha256(self.content[offset:]).digest())
+        self.assertEqual(response.status_code, 200, response.content)
+
+        with self.captureOnCommitCallbacks(execute=True), mock.patch('backgroundverification.tasks.process_document.delay'):
+            self.assertEqual(self.finalize(session_id).status_code, 200)
+        document = Document.objects.get(bgv_request=self.bgv_request)
+        with document.file.open('rb') as fh:
+            self.assertEqual(fh.read(), self.content)
+        self.assertEqual(list(Path(f'{self.temp_root}/uploads').glob(f'{session_id}*')), [])
+
+    def test_offset_mismatch_is_rejected(self):
+        session_id = self.open_session()
+        self.send(session_id, 0, self.content[:1000])
+
+        for offset in (0, 1500):
+            response = self.send(session_id, offset, self.content[offset:offset + 100])
+            self.assertEqual(response.status_code, 409)
+            self.assertEqual(response['Upload-Offset'], '1000')
+        self.assertEqual(DocumentUploadSession.objects.get(pk=session_id).received_size, 1000)
+
+    def test_chunk_checksum_mismatch_keeps_offset(self):
+        session_id = self.open_session()
+        response = self.send(session_id, 0, self.content[:1000], hashlib.sha256(b'other').digest())
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Upload-Offset'], '0')
+        self.assertEqual(self.send(session_id, 0, self.content[:1000]).status_code, 200)
+
+    def test_file_checksum_mismatch_restarts_upload(self):
+        session_id = self.open_session(checksum='0' * 64)
+        self.send(session_id, 0, self.content)
+
+        response = self.finalize(session_id)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Upload-Offset'], '0')
+        self.assertFalse(Document.objects.filter(bgv_request=self.bgv_request).exists())
+
+    def test_filename_is_reduced_to_base_name(self):
+        session_id = self.open_session(filename='../../etc/scans\\pan.pdf')
+        self.assertEqual(DocumentUploadSession.objects.get(pk=session_id).filename, 'pan.pdf')
+        self.send(session_id, 0, self.content)
+        self.assertEqual(self.finalize(session_id).status_code, 200)
+
+
+@in_memory_backends
+class OutboxRelayTests(TransactionTestCase):
+    """Events are claimed in a short transaction and handled outside of one."""
+
+    def setUp(self):
+        self.event = OutboxEvent.objects.create(topic='test.topic')
+
+    def relay_with(self, func):
+        with mock.patch.dict(outbox.HANDLERS, {'test.topic': func}):
+            return outbox.relay()
+
+    def test_handler_runs_outside_transaction_on_leased_event(self):
+        def handle(event):
+            self.assertFalse(connection.in_atomic_block)
+            claimed = OutboxEvent.objects.get(pk=event.pk)
+            self.assertEqual(claimed.attempts, 1)
+            self.assertGreater(claimed.available_at, timezone.now())
+            # Claimed events aren't handed to another relay
+            self.assertEqual(outbox.claim(10), ([], 0))
+
+        self.assertEqual(self.relay_with(handle), {'dispatched': 1, 'failed': 0})
+        self.assertEqual(OutboxEvent.objects.get(pk=self.event.pk).status, OutboxEvent.Status.DISPATCHED)
+
+    def test_job_id_is_committed_before_the_callback(self):
+        client = Client(HTTP_X_SERVICE_SECRET=settings.DJANGO_SERVICE_SECRET)
+        callback = {
+            'job_id': 'job-1', 'kind': 'test', 'status': 'succeeded', 'bgv_request_id': 0,
+            'callback_ref': outbox.callback_ref(self.event),
+        }
+
+        def handle(event):
+            # The agent finishes the job before the relay has recorded it
+            response = client.post('/api/bgv/agent-jobs/callback/', callback, content_type='application/json')
+            self.assertEqual(response.status_code, 409)
+            return 'job-1'
+
+        self.relay_with(handle)
+        self.assertEqual(OutboxEvent.objects.get(pk=self.event.pk).payload['job_id'], 'job-1')
+        # The agent's retry is applied
+        with mock.patch.dict(outbox.COMPLETION_HANDLERS, {'test.topic': mock.Mock()}):
+            response = client.post('/api/bgv/agent-jobs/callback/', callback, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(OutboxEvent.objects.get(pk=self.event.pk).status, OutboxEvent.Status.DISPATCHED)
+
+    @override_settings(OUTBOX_RETRY_BASE_DELAY=60)
+    def test_failed_delivery_is_retried_after_backoff(self):
+        def handle(event):
+            raise ConnectionError('agent unreachable')
+
+        self.assertEqual(self.relay_with(handle), {'dispatched': 0, 'failed': 1})
+        event = OutboxEvent.objects.get(pk=self.event.pk)
+        self.assertEqual((event.status, event.attempts), (OutboxEvent.Status.PENDING, 1))
+        self.assertIn('agent unreachable', event.last_error)
+        self.assertGreater(event.available_at, timezone.now() + timedelta(seconds=50))
+
+
+@in_memory_backends
+class AgentJobCallbackTests(TestCase):
+    """Agent job callbacks settle the event waiting on the job; overdue jobs count as failed attempts."""
+
+    def setUp(self):
+        self.client = Client(HTTP_X_SERVICE_SECRET=settings.DJANGO_SERVICE_SECRET)
+        self.event = OutboxEvent.objects.create(
+            topic='test.topic', status=OutboxEvent.Status.ACCEPTED, attempts=1, secret='password',
+            payload={'job_id': 'job-1'}, available_at=timezone.now() + timedelta(minutes=15)
+        )
+        self.on_complete = mock.Mock()
+        self.on_failure = mock.Mock()
+        for registry, func in [
+            (outbox.HANDLERS, mock.Mock()),
+            (outbox.COMPLETION_HANDLERS, self.on_complete),
+            (outbox.FAILURE_HANDLERS, self.on_failure),
+        ]:
+            patcher = mock.patch.dict(registry, {'test.topic': func})
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def report(self, job_id='job-1', job_status='succeeded'):
+        return self.client.post('/api/bgv/agent-jobs/callback/', {
+            'job_id': job_id, 'kind': 'test', 'status': job_status, 'bgv_request_id': 0,
+            'callback_ref': outbox.callback_ref(self.event), 'result': {'sent': True},
+        }, content_type='application/json')
+
+    def refresh(self):
+        return OutboxEvent.objects.get(pk=self.event.pk)
+
+    def test_succeeded_job_dispatches_event(self):
+        response = self.report()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['event_status'], OutboxEvent.Status.DISPATCHED)
+        self.assertEqual(self.refresh().secret, '')
+        self.on_complete.assert_called_once()
+        self.assertEqual(self.on_complete.call_args.args[1], {'sent': True})
+
+    def test_failed_job_schedules_retry(self):
+        self.assertEqual(self.report(job_status='failed').status_code, 200)
+        event = self.refresh()
+        self.assertEqual(event.status, OutboxEvent.Status.PENDING)
+        self.assertEqual(event.secret, 'password')
+
+    def test_late_or_repeated_callbacks_are_ignored(self):
+        self.assertEqual(self.report(job_id='job-0').json()['message'], 'Callback ignored')
+        self.assertEqual(self.report().json()['message'], 'Callback applied')
+        self.assertEqual(self.report().json()['message'], 'Callback ignored')
+        self.on_complete.assert_called_once()
+
+    def test_callback_for_pending_event_is_retryable(self):
+        OutboxEvent.objects.filter(pk=self.event.pk).update(status=OutboxEvent.Status.PENDING, payload={})
+        self.assertEqual(self.report().status_code, 409)
+        self.assertEqual(self.refresh().status, OutboxEvent.Status.PENDING)
+
+    def test_overdue_callback_is_retried_after_backoff(self):
+        OutboxEvent.objects.filter(pk=self.event.pk).update(available_at=timezone.now())
+        self.assertEqual(outbox.relay(), {'dispatched': 0, 'failed': 1})
+        event = self.refresh()
+        self.assertEqual((event.status, event.attempts), (OutboxEvent.Status.PENDING, 1))
+        self.assertGreater(event.available_at, timezone.now())
+        self.assertIn('No callback', event.last_error)
+        outbox.HANDLERS['test.topic'].assert_not_called()
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=3)
+    def test_overdue_callback_fails_for_good_at_max_attempts(self):
+        OutboxEvent.objects.filter(pk=self.event.pk).update(available_at=timezone.now(), attempts=3)
+        outbox.relay()
+        event = self.refresh()
+        self.assertEqual(event.status, OutboxEvent.Status.FAILED)
+        self.assertEqual(event.secret, '')
+        self.on_failure.assert_called_once()
+
+
+@in_memory_backends
+class CredentialsDispatchTests(TestCase):
+    """New candidates get one credentials.dispatch per dedup key, redelivered under the same Idempotency-Key."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        recruiter = CustomUser.objects.create_user('recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER)
+        self.client = APIClient()
+        self.client.force_authenticate(recruiter)
+        patcher = mock.patch('backgroundverification.outbox.kick_relay')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self, content=b'%PDF-1.4 resume'):
+        with mock.patch('backgroundverification.views.parse_resume_file') as parse:
+            parse.return_value = {'status': 'success', 'data': {
+                'firstName': 'Asha', 'lastName': 'Rao', 'email': 'asha@example.com'
+            }}
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    '/api/bgv/upload/', {'file': SimpleUploadedFile('resume.pdf', content)}, format='multipart'
+                )
+        self.assertEqual(response.status_code, 201, response.content)
+        return BGVRequest.objects.get(pk=response.json()['data']['bgv_request']['id'])
+
+    def test_repeated_upload_emits_one_event_per_dedup_key(self):
+        first = self.upload()
+        password = CustomUser.objects.get(email='asha@example.com').password
+        second = self.upload()
+        events = OutboxEvent.objects.filter(topic='credentials.dispatch')
+        self.assertEqual(list(events.values_list('dedup_key', flat=True)), [f'credentials:{first.id}'])
+
+        # The candidate's account is reused as it is
+        self.assertEqual(CustomUser.objects.get(email='asha@example.com').password, password)
+        self.assertEqual(
+            list(second.agent_logs.values_list('metadata', flat=True)),
+            [{'user_created': False, 'candidate_email': 'asha@example.com'}]
+        )
+
+        # Emitting under a key that's already queued hands back the queued event
+        event = events.get(bgv_request=first)
+        with transaction.atomic():
+            self.assertEqual(outbox.emit('credentials.dispatch', first, dedup_key=event.dedup_key), event)
+        self.assertEqual(events.filter(bgv_request=first).count(), 1)
+
+    def test_redelivery_reuses_the_idempotency_key(self):
+        event = OutboxEvent.objects.get(bgv_request=self.upload(), topic='credentials.dispatch')
+        self.assertTrue(event.secret)
+        with mock.patch('backgroundverification.outbox.requests.post') as post:
+            post.return_value.json.return_value = {'job_id': 'job-1'}
+            outbox.dispatch_credentials(event)
+            outbox.dispatch_credentials(event)
+        self.assertEqual(
+            [call.kwargs['headers'] for call in post.call_args_list],
+            [{'Idempotency-Key': f'credentials:{event.bgv_request_id}'}] * 2
+        )
+        self.assertEqual(post.call_args.kwargs['json']['temp_password'], event.secret)
+
+
+@in_memory_backends
+class RecruiterStatsDeleteTests(TestCase):
+    """Deletes take requests out of the summary rows without re-creating rows for a deleted recruiter."""
+
+    def setUp(self):
+        self.recruiter = CustomUser.objects.create_user(
+            'recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER
+        )
+        self.other_recruiter = CustomUser.objects.create_user(
+            'other@example.com', 'password', role=CustomUser.Role.RECRUITER
+        )
+        self.candidate = CustomUser.objects.create_user(
+            'candidate@example.com', 'password', role=CustomUser.Role.CANDIDATE
+        )
+        self.bgv_request = BGVRequest.objects.create(
+            user=self.candidate, recruiter=self.recruiter, email='candidate@example.com'
+        )
+        BGVRequest.objects.create(user=self.candidate, recruiter=self.recruiter, email='candidate@example.com')
+        BGVRequest.objects.create(user=self.candidate, recruiter=self.other_recruiter, email='candidate@example.com')
+
+    def intake_today(self, recruiter):
+        return stats.recruiter_stats(recruiter)['daily_intake'][-1]['count']
+
+    def test_deleting_a_request_decrements_its_counts(self):
+        self.bgv_request.delete()
+        self.assertEqual(stats.recruiter_stats(self.recruiter)['status_counts'][self.bgv_request.status], 1)
+        self.assertEqual(self.intake_today(self.recruiter), 1)
+        self.assertEqual(stats.recruiter_stats(self.other_recruiter)['total'], 1)
+
+    def test_deleting_the_recruiter_drops_their_rows(self):
+        recruiter_id = self.recruiter.pk
+        self.recruiter.delete()
+        connection.check_constraints()
+        self.assertFalse(RecruiterStatusSummary.objects.filter(recruiter_id=recruiter_id).exists())
+        self.assertFalse(RecruiterDailyIntake.objects.filter(recruiter_id=recruiter_id).exists())
+        self.assertEqual(stats.recruiter_stats(self.other_recruiter)['total'], 1)
+
+    def test_deleting_the_candidate_decrements_recruiter_counts(self):
+        self.candidate.delete()
+        connection.check_constraints()
+        self.assertEqual(stats.recruiter_stats(self.recruiter)['total'], 0)
+        self.assertEqual(self.intake_today(self.other_recruiter), 0)
+
+
+@in_memory_backends
+class ReminderContextTests(TestCase):
+    """Reminder context: calendar days pending, urgency tiers and reminder stats from one query."""
+
+    def setUp(self):
+        recruiter = CustomUser.objects.create_user('recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER)
+        candidate = CustomUser.objects.create_user('candidate@example.com', 'password', role=CustomUser.Role.CANDIDATE)
+        self.bgv_request = BGVRequest.objects.create(
+            user=candidate, recruiter=recruiter, email='candidate@example.com', first_name='Asha', last_name='Rao',
+            status=BGVRequest.Status.DOCUMENTS_REQUESTED
+        )
+
+    def context(self, days_pending):
+        """Reminder context of the request as if created `days_pending` calendar days ago."""
+        created_at = timezone.now() - timedelta(days=days_pending)
+        BGVRequest.objects.filter(pk=self.bgv_request.pk).update(created_at=created_at)
+        row = reminders.with_reminder_stats(BGVRequest.objects.filter(pk=self.bgv_request.pk)).get()
+        return reminders.reminder_context(row, today=timezone.localdate(created_at) + timedelta(days=days_pending))
+
+    def test_urgency_tiers_change_at_6_and_11_days(self):
+        tiers = {days: self.context(days)['urgency'] for days in [0, 5, 6, 10, 11, 30]}
+        self.assertEqual(tiers, {0: 'gentle', 5: 'gentle', 6: 'firm', 10: 'firm', 11: 'urgent', 30: 'urgent'})
+        self.assertEqual(self.context(6)['days_pending'], 6)
+
+    def test_only_sent_reminders_are_counted(self):
+        AgentLog.objects.create(bgv_request=self.bgv_request, action=AgentLog.Action.ANALYSIS, message='Analysed')
+        self.assertEqual((self.context(4)['reminder_count'], self.context(4)['last_reminder_at']), (0, None))
+
+        for _ in range(2):
+            reminder = AgentLog.objects.create(
+                bgv_request=self.bgv_request, action=AgentLog.Action.REMINDER_SENT, message='Reminder sent'
+            )
+        context = self.context(4)
+        self.assertEqual(context['reminder_count'], 2)
+        self.assertEqual(context['last_reminder_at'], format_datetime(reminder.created_at))
+        self.assertEqual(
+            (context['candidate_name'], context['candidate_email'], context['status']),
+            ('Asha Rao', 'candidate@example.com', BGVRequest.Status.DOCUMENTS_REQUESTED)
+        )
+
+    def test_recently_reminded_requests_are_not_due(self):
+        self.context(2)
+        self.assertEqual(list(reminders.due_reminders()), [])
+
+        self.context(4)
+        self.assertEqual([due for _, due in reminders.due_reminders()], [True])
+        AgentLog.objects.create(bgv_request=self.bgv_request, action=AgentLog.Action.REMINDER_SENT, message='Reminder sent')
+        self.assertEqual([due for _, due in reminders.due_reminders()], [False])
+        self.assertEqual(
+            [due for _, due in reminders.due_reminders(now=timezone.now() + reminders.REMINDER_INTERVAL)], [True]
+        )
+
+
+@in_memory_backends
+class CandidateSearchTests(TestCase):
+    """Text search (prefix terms, all required, per recruiter) and the skill filter (any alias, all required)."""
+
+    def setUp(self):
+        self.recruiter = CustomUser.objects.create_user(
+            'recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER
+        )
+        self.other_recruiter = CustomUser.objects.create_user(
+            'other@example.com', 'password', role=CustomUser.Role.RECRUITER
+        )
+        self.candidate = CustomUser.objects.create_user(
+            'candidate@example.com', 'password', role=CustomUser.Role.CANDIDATE
+        )
+        self.asha = self.make_request('Asha', 'Rao', ['Python', 'ReactJS'], company='Acme')
+        self.ravi = self.make_request('Ravi', 'Rao', ['python3'], company='Initech', project_skills=['K8s'])
+        self.other_asha = self.make_request('Asha', 'Rao', ['Python', 'ReactJS'], recruiter=self.other_recruiter)
+        self.client = APIClient()
+        self.client.force_authenticate(self.recruiter)
+
+    def make_request(self, first_name, last_name, skill_names, company=None, project_skills=None, recruiter=None):
+        recruiter = recruiter or self.recruiter
+        profile = ProfileSnapshot.objects.create(digest=hashlib.sha256(f'{recruiter.pk}:{first_name}'.encode()).hexdigest())
+        # Each write in its own savepoint, like a request's transaction: reindex_on_commit() merges into a
+        # reindex still pending at the same level, and the test's transaction never commits
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            bgv_request = BGVRequest.objects.create(
+                user=self.candidate, recruiter=recruiter, profile=profile,
+                first_name=first_name, last_name=last_name, email=f'{first_name.lower()}@example.com'
+            )
+            for name in skill_names:
+                Skill.objects.create(profile=profile, skill_name=name)
+            if company:
+                WorkExperience.objects.create(profile=profile, role='Engineer', company_name=company)
+            if project_skills:
+                Project.objects.create(profile=profile, name='Platform', skill_names=project_skills)
+        return bgv_request
+
+    def search(self, **params):
+        response = self.client.get('/api/bgv/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.json()['data']]
+
+    def test_terms_match_as_prefixes(self):
+        self.assertEqual(search.search_ids('ash ra', recruiter_id=self.recruiter.pk), [self.asha.pk])
+        self.assertEqual(search.search_ids('acm', recruiter_id=self.recruiter.pk), [self.asha.pk])
+        self.assertEqual(search.search_ids('rao', recruiter_id=self.recruiter.pk), [self.ravi.pk, self.asha.pk])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(search.search_ids('asha initech', recruiter_id=self.recruiter.pk), [])
+
+    def test_results_are_scoped_to_the_recruiter(self):
+        self.assertEqual(search.search_ids('asha'), [self.other_asha.pk, self.asha.pk])
+        self.assertEqual(self.search(q='asha'), [self.asha.pk])
+
+    def test_profile_row_edit_reindexes(self):
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            experience = WorkExperience.objects.get(profile=self.asha.profile)
+            experience.company_name = 'Globex'
+            experience.save()
+        self.assertEqual(self.search(q='globex'), [self.asha.pk])
+        self.assertEqual(self.search(q='acme'), [])
+
+    def test_spellings_resolve_to_one_skill(self):
+        canonical = skills.resolve(['React.js', 'ReactJS', 'react'], create=False)
+        self.assertEqual(len(set(canonical.values())), 1)
+        self.assertEqual(self.search(skills='React.js'), [self.asha.pk])
+        self.assertEqual(self.search(skills='Kubernetes'), [self.ravi.pk])
+
+    def test_skills_filter_requires_every_skill(self):
+        self.assertEqual(self.search(skills='Python'), [self.ravi.pk, self.asha.pk])
+        self.assertEqual(self.search(skills='python,react'), [self.asha.pk])
+        self.assertEqual(self.search(skills='python,cobol'), [])
+        self.assertEqual(self.search(q='rao', skills='k8s'), [self.ravi.pk])
+
+
+@in_memory_backends
+class ProfileSnapshotTests(TestCase):
+    """Identical parses share one snapshot; a recruiter's repeated resume reuses its parse; the last delete prunes."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.recruiter = CustomUser.objects.create_user(
+            'recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.recruiter)
+        self.parsed = {
+            'firstName': 'Asha', 'lastName': 'Rao', 'email': 'asha@example.com',
+            'professionalBackground': [{'role': 'Engineer', 'companyName': 'Acme', 'startDate': '2018-01-01'}],
+            'skills': [{'skillName': 'Python', 'yearsOfExperience': 4}],
+        }
+
+    def upload(self, content, client=None):
+        with mock.patch('backgroundverification.views.parse_resume_file') as parse:
+            parse.return_value = {'status': 'success', 'data': self.parsed}
+            response = (client or self.client).post(
+                '/api/bgv/upload/', {'file': SimpleUploadedFile('resume.pdf', content)}, format='multipart'
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+        return BGVRequest.objects.get(pk=response.json()['data']['bgv_request']['id']), parse.call_count
+
+    def test_identical_parse_shares_snapshot(self):
+        rows = profiles.profile_rows(self.parsed)
+        with transaction.atomic():
+            snapshot = profiles.get_or_create_snapshot(rows)
+        self.assertEqual(profiles.get_or_create_snapshot(profiles.profile_rows(self.parsed)), snapshot)
+        self.assertEqual(snapshot.digest, profiles.snapshot_digest(rows))
+        self.assertEqual(WorkExperience.objects.count(), 1)
+
+        self.parsed['skills'][0]['yearsOfExperience'] = 5
+        self.assertNotEqual(profiles.get_or_create_snapshot(profiles.profile_rows(self.parsed)), snapshot)
+
+    def test_same_resume_reuses_earlier_parse(self):
+        first, parsed = self.upload(b'%PDF-1.4 resume')
+        self.assertEqual(parsed, 1)
+        again, parsed = self.upload(b'%PDF-1.4 resume')
+        self.assertEqual(parsed, 0)
+        self.assertEqual((again.user_id, again.profile_id), (first.user_id, first.profile_id))
+        self.assertEqual(again.resume_hash, hashlib.sha256(b'%PDF-1.4 resume').hexdigest())
+        # Each request keeps its own stored copy
+        self.assertNotEqual(again.resume_file.name, first.resume_file.name)
+        self.assertEqual(again.resume_file.read(), b'%PDF-1.4 resume')
+
+        # Another file that parses the same: parsed again, same snapshot
+        edited, parsed = self.upload(b'%PDF-1.4 resume, new layout')
+        self.assertEqual(parsed, 1)
+        self.assertEqual(edited.profile_id, first.profile_id)
+
+    def test_reuse_is_scoped_to_the_recruiter(self):
+        first, _ = self.upload(b'%PDF-1.4 resume')
+        other = CustomUser.objects.create_user('other@example.com', 'password', role=CustomUser.Role.RECRUITER)
+        client = APIClient()
+        client.force_authenticate(other)
+
+        # Another recruiter's upload of the same file is parsed; the rows are shared through the digest
+        theirs, parsed = self.upload(b'%PDF-1.4 resume', client)
+        self.assertEqual(parsed, 1)
+        self.assertEqual((theirs.recruiter, theirs.user_id, theirs.profile_id), (other, first.user_id, first.profile_id))
+        self.assertEqual(WorkExperience.objects.count(), 1)
+
+    def test_detail_reads_rows_through_the_snapshot(self):
+        first, _ = self.upload(b'%PDF-1.4 resume')
+        edited, _ = self.upload(b'%PDF-1.4 resume, new layout')
+        queryset = (
+            BGVRequest.objects.filter(pk__in=[first.pk, edited.pk]).select_related('user', 'recruiter')
+            .prefetch_related(*DETAIL_PREFETCH)
+        )
+        # The requests, their snapshot, its four row tables, documents and agent logs
+        with self.assertNumQueries(8):
+            data = BGVRequestDetailSerializer(queryset, many=True).data
+        self.assertEqual([row['work_experiences'][0]['company_name'] for row in data], ['Acme', 'Acme'])
+
+        response = self.client.patch(f'/api/bgv/{first.pk}/', {'status': BGVRequest.Status.COMPLETED}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['data']['status'], BGVRequest.Status.COMPLETED)
+        self.assertEqual(response.json()['data']['skills'][0]['skill_name'], 'Python')
+
+    def test_last_delete_prunes_snapshot(self):
+        first, _ = self.upload(b'%PDF-1.4 resume')
+        again, _ = self.upload(b'%PDF-1.4 resume')
+        first.delete()
+        self.assertTrue(ProfileSnapshot.objects.filter(pk=again.profile_id).exists())
+        again.delete()
+        self.assertFalse(ProfileSnapshot.objects.filter(pk=again.profile_id).exists())
+        self.assertFalse(WorkExperience.objects.exists())
+
+
+@in_memory_backends
+class ProfileSnapshotMigrationTests(TransactionTestCase):
+    """Migrations 0014-0016 give identical existing profiles one snapshot; reverting copies the rows back."""
+
+    migrate_from = [('backgroundverification', '0013_skill_dictionary')]
+    migrate_to = [('backgroundverification', '0016_profile_rows_drop_bgv_request')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+        super().tearDown()
+
+    def test_duplicate_profiles_are_merged(self):
+        apps = self.migrate(self.migrate_from)
+        User = apps.get_model('authentication', 'CustomUser')
+        OldRequest = apps.get_model('backgroundverification', 'BGVRequest')
+        OldExperience = apps.get_model('backgroundverification', 'WorkExperience')
+        OldSkill = apps.get_model('backgroundverification', 'Skill')
+
+        recruiter = User.objects.create(email='recruiter@example.com')
+        candidate = User.objects.create(email='candidate@example.com')
+        requests = [
+            OldRequest.objects.create(user=candidate, recruiter=recruiter, email='candidate@example.com')
+            for _ in range(4)
+        ]
+        for bgv_request, company in zip(requests[:3], ['Acme', 'Acme', 'Initech']):
+            OldExperience.objects.create(bgv_request=bgv_request, role='Engineer', company_name=company)
+            OldSkill.objects.create(bgv_request=bgv_request, skill_name='Python', years_of_experience=4)
+
+        self.migrate(self.migrate_to)
+        profile_ids = list(BGVRequest.objects.order_by('id').values_list('profile_id', flat=True))
+        self.assertEqual(profile_ids[0], profile_ids[1])
+        self.assertNotEqual(profile_ids[0], profile_ids[2])
+        self.assertIsNone(profile_ids[3])
+        self.assertEqual(ProfileSnapshot.objects.count(), 2)
+        self.assertEqual(WorkExperience.objects.count(), 2)
+        self.assertEqual(Skill.objects.count(), 2)
+
+        # The digests match the ones new uploads compute, so later identical uploads reuse these snapshots
+        for snapshot in ProfileSnapshot.objects.all():
+            rows = {
+                relation: list(getattr(snapshot, relation).values(*fields))
+                for relation, (_, fields) in profiles.PROFILE_MODELS.items()
+            }
+            self.assertEqual(snapshot.digest, profiles.snapshot_digest(rows))
+
+    def test_reverting_gives_each_request_its_rows_back(self):
+        self.migrate(self.migrate_to)
+        recruiter = CustomUser.objects.create_user('recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER)
+        candidate = CustomUser.objects.create_user('candidate@example.com', 'password', role=CustomUser.Role.CANDIDATE)
+        with transaction.atomic():
+            shared = profiles.get_or_create_snapshot({'skills': [{'skill_name': 'Python', 'years_of_experience': 4}]})
+            orphan = profiles.get_or_create_snapshot({'skills': [{'skill_name': 'Go', 'years_of_experience': 1}]})
+        requests = [
+            BGVRequest.objects.create(user=candidate, recruiter=recruiter, email='candidate@example.com', profile=profile)
+            for profile in [shared, shared, None]
+        ]
+        self.assertTrue(orphan.pk)
+
+        apps = self.migrate(self.migrate_from)
+        OldSkill = apps.get_model('backgroundverification', 'Skill')
+        self.assertEqual(
+            sorted(OldSkill.objects.values_list('bgv_request_id', 'skill_name', 'years_of_experience')),
+            [(requests[0].id, 'Python', 4), (requests[1].id, 'Python', 4)]
+        )
+
+
+@in_memory_backends
+class MetricsEndpointTests(TestCase):
+    """/metrics/ answers scrapes from METRICS_ALLOWED_IPS or with the service secret only."""
+
+    def test_allowed_address_can_scrape(self):
+        self.client.get('/api/bgv/')
+        response = self.client.get('/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'django_http_request_duration_seconds', response.content)
+
+    def test_other_addresses_need_the_service_secret(self):
+        self.assertEqual(self.client.get('/metrics/', REMOTE_ADDR='203.0.113.7').status_code, 403)
+        self.assertEqual(
+            self.client.get('/metrics/', REMOTE_ADDR='203.0.113.7', HTTP_X_SERVICE_SECRET='wrong').status_code, 403
+        )
+        response = self.client.get(
+            '/metrics/', REMOTE_ADDR='203.0.113.7', HTTP_X_SERVICE_SECRET=settings.DJANGO_SERVICE_SECRET
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+@in_memory_backends
+class BGVReadCacheTests(TestCase):
+    """List and detail reads are served from the cache and revalidate with ETags until a row changes."""
+
+    def setUp(self):
+        # Keys are per user and request id, which the next test reuses
+        cache.clear()
+        self.recruiter = CustomUser.objects.create_user(
+            'recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER
+        )
+        self.candidate = CustomUser.objects.create_user(
+            'candidate@example.com', 'password', role=CustomUser.Role.CANDIDATE
+        )
+        self.bgv_request = BGVRequest.objects.create(
+            user=self.candidate, recruiter=self.recruiter, email='candidate@example.com'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.recruiter)
+
+    def test_detail_revalidates_until_a_row_changes(self):
+        url = f'/api/bgv/{self.bgv_request.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.assertNumQueries(1):
+            # Only the updated_at lookup; the payload comes from the cache
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        AgentLog.objects.create(bgv_request=self.bgv_request, action=AgentLog.Action.ANALYSIS, message='Analysed')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['data']['agent_logs'][0]['message'], 'Analysed')
+
+    def test_list_revalidates_until_a_request_changes(self):
+        etag = self.client.get('/api/bgv/')['ETag']
+        self.assertEqual(self.client.get('/api/bgv/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.client.get('/api/bgv/').json()['data']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BGVRequest.objects.create(user=self.candidate, recruiter=self.recruiter, email='candidate@example.com')
+        response = self.client.get('/api/bgv/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()['data']), 2)
+
+
+@in_memory_backends
+class BGVListStreamingTests(TestCase):
+    """Lists longer than BGV_STREAM_LIST_THRESHOLD are streamed, in the same envelope as a rendered list."""
+
+    def setUp(self):
+        cache.clear()
+        recruiter = CustomUser.objects.create_user('recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER)
+        candidate = CustomUser.objects.create_user('candidate@example.com', 'password', role=CustomUser.Role.CANDIDATE)
+        for _ in range(3):
+            BGVRequest.objects.create(user=candidate, recruiter=recruiter, email='candidate@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(recruiter)
+
+    def test_list_above_the_threshold_streams(self):
+        with override_settings(BGV_STREAM_LIST_THRESHOLD=10):
+            rendered = self.client.get('/api/bgv/')
+        self.assertFalse(rendered.streaming)
+
+        cache.clear()
+        with override_settings(BGV_STREAM_LIST_THRESHOLD=2):
+            streamed = self.client.get('/api/bgv/')
+        self.assertTrue(streamed.streaming)
+        self.assertEqual(streamed['Content-Type'], 'application/json')
+        self.assertEqual(streamed['ETag'], rendered['ETag'])
+        body = json.loads(b''.join(streamed.streaming_content))
+        self.assertEqual(body, rendered.json())
+        self.assertEqual(len(body['data']), 3)
+
+    def test_async_envelope_matches_the_sync_one(self):
+        rows = [{'id': n, 'status': 'pending'} for n in range(5)]
+
+        async def collect():
+            return b''.join([chunk async for chunk in astream_envelope(iter(rows), chunk_rows=2)])
+
+        self.assertEqual(async_to_sync(collect)(), b''.join(stream_envelope(iter(rows))))
+
+
+@in_memory_backends
+class BGVEventsSocketTests(TestCase):
+    """WebSocket clients authenticate with a `bearer` subprotocol and receive their requests' events."""
+
+    def setUp(self):
+        self.recruiter = CustomUser.objects.create_user(
+            'recruiter@example.com', 'password', role=CustomUser.Role.RECRUITER
+        )
+        self.candidate = CustomUser.objects.create_user(
+            'candidate@example.com', 'password', role=CustomUser.Role.CANDIDATE
+        )
+        self.bgv_request = BGVRequest.objects.create(
+            user=self.candidate, recruiter=self.recruiter, email='candidate@example.com'
+        )
+        self.application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+    def socket(self, user, path='/ws/bgv/'):
+        return WebsocketCommunicator(self.application, path, subprotocols=['bearer', str(AccessToken.for_user(user))])
+
+    def request_documents(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bgv_request.status = BGVRequest.Status.DOCUMENTS_REQUESTED
+            self.bgv_request.save()
+
+    async def test_token_is_taken_from_the_subprotocol(self):
+        communicator = self.socket(self.candidate)
+        connected, subprotocol = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual(subprotocol, 'bearer')
+        await communicator.disconnect()
+
+    async def test_token_in_the_query_string_is_refused(self):
+        token = AccessToken.for_user(self.candidate)
+        communicator = WebsocketCommunicator(self.application, f'/ws/bgv/?token={token}')
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_status_change_reaches_candidate_and_recruiter(self):
+        sockets = [self.socket(self.candidate), self.socket(self.recruiter)]
+        for communicator in sockets:
+            await communicator.connect()
+        await database_sync_to_async(self.request_documents)()
+        for communicator in sockets:
+            event = await communicator.receive_json_from()
+            self.assertEqual(event['type'], 'bgv.status')
+            self.assertEqual(event['bgv_request_id'], self.bgv_request.pk)
+            self.assertEqual(event['status'], BGVRequest.Status.DOCUMENTS_REQUESTED)
+            await communicator.disconnect()
@@ -0,0 +1,105 @@
+"""
+Resumable, chunked document uploads.
+
+Protocol (modelled on tus):
+- POST   /api/bgv/<pk>/uploads/                 open a session with the total size and,
+                                                optionally, the file's sha256 hex digest
+- HEAD   /api/bgv/uploads/<id>/                 `Upload-Offset` tells the client where to resume
+- PATCH  /api/bgv/uploads/<id>/                 append a chunk at `Upload-Offset`; an optional
+                                                `Upload-Checksum: sha256 <base64>` is verified
+- POST   /api/bgv/uploads/<id>/finalize/        verify the whole file, store it as a Document
+
+Chunks are streamed from the request in fixed-size blocks into a file of
+their own under DOCUMENT_UPLOAD_TEMP_DIR, then appended to the session's part
+file, so memory per upload stays bounded whatever the file size. The directory must be shared by all Django
+workers serving uploads.
+"""
+import base64
+import binascii
+import hashlib
+import shutil
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+BLOCK_SIZE = 64 * 1024
+
+
+class ChunkError(Exception):
+    """A chunk was rejected; nothing was written to the part file."""
+
+
+def part_path(session):
+    return Path(settings.DOCUMENT_UPLOAD_TEMP_DIR) / f"{session.id}.part"
+
+
+def parse_checksum(header):
+    """Digest bytes from an `Upload-Checksum: sha256 <base64>` header, or None if absent."""
+    if not header:
+        return None
+    algorithm, _, value = header.partition(' ')
+    if algorithm.lower() != 'sha256':
+        raise ChunkError(f"Unsupported checksum algorithm: {algorithm}")
+    try:
+        return base64.b64decode(value.strip(), validate=True)
+    except (binascii.Error, ValueError):
+        raise ChunkError('Malformed Upload-Checksum header')
+
+
+def receive_chunk(session, stream, length, expected_digest=None):
+    """
+    Stream `length` bytes from `stream` into a file of their own next to the
+    session's part file and return its path; append_chunk() then adds it to
+    the part file. Receiving takes as long as the client does, so it happens
+    without holding the session's row lock.
+
+    On a short read or checksum mismatch the file is removed and ChunkError is raised.
+    """
+    path = part_path(session).with_name(f"{session.id}.{uuid.uuid4().hex}.chunk")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+
+    try:
+        with open(path, 'wb') as fh:
+            remaining = length
+            while remaining:
+                block = stream.read(min(BLOCK_SIZE, remaining))
+                if not block:
+                    raise ChunkError('Chunk ended before Content-Length bytes were received')
+                fh.write(block)
+                digest.update(block)
+                remaining -= len(block)
+        if expected_digest is not None and digest.digest() != expected_digest:
+            raise ChunkError('Chunk checksum mismatch')
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def append_chunk(session, chunk_path):
+    """
+    Append a received chunk to the part file at `session.received_size` (any
+    bytes past it are dropped first). Returns the new offset.
+    """
+    with open(part_path(session), 'ab') as fh, open(chunk_path, 'rb') as chunk:
+        fh.truncate(session.received_size)
+        shutil.copyfileobj(chunk, fh, BLOCK_SIZE)
+    return session.received_size + chunk_path.stat().st_size
+
+
+def file_checksum(path):
+    """sha256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def discard_part(session):
+    """Remove the session's part file and any chunk files left behind by interrupted requests."""
+    path = part_path(session)
+    for leftover in [path, *path.parent.glob(f"{session.id}.*.chunk")]:
+        leftover.unlink(missing_ok=True)
@@ -4,7 +4,18 @@ from . import views
 urlpatterns = [
     path('upload/', views.UploadResumeView.as_view(), name='upload-resume'),
     path('', views.BGVRequestListView.as_view(), name='bgv-request-list'),
+    path('stats/', views.BGVStatsView.as_view(), name='bgv-stats'),
+    path('search/', views.BGVSearchView.as_view(), name='bgv-search'),
     path('<int:pk>/', views.BGVRequestDetailView.as_view(), name='bgv-request-detail'),
+    path('<int:pk>/transition/', views.TransitionBGVRequestView.as_view(), name='transition-bgv-request'),
+    path('<int:pk>/reminder-context/', views.ReminderContextView.as_view(), name='reminder-context'),
     path('<int:pk>/agent-log/', views.CreateAgentLogView.as_view(), name='create-agent-log'),
+    path('agent-logs/bulk/', views.BulkCreateAgentLogView.as_view(), name='bulk-create-agent-logs'),
+    path('agent-jobs/callback/', views.AgentJobCallbackView.as_view(), name='agent-job-callback'),
     path('<int:pk>/submit-documents/', views.SubmitDocumentsView.as_view(), name='submit-documents'),
+    path('<int:pk>/documents/upload-url/', views.DocumentUploadURLView.as_view(), name='document-upload-url'),
+    path('<int:pk>/documents/confirm/', views.ConfirmDocumentsView.as_view(), name='confirm-documents'),
+    path('<int:pk>/uploads/', views.CreateUploadSessionView.as_view(), name='create-upload-session'),
+    path('uploads/<uuid:session_id>/', views.UploadSessionView.as_view(), name='upload-session'),
+    path('uploads/<uuid:session_id>/finalize/', views.FinalizeUploadView.as_view(), name='finalize-upload'),
 ]
@@ -4,18 +4,59 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.shortcuts import get_object_or_404
-from datetime import datetime
+from django.db import transaction, IntegrityError
+from django.db.models import prefetch_related_objects
+from django.http import Http404, HttpResponseNotModified, StreamingHttpResponse
+from django.conf import settings
+from django.core.files import File
+from django.core.handlers.asgi import ASGIRequest
 from authentication.models import CustomUser
-from .models import BGVRequest, WorkExperience, Education, Skill, Project, Document, AgentLog
+from authentication.renderers import stream_envelope, astream_envelope
+from .models import (
+    BGVRequest, Document, AgentLog, DocumentUploadSession, OutboxEvent
+)
 from .serializers import (
+    DETAIL_PREFETCH,
     BGVRequestListSerializer,
     BGVRequestDetailSerializer,
     BGVRequestUpdateSerializer,
     AgentLogCreateSerializer,
-    AgentLogSerializer
+    AgentLogSerializer,
+    AgentLogBulkCreateSerializer,
+    BGVTransitionSerializer,
+    AgentJobCallbackSerializer,
+    DocumentUploadURLSerializer,
+    DocumentConfirmSerializer,
+    DocumentUploadSessionSerializer
+)
+from .events import publish_agent_log
+from .projections import list_rows, detail_payload
+from .documents import attach_documents
+from .outbox import CallbackTooEarly, emit, complete, event_id_from_callback_ref
+from .reminders import with_reminder_stats, reminder_context
+from .stats import recruiter_stats
+from .search import MAX_RESULTS, search_ids
+from .skills import with_skills
+from .profiles import (
+    REQUEST_FIELDS, file_sha256, previous_upload, request_fields, profile_rows, get_or_create_snapshot
+)
+from .idempotency import idempotency_key, request_fingerprint, find_receipt, record_receipt
+from .storage import supports_direct_upload, presigned_upload
+from .uploads import (
+    ChunkError, receive_chunk, append_chunk, parse_checksum, part_path, file_checksum, discard_part
+)
+from .cache import (
+    detail_cache_key,
+    list_cache_key,
+    get_cached,
+    set_cached,
+    make_etag,
+    etag_matches,
+    add_validators,
+    touch_bgv_requests
 )
 from .utils import parse_resume_file, generate_random_password
-from .permissions import IsRecruiter, IsAuthenticatedOrServiceSecret
+from .permissions import IsRecruiter, IsAuthenticatedOrServiceSecret, IsAgentService
 
 
 class UploadResumeView(APIView):
@@ -28,146 +69,103 @@ class UploadResumeView(APIView):
             return Response({'detail': 'Resume file is required'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            parsed_data = parse_resume_file(resume_file)
+            resume_hash = file_sha256(resume_file)
+            previous = previous_upload(resume_hash, request.user)
+            if previous is None:
+                parsed_data = parse_resume_file(resume_file)
 
-            if parsed_data.get('status') != 'success':
-                return Response({'detail': 'Failed to parse resume'}, status=status.HTTP_400_BAD_REQUEST)
+                if parsed_data.get('status') != 'success':
+                    return Response({'detail': 'Failed to parse resume'}, status=status.HTTP_400_BAD_REQUEST)
 
-            data = parsed_data.get('data', {})
+                data = parsed_data.get('data', {})
+                fields = request_fields(data)
+                rows = profile_rows(data)
+            else:
+                # This recruiter uploaded the same file before: reuse its candidate, parse and snapshot
+                fields = {field: previous[field] for field in REQUEST_FIELDS}
+                rows = None
 
-            email = data.get('email')
+            email = fields['email']
             if not email:
                 return Response({'detail': 'Email not found in resume'}, status=status.HTTP_400_BAD_REQUEST)
 
-            candidate_user, created = CustomUser.objects.get_or_create(
-                email=email,
-                defaults={
-                    'role': CustomUser.Role.CANDIDATE,
-                    'full_name': f"{data.get('firstName', '')} {data.get('lastName', '')}".strip(),
-                    'phone_number': data.get('phoneNumber', '')
-                }
-            )
-
-            temp_password = None
-            if created:
-                temp_password = generate_random_password()
-                candidate_user.set_password(temp_password)
-                candidate_user.save()
-            else:
-                # User already exists - generate new temp password for testing
-                temp_password = generate_random_password()
-                candidate_user.set_password(temp_password)
-                candidate_user.save()
-
-            bgv_request = BGVRequest.objects.create(
-                user=candidate_user,
-                recruiter=request.user,
-                first_name=data.get('firstName', ''),
-                last_name=data.get('lastName', ''),
-                email=email,
-                phone_number=data.get('phoneNumber', ''),
-                date_of_birth=self.parse_date(data.get('dateOfBirth')),
-                about=data.get('about', ''),
-                marital_status=data.get('maritalStatus', ''),
-                hobbies=data.get('hobbies', ''),
-                country_of_citizenship=data.get('countryOfCitizenship', ''),
-                country_of_residence=data.get('countryOfResidence', ''),
-                role=data.get('role', ''),
-                total_work_experience=data.get('totalWorkExperience', 0),
-                total_work_experience_months=data.get('totalWorkExperienceInMonths', 0),
-                resume_file=resume_file,
-                status=BGVRequest.Status.PENDING_ANALYSIS
-            )
-
-            work_experiences = [
-                WorkExperience(
-                    bgv_request=bgv_request,
-                    role=exp.get('role', ''),
-                    company_name=exp.get('companyName', ''),
-                    start_date=self.parse_date(exp.get('startDate')),
-                    end_date=self.parse_date(exp.get('endDate')),
-                    description=exp.get('description', '')
-                )
-                for exp in data.get('professionalBackground', [])
-            ]
-            WorkExperience.objects.bulk_create(work_experiences)
-
-            educations = [
-                Education(
-                    bgv_request=bgv_request,
-                    degree=edu.get('degree', ''),
-                    field_of_study=edu.get('fieldOfStudy', ''),
-                    institute=edu.get('institute', ''),
-                    start_date=self.parse_date(edu.get('startDate')),
-                    end_date=self.parse_date(edu.get('endDate')),
-                    gpa=edu.get('gpa', '')
-                )
-                for edu in data.get('educationalBackground', [])
-            ]
-            Education.objects.bulk_create(educations)
-
-            skills = [
-                Skill(
-                    bgv_request=bgv_request,
-                    skill_name=skill.get('skillName', ''),
-                    years_of_experience=skill.get('yearsOfExperience', 0),
-                    competency=skill.get('competency', '')
-                )
-                for skill in data.get('skills', [])
-            ]
-            Skill.objects.bulk_create(skills)
-
-            projects = [
-                Project(
-                    bgv_request=bgv_request,
-                    name=project.get('name', ''),
-                    description=project.get('description', ''),
-                    link=project.get('link', ''),
-                    role_name=project.get('role', {}).get('name', ''),
-                    skill_names=project.get('skills', {}).get('skillNames', [])
-                )
-                for project in data.get('projects', [])
-            ]
-            Project.objects.bulk_create(projects)
-
-            if temp_password:
-                log = AgentLog.objects.create(
-                    bgv_request=bgv_request,
-                    action=AgentLog.Action.ANALYSIS,
-                    message='Candidate account created, credentials queued for delivery',
-                    metadata={
-                        'temp_password': temp_password,
-                        'user_created': True,
-                        'candidate_email': email,
-                        'credentials_sent': False
-                    }
-                )
-
-                from .tasks import send_candidate_credentials
-                send_candidate_credentials.delay(
-                    bgv_request_id=bgv_request.id,
-                    candidate_email=email,
-                    candidate_name=f"{bgv_request.first_name} {bgv_request.last_name}",
-                    temp_password=temp_password,
-                    agent_log_id=log.id
+            with transaction.atomic():
+                if previous:
+                    candidate_user, created = CustomUser.objects.get(pk=previous['user_id']), False
+                else:
+                    candidate_user, created = CustomUser.objects.get_or_create(
+                        email=email,
+                        defaults={
+                            'role': CustomUser.Role.CANDIDATE,
+                            'full_name': f"{fields['first_name']} {fields['last_name']}".strip(),
+                            'phone_number': fields['phone_number']
+                        }
+                    )
+
+                temp_password = None
+                if created:
+                    temp_password = generate_random_password()
+                    candidate_user.set_password(temp_password)
+                    candidate_user.save()
+
+                # Profile rows are shared with every request whose resume parsed to the same profile
+                profile_id = previous['profile_id'] if rows is None else get_or_create_snapshot(rows).id
+                bgv_request = BGVRequest.objects.create(
+                    user=candidate_user,
+                    recruiter=request.user,
+                    **fields,
+                    resume_file=resume_file,
+                    resume_hash=resume_hash,
+                    profile_id=profile_id,
+                    status=BGVRequest.Status.PENDING_ANALYSIS
                 )
 
+                if created:
+                    log = AgentLog.objects.create(
+                        bgv_request=bgv_request,
+                        action=AgentLog.Action.ANALYSIS,
+                        message='Candidate account created, credentials queued for delivery',
+                        metadata={
+                            'user_created': True,
+                            'candidate_email': email,
+                            'credentials_sent': False
+                        }
+                    )
+
+                    # Delivered by the outbox relay once this transaction commits; the
+                    # password stays in the database until then, never in a broker message
+                    emit(
+                        'credentials.dispatch',
+                        bgv_request,
+                        {'agent_log_id': log.id},
+                        dedup_key=f'credentials:{bgv_request.id}',
+                        secret=temp_password
+                    )
+                else:
+                    # The candidate already has a login; their password is left alone
+                    AgentLog.objects.create(
+                        bgv_request=bgv_request,
+                        action=AgentLog.Action.ANALYSIS,
+                        message='Existing candidate account reused, no new credentials sent',
+                        metadata={
+                            'user_created': False,
+                            'candidate_email': email
+                        }
+                    )
+
+            prefetch_related_objects([bgv_request], *DETAIL_PREFETCH)
             return Response({
-                'detail': 'Resume uploaded successfully. Candidate will receive login credentials via email shortly.',
+                'detail': (
+                    'Resume uploaded successfully. Candidate will receive login credentials via email shortly.'
+                    if created else
+                    'Resume uploaded successfully. Candidate already has an account and can sign in with it.'
+                ),
                 'bgv_request': BGVRequestDetailSerializer(bgv_request, context={'request': request}).data,
             }, status=status.HTTP_201_CREATED)
 
         except Exception as e:
             return Response({'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def parse_date(self, date_str):
-        if not date_str:
-            return None
-        try:
-            return datetime.strptime(date_str, '%Y-%m-%d').date()
-        except:
-            return None
-
 
 class BGVRequestListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
@@ -179,9 +177,69 @@ class BGVRequestListView(generics.ListAPIView):
         else:
             return BGVRequest.objects.filter(user=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        cache_key = list_cache_key(request)
+        etag = make_etag(cache_key) if cache_key else None
+        if etag and etag_matches(request, etag):
+            return add_validators(HttpResponseNotModified(), etag)
+
+        data = get_cached(cache_key)
+        if data is None:
+            queryset = self.get_queryset()
+            if queryset.count() > settings.BGV_STREAM_LIST_THRESHOLD:
+                # The rows are read while the response is sent, after the view (and the
+                # metrics middleware's query count) have returned
+                envelope = astream_envelope if isinstance(request._request, ASGIRequest) else stream_envelope
+                response = StreamingHttpResponse(envelope(list_rows(queryset)), content_type='application/json')
+                return add_validators(response, etag) if etag else response
+            data = list(list_rows(queryset))
+            set_cached(cache_key, data)
+
+        response = Response(data)
+        return add_validators(response, etag) if etag else response
+
+
+class BGVStatsView(APIView):
+    """Dashboard aggregates for the recruiter's BGV requests (see stats.py)."""
+    permission_classes = [IsRecruiter]
+
+    def get(self, request):
+        return Response(recruiter_stats(request.user))
+
+
+class BGVSearchView(APIView):
+    """
+    The recruiter's BGV requests matching `q` by name, email, skill, employer
+    or institute (see search.py) and/or listing every skill in `skills`, a
+    comma-separated list matched under any alias (see skills.py). Newest
+    first, as list rows.
+    """
+    permission_classes = [IsRecruiter]
+    default_limit = 50
+    max_limit = 200
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        skill_names = [name for name in request.query_params.get('skills', '').split(',') if name.strip()]
+        if not query and not skill_names:
+            return Response({'detail': 'A search query (q) or skills are required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            return Response({'detail': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = BGVRequest.objects.filter(recruiter=request.user)
+        if skill_names:
+            queryset = with_skills(queryset, skill_names)
+        if query:
+            # With a skill filter too, take more text matches so enough survive it
+            ids = search_ids(query, recruiter_id=request.user.id, limit=MAX_RESULTS if skill_names else limit)
+            queryset = queryset.filter(pk__in=ids)
+        return Response(list(list_rows(queryset.order_by('-id')[:limit])))
 
-class BGVRequestDetailView(generics.RetrieveUpdateAPIView):
-    permission_classes = [IsAuthenticatedOrServiceSecret]
+
+class BGVRequestAccessMixin:
+    """Scope BGV requests to the agent service (all), the recruiter (own) or the candidate (own)."""
 
     def get_queryset(self):
         if self.request.auth == 'fastapi_agent_service':
@@ -191,11 +249,34 @@ class BGVRequestDetailView(generics.RetrieveUpdateAPIView):
         else:
             return BGVRequest.objects.filter(user=self.request.user)
 
+
+class BGVRequestDetailView(BGVRequestAccessMixin, generics.RetrieveUpdateAPIView):
+    permission_classes = [IsAuthenticatedOrServiceSecret]
+
     def get_serializer_class(self):
         if self.request.method == 'PATCH':
             return BGVRequestUpdateSerializer
         return BGVRequestDetailSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        updated_at = self.get_queryset().filter(pk=kwargs['pk']).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            raise Http404
+
+        cache_key = detail_cache_key(request, kwargs['pk'], updated_at)
+        etag = make_etag(cache_key)
+        if etag_matches(request, etag):
+            return add_validators(HttpResponseNotModified(), etag)
+
+        data = get_cached(cache_key)
+        if data is None:
+            data = detail_payload(self.get_queryset(), kwargs['pk'], request)
+            if data is None:
+                raise Http404
+            set_cached(cache_key, data)
+
+        return add_validators(Response(data), etag)
+
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
@@ -203,12 +284,56 @@ class BGVRequestDetailView(generics.RetrieveUpdateAPIView):
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
 
-        if getattr(instance, '_prefetched_objects_cache', None):
-            instance._prefetched_objects_cache = {}
-
+        prefetch_related_objects([instance], *DETAIL_PREFETCH)
         return Response(BGVRequestDetailSerializer(instance, context={'request': request}).data)
 
 
+class TransitionBGVRequestView(BGVRequestAccessMixin, APIView):
+    """
+    Apply a status change and append an AgentLog in one transaction.
+    Returns a minimal acknowledgement instead of the full detail payload.
+    """
+    permission_classes = [IsAuthenticatedOrServiceSecret]
+
+    def post(self, request, pk):
+        serializer = BGVTransitionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        with transaction.atomic():
+            bgv_request = get_object_or_404(self.get_queryset().select_for_update(), pk=pk)
+            previous_status = bgv_request.status
+            bgv_request.status = data['status']
+            bgv_request.save(update_fields=['status', 'updated_at'])
+
+            agent_log = AgentLog.objects.create(
+                bgv_request=bgv_request,
+                action=data['action'],
+                message=data['message'],
+                metadata=data['metadata']
+            )
+
+        return Response({
+            'detail': 'BGV request transitioned',
+            'id': bgv_request.id,
+            'status': bgv_request.status,
+            'previous_status': previous_status,
+            'agent_log_id': agent_log.id
+        }, status=status.HTTP_200_OK)
+
+
+class ReminderContextView(BGVRequestAccessMixin, APIView):
+    """Precomputed context for a reminder (see reminders.py), for reminders not sent by the sweep."""
+    permission_classes = [IsAuthenticatedOrServiceSecret]
+
+    def get(self, request, pk):
+        row = with_reminder_stats(self.get_queryset().filter(pk=pk)).first()
+        if row is None:
+            raise Http404
+        return Response({'bgv_request_id': row['id'], **reminder_context(row)})
+
+
 class CreateAgentLogView(APIView):
     permission_classes = [IsAuthenticatedOrServiceSecret]
 
@@ -225,40 +350,301 @@ class CreateAgentLogView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class SubmitDocumentsView(APIView):
+class BulkCreateAgentLogView(APIView):
+    """Create agent logs for any number of BGV requests in one call."""
+    permission_classes = [IsAuthenticatedOrServiceSecret]
+
+    def post(self, request):
+        serializer = AgentLogBulkCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        bgv_requests = serializer.context['bgv_requests']
+        agent_logs = AgentLog.objects.bulk_create([
+            AgentLog(**entry) for entry in serializer.validated_data['entries']
+        ])
+
+        # bulk_create skips post_save, so invalidate cached details and publish events here
+        touch_bgv_requests(*bgv_requests.keys())
+        for agent_log in agent_logs:
+            parent = bgv_requests[agent_log.bgv_request_id]
+            publish_agent_log(agent_log, user_ids=(parent['user_id'], parent['recruiter_id']))
+
+        return Response({
+            'detail': f'{len(agent_logs)} agent logs created',
+            'ids': [agent_log.id for agent_log in agent_logs]
+        }, status=status.HTTP_201_CREATED)
+
+
+class AgentJobCallbackView(APIView):
+    """
+    Completion callback for agent jobs started by an outbox handler. Settles the
+    event the job was started for; late or repeated callbacks are acknowledged
+    without changing anything. A callback that arrives while the event is still
+    being delivered gets a 409, which the agent retries.
+    """
+    permission_classes = [IsAgentService]
+
+    def post(self, request):
+        serializer = AgentJobCallbackSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        job = serializer.validated_data
+
+        event_id = event_id_from_callback_ref(job['callback_ref'])
+        if event_id is None:
+            return Response({'detail': 'Unknown callback reference'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            event = get_object_or_404(OutboxEvent.objects.select_for_update(), pk=event_id)
+            try:
+                applied = complete(event, job)
+            except CallbackTooEarly as e:
+                return Response({'detail': str(e), 'event_id': event.id}, status=status.HTTP_409_CONFLICT)
+
+        return Response({
+            'detail': 'Callback applied' if applied else 'Callback ignored',
+            'event_id': event.id,
+            'event_status': event.status
+        }, status=status.HTTP_200_OK)
+
+
+class DocumentSubmissionMixin:
+    """Idempotency-Key handling shared by the document submission endpoints"""
+
+    def submitted_response(self, request, bgv_request, replayed=False):
+        prefetch_related_objects([bgv_request], *DETAIL_PREFETCH)
+        response = Response({
+            'detail': 'Documents submitted successfully',
+            'bgv_request': BGVRequestDetailSerializer(bgv_request, context={'request': request}).data
+        }, status=status.HTTP_200_OK)
+        if replayed:
+            response['Idempotent-Replayed'] = 'true'
+        return response
+
+    def replay(self, request, fingerprint):
+        """Response for a key that was already used, or None if the key is new (or absent)."""
+        receipt = find_receipt(request.user, idempotency_key(request))
+        if receipt is None:
+            return None
+        if receipt.fingerprint != fingerprint:
+            return Response(
+                {'detail': 'Idempotency-Key was already used for a different request'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        return self.submitted_response(request, BGVRequest.objects.get(pk=receipt.bgv_request_id), replayed=True)
+
+    def submit(self, request, bgv_request, files, fingerprint):
+        key = idempotency_key(request)
+        try:
+            with transaction.atomic():
+                attach_documents(bgv_request, files)
+                if key:
+                    record_receipt(request.user, key, fingerprint, bgv_request)
+        except IntegrityError:
+            # A concurrent retry with the same key committed first
+            response = self.replay(request, fingerprint) if key else None
+            if response is None:
+                raise
+            return response
+        return self.submitted_response(request, bgv_request)
+
+
+class SubmitDocumentsView(DocumentSubmissionMixin, APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
     def post(self, request, pk):
         bgv_request = get_object_or_404(BGVRequest, pk=pk, user=request.user)
 
-        pan_file = request.FILES.get('pan')
-        aadhaar_file = request.FILES.get('aadhaar')
+        files = {}
+        if request.FILES.get('pan'):
+            files[Document.DocumentType.PAN] = request.FILES['pan']
+        if request.FILES.get('aadhaar'):
+            files[Document.DocumentType.AADHAAR] = request.FILES['aadhaar']
 
-        if not pan_file and not aadhaar_file:
+        fingerprint = request_fingerprint(request, {
+            document_type: [file.name, file.size] for document_type, file in files.items()
+        })
+        replayed = self.replay(request, fingerprint)
+        if replayed:
+            return replayed
+
+        if not files:
             return Response({'detail': 'At least one document is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        documents = []
-        if pan_file:
-            documents.append(Document(
-                bgv_request=bgv_request,
-                document_type=Document.DocumentType.PAN,
-                file=pan_file
-            ))
+        return self.submit(request, bgv_request, files, fingerprint)
 
-        if aadhaar_file:
-            documents.append(Document(
-                bgv_request=bgv_request,
-                document_type=Document.DocumentType.AADHAAR,
-                file=aadhaar_file
-            ))
 
-        Document.objects.bulk_create(documents)
+class DocumentUploadURLView(APIView):
+    """Presigned POST for uploading one document straight to the object store"""
+    permission_classes = [IsAuthenticated]
 
-        bgv_request.status = BGVRequest.Status.DOCUMENTS_SUBMITTED
-        bgv_request.save()
+    def post(self, request, pk):
+        bgv_request = get_object_or_404(BGVRequest, pk=pk, user=request.user)
 
-        return Response({
-            'detail': 'Documents submitted successfully',
-            'bgv_request': BGVRequestDetailSerializer(bgv_request, context={'request': request}).data
-        }, status=status.HTTP_200_OK)
+        if not supports_direct_upload():
+            return Response(
+                {'detail': 'Direct uploads are not enabled, submit documents as multipart form data'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = DocumentUploadURLSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        upload = presigned_upload(
+            bgv_request.id,
+            serializer.validated_data['document_type'],
+            serializer.validated_data['content_type'],
+            serializer.validated_data['filename'],
+        )
+        return Response({'detail': 'Upload URL created', **upload}, status=status.HTTP_201_CREATED)
+
+
+class ConfirmDocumentsView(DocumentSubmissionMixin, APIView):
+    """Attach documents uploaded through presigned POSTs and mark the request submitted"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        bgv_request = get_object_or_404(BGVRequest, pk=pk, user=request.user)
+
+        if not supports_direct_upload():
+            return Response(
+                {'detail': 'Direct uploads are not enabled, submit documents as multipart form data'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = request_fingerprint(request, request.data)
+        replayed = self.replay(request, fingerprint)
+        if replayed:
+            return replayed
+
+        serializer = DocumentConfirmSerializer(data=request.data, context={'bgv_request': bgv_request})
+        serializer.is_valid(raise_exception=True)
+
+        return self.submit(request, bgv_request, {
+            entry['document_type']: entry['name'] for entry in serializer.validated_data['documents']
+        }, fingerprint)
+
+
+def upload_session_response(session, detail, status_code=status.HTTP_200_OK):
+    response = Response({'detail': detail, **DocumentUploadSessionSerializer(session).data}, status=status_code)
+    response['Upload-Offset'] = str(session.received_size)
+    response['Upload-Length'] = str(session.total_size)
+    return response
+
+
+class CreateUploadSessionView(APIView):
+    """Open a resumable upload for one document"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        bgv_request = get_object_or_404(BGVRequest, pk=pk, user=request.user)
+
+        serializer = DocumentUploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = serializer.save(bgv_request=bgv_request)
+
+        return upload_session_response(session, 'Upload session created', status.HTTP_201_CREATED)
+
+
+class UploadSessionMixin:
+    def get_session(self, request, session_id, lock=False):
+        queryset = DocumentUploadSession.objects.filter(bgv_request__user=request.user)
+        if lock:
+            queryset = queryset.select_for_update(of=('self',))
+        return get_object_or_404(queryset, pk=session_id)
+
+
+class UploadSessionView(UploadSessionMixin, APIView):
+    """Current offset of a resumable upload (GET/HEAD) and chunk appends (PATCH)"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, session_id):
+        return upload_session_response(self.get_session(request, session_id), 'Upload session found')
+
+    def patch(self, request, session_id):
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers.get('Content-Length') or 0)
+        except (KeyError, ValueError):
+            return Response({'detail': 'Upload-Offset and Content-Length headers are required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if length < 1:
+            return Response({'detail': 'Chunk is empty'}, status=status.HTTP_400_BAD_REQUEST)
+        if length > settings.DOCUMENT_UPLOAD_CHUNK_SIZE:
+            return Response(
+                {'detail': f'Chunks may be at most {settings.DOCUMENT_UPLOAD_CHUNK_SIZE} bytes'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        # Receive the chunk before locking the session, so a slow client holds no
+        # database lock; the offset is checked again under the lock before appending
+        session = self.get_session(request, session_id)
+        rejected = self.reject_chunk(session, offset, length)
+        if rejected:
+            return rejected
+        try:
+            chunk = receive_chunk(
+                session, request.stream, length, parse_checksum(request.headers.get('Upload-Checksum'))
+            )
+        except ChunkError as e:
+            return upload_session_response(session, str(e), status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                session = self.get_session(request, session_id, lock=True)
+                rejected = self.reject_chunk(session, offset, length)
+                if rejected:
+                    return rejected
+                session.received_size = append_chunk(session, chunk)
+                session.save(update_fields=['received_size', 'updated_at'])
+        finally:
+            chunk.unlink(missing_ok=True)
+
+        return upload_session_response(session, 'Chunk received')
+
+    def reject_chunk(self, session, offset, length):
+        """Error response if a chunk of `length` bytes can't be appended at `offset`, else None."""
+        if session.status != DocumentUploadSession.Status.UPLOADING:
+            return upload_session_response(session, 'Upload already finalized', status.HTTP_409_CONFLICT)
+        if offset != session.received_size:
+            return upload_session_response(session, 'Upload-Offset does not match the current offset', status.HTTP_409_CONFLICT)
+        if offset + length > session.total_size:
+            return Response({'detail': 'Chunk exceeds the declared file size'}, status=status.HTTP_400_BAD_REQUEST)
+        return None
+
+
+class FinalizeUploadView(UploadSessionMixin, DocumentSubmissionMixin, APIView):
+    """
+    Verify a fully received upload, store it as a Document and mark the request submitted.
+    Finalizing a completed session again replays the result, so retries are safe.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, session_id):
+        with transaction.atomic():
+            session = self.get_session(request, session_id, lock=True)
+
+            if session.status == DocumentUploadSession.Status.COMPLETED:
+                return self.submitted_response(request, session.bgv_request, replayed=True)
+            if session.received_size != session.total_size:
+                return upload_session_response(session, 'Upload is incomplete', status.HTTP_409_CONFLICT)
+
+            path = part_path(session)
+            if session.checksum and file_checksum(path) != session.checksum:
+                # Start over rather than keep bytes we know are corrupt
+                discard_part(session)
+                session.received_size = 0
+                session.save(update_fields=['received_size', 'updated_at'])
+                return upload_session_response(session, 'Checksum mismatch, upload the file again', status.HTTP_400_BAD_REQUEST)
+
+            bgv_request = session.bgv_request
+            with open(path, 'rb') as fh:
+                attach_documents(bgv_request, {session.document_type: File(fh, name=session.filename)})
+
+            session.status = DocumentUploadSession.Status.COMPLETED
+            session.save(update_fields=['status', 'updated_at'])
+            transaction.on_commit(lambda: discard_part(session))
+
+        return self.submitted_response(request, bgv_request)
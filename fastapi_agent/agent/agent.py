@@ -3,22 +3,57 @@ LangChain agent setup with Google Gemini.
 Creates and configures the agent for BGV workflows using LangChain 1.1.0+ API.
 """
 from langchain.agents import create_agent
+from langchain.agents.middleware import AgentMiddleware
 from langchain_google_genai import ChatGoogleGenerativeAI
 from agent.tools import ALL_TOOLS
 from agent.prompts import AGENT_SYSTEM_PROMPT
 from core.config import settings
 from core.rate_limiter import get_rate_limiter
+from services.checkpoints import checkpoint_store
+from langchain_core.messages import AIMessage
+import asyncio
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 
 
-def create_bgv_agent():
-    logger.info(f"Initializing BGV agent with model: {settings.gemini_model}")
+def model_for_workflow(workflow: str) -> str:
+    """Model a workflow runs on: the fast model for routine flows, the main one otherwise."""
+    if workflow in settings.fast_model_workflows:
+        return settings.gemini_fast_model
+    return settings.gemini_model
+
+
+class ModelRateLimit(AgentMiddleware):
+    """
+    Take a token from the model's rate budget (settings.model_rate_limits)
+    before every model call, so an agent run of several turns spends one per
+    turn, the same unit as the per-minute model quotas the budgets come from.
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        self.rate_limiter = get_rate_limiter(model)
+
+    def wrap_model_call(self, request, handler):
+        if not self.rate_limiter.acquire(True):
+            raise Exception("Rate limiter failed to acquire token")
+        return handler(request)
+
+    async def awrap_model_call(self, request, handler):
+        # acquire() may sleep, so off the event loop
+        if not await asyncio.to_thread(self.rate_limiter.acquire, True):
+            raise Exception("Rate limiter failed to acquire token")
+        return await handler(request)
+
+
+def create_bgv_agent(model=None):
+    model = model or settings.gemini_model
+    logger.info(f"Initializing BGV agent with model: {model}")
 
     llm = ChatGoogleGenerativeAI(
-        model=settings.gemini_model,
+        model=model,
         google_api_key=settings.google_api_key,
         temperature=0.1,
         # Add retry configuration for quota errors
@@ -29,6 +64,7 @@ def create_bgv_agent():
         model=llm,
         tools=ALL_TOOLS,
         system_prompt=AGENT_SYSTEM_PROMPT,
+        middleware=[ModelRateLimit(model)],
         debug=True  
     )
 
@@ -36,46 +72,57 @@ def create_bgv_agent():
     return agent
 
 
-_agent = None
-_cached_model = None
+# One agent instance per model
+_agents = {}
 
 
-def get_agent():
+def get_agent(model=None):
     """
-    Get or create the agent instance.
-    Automatically recreates agent if model has changed.
+    Get or create the agent instance for a model (default: settings.gemini_model).
+    Changing a model setting routes to a new instance without a reset.
     """
-    global _agent, _cached_model
-    
-    current_model = settings.gemini_model
-    
-    # Recreate agent if model changed or agent doesn't exist
-    if _agent is None or _cached_model != current_model:
-        logger.info(f"Creating new agent instance (model: {current_model})")
-        _agent = create_bgv_agent()
-        _cached_model = current_model
+    model = model or settings.gemini_model
+
+    if model not in _agents:
+        logger.info(f"Creating new agent instance (model: {model})")
+        _agents[model] = create_bgv_agent(model)
     else:
-        logger.debug(f"Using cached agent instance (model: {current_model})")
-    
-    return _agent
+        logger.debug(f"Using cached agent instance (model: {model})")
+
+    return _agents[model]
 
 
 def reset_agent():
-    """Force reset of cached agent (useful for testing or model changes)."""
-    global _agent, _cached_model
-    _agent = None
-    _cached_model = None
+    """Force reset of cached agents (useful for testing or model changes)."""
+    _agents.clear()
     logger.info("Agent cache reset")
 
 
-def invoke_agent_with_rate_limit(agent, messages, max_retries=3):
+def _timing(messages, started):
+    """Wall time of a run plus how many model turns and tool calls it took."""
+    turns = [m for m in messages if isinstance(m, AIMessage)]
+    return {
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "model_turns": len(turns),
+        "tool_calls": sum(len(m.tool_calls) for m in turns),
+        "max_parallel_tool_calls": max((len(m.tool_calls) for m in turns), default=0),
+    }
+
+
+async def invoke_agent_with_rate_limit(agent, messages, max_retries=3, on_step=None):
     """
-    Invoke agent with rate limiting and quota error handling.
+    Invoke agent with quota error handling. The agent takes a token from its
+    model's rate budget before each model call (see ModelRateLimit).
+
+    Runs on the event loop, so the tool calls the model issues in one turn
+    execute concurrently (async tools on the async DjangoClient, sync ones in
+    worker threads). The result carries a "timing" entry (see _timing).
     
     Args:
         agent: The agent instance
         messages: Messages to send to agent
         max_retries: Maximum retry attempts for quota errors
+        on_step: Coroutine awaited with the conversation after every agent step (optional)
         
     Returns:
         Agent result
@@ -83,16 +130,23 @@ def invoke_agent_with_rate_limit(agent, messages, max_retries=3):
     Raises:
         Exception: If all retries exhausted or non-quota error occurs
     """
-    rate_limiter = get_rate_limiter()
-    
     for attempt in range(max_retries + 1):
         try:
-            # Acquire rate limit token
-            if not rate_limiter.acquire(wait=True):
-                raise Exception("Rate limiter failed to acquire token")
-            
             # Invoke agent
-            result = agent.invoke({"messages": messages})
+            started = time.perf_counter()
+            if on_step is None:
+                result = await agent.ainvoke({"messages": messages})
+            else:
+                result = None
+                async for state in agent.astream({"messages": messages}, stream_mode="values"):
+                    result = state
+                    await on_step(state["messages"])
+
+            result["timing"] = _timing(result["messages"][len(messages):], started)
+            logger.info(
+                f"Agent run finished in {result['timing']['duration_ms']}ms "
+                f"({result['timing']['model_turns']} model turns, {result['timing']['tool_calls']} tool calls)"
+            )
             return result
             
         except Exception as e:
@@ -114,9 +168,28 @@ def invoke_agent_with_rate_limit(agent, messages, max_retries=3):
                     f"Quota error detected (attempt {attempt + 1}/{max_retries + 1}). "
                     f"Waiting {wait_time}s before retry..."
                 )
-                time.sleep(wait_time)
+                await asyncio.sleep(wait_time)
                 continue
             else:
                 # Non-quota error or max retries reached
                 logger.error(f"Agent invocation failed: {str(e)}")
                 raise
+
+
+async def invoke_workflow(agent, messages, bgv_request_id, workflow, secrets=None):
+    """
+    Invoke agent for a checkpointed workflow run (see services/checkpoints.py).
+
+    A run that already completed returns its recorded conversation without
+    calling the model; an interrupted one continues from its last saved step.
+    Side-effect tools called inside the run replay their recorded results.
+    `secrets` (`{name: value}`) are kept out of the stored checkpoints.
+    """
+    async with checkpoint_store.run(bgv_request_id, workflow, secrets) as run:
+        if run.completed:
+            logger.info(f"{workflow} run for BGV #{bgv_request_id} already completed, returning recorded result")
+            return {"messages": run.messages}
+
+        result = await invoke_agent_with_rate_limit(agent, run.messages or messages, on_step=run.save)
+        await run.complete(result["messages"])
+        return result
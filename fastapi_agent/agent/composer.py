@@ -0,0 +1,203 @@
+"""
+Structured-output email composer, an alternative to the tool-calling agent loop.
+
+The agent loop spends a model round-trip per step (fetch, analyze, send, log,
+status). Here the code gathers the candidate summary itself, the model is
+called once to return a typed `EmailDraft`, and the code sends the email and
+records the outcome. Drafts that fail validation (missing credentials, not
+HTML) are retried up to `composer_max_attempts` times.
+
+Selected with EMAIL_COMPOSER=structured. Side effects go through the same
+tools as the agent inside a checkpointed run, so a retried job does not send
+the email twice.
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from langchain_core.exceptions import OutputParserException
+from langchain_google_genai import ChatGoogleGenerativeAI
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from agent.prompts import COMPOSER_SYSTEM_PROMPT, ONBOARDING_COMPOSE_PROMPT_TEMPLATE, REMINDER_COMPOSE_PROMPT_TEMPLATE
+from agent.tools import log_agent_action, profile_analysis, send_email_to_candidate, transition_bgv_status
+from core.config import settings
+from core.rate_limiter import get_rate_limiter
+from services.checkpoints import checkpoint_store
+from services.django_client import django_client
+
+logger = logging.getLogger(__name__)
+
+
+class EmailDraft(BaseModel):
+    """An email written by the model"""
+    subject: str = Field(min_length=3, max_length=200, description="Email subject line")
+    body_html: str = Field(min_length=50, description="Email body as HTML")
+
+    @field_validator("subject")
+    @classmethod
+    def single_line(cls, value: str) -> str:
+        return " ".join(value.split())
+
+    @field_validator("body_html")
+    @classmethod
+    def is_html(cls, value: str) -> str:
+        if "<" not in value or ">" not in value:
+            raise ValueError("body_html must be HTML")
+        return value.strip()
+
+
+class DraftRejected(ValueError):
+    """The draft is well-formed but leaves out something the email must contain."""
+
+
+# One structured-output runnable per model
+_composers = {}
+
+
+def get_composer(model: str):
+    if model not in _composers:
+        logger.info(f"Creating email composer (model: {model})")
+        llm = ChatGoogleGenerativeAI(
+            model=model,
+            google_api_key=settings.google_api_key,
+            temperature=0.1,
+            max_retries=3,
+        )
+        _composers[model] = llm.with_structured_output(EmailDraft)
+    return _composers[model]
+
+
+def reset_composers():
+    _composers.clear()
+
+
+def login_url() -> str:
+    return f"{settings.frontend_url.rstrip('/')}/login"
+
+
+async def compose(prompt: str, model: str, check: Optional[Callable[[EmailDraft], None]] = None) -> Tuple[EmailDraft, int]:
+    """
+    One model call returning a validated EmailDraft.
+
+    Args:
+        prompt: Workflow prompt with everything the email needs
+        model: Model to compose with; its rate budget is used
+        check: Raises DraftRejected if a valid draft is still unusable
+
+    Returns:
+        `(draft, model_calls)`
+
+    Raises:
+        ValueError: If no acceptable draft came back within composer_max_attempts
+    """
+    composer = get_composer(model)
+    rate_limiter = get_rate_limiter(model)
+    messages = [("system", COMPOSER_SYSTEM_PROMPT), ("user", prompt)]
+
+    for attempt in range(1, settings.composer_max_attempts + 1):
+        if not await asyncio.to_thread(rate_limiter.acquire, True):
+            raise Exception("Rate limiter failed to acquire token")
+        try:
+            draft = await composer.ainvoke(messages)
+            if draft is None:
+                raise DraftRejected("model returned no draft")
+            if not isinstance(draft, EmailDraft):
+                draft = EmailDraft.model_validate(draft)
+            if check:
+                check(draft)
+            return draft, attempt
+        except (ValidationError, OutputParserException, DraftRejected) as e:
+            logger.warning(f"Rejected email draft (attempt {attempt}/{settings.composer_max_attempts}): {str(e)}")
+            error = e
+
+    raise ValueError(f"No acceptable email draft: {error}")
+
+
+def _timing(started: float, model_calls: int, tool_calls: int) -> Dict:
+    return {
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "model_turns": model_calls,
+        "tool_calls": tool_calls,
+        "max_parallel_tool_calls": 1,
+    }
+
+
+def _require_success(result: Dict, step: str) -> Dict:
+    if not result.get('success'):
+        raise Exception(f"{step} failed: {result.get('error')}")
+    return result
+
+
+async def compose_onboarding(payload, model: str) -> Dict:
+    """Send the onboarding email composed in one model call, then record the status change."""
+    started = time.perf_counter()
+    bgv_data = await django_client.afetch_bgv_request(payload.bgv_request_id)
+    analysis = profile_analysis(bgv_data.get('data', bgv_data))
+
+    prompt = ONBOARDING_COMPOSE_PROMPT_TEMPLATE.format(
+        candidate_name=payload.candidate_name,
+        candidate_email=payload.candidate_email,
+        role=analysis['role'] or "not specified",
+        total_experience=analysis['total_experience'],
+        seniority=analysis['seniority'],
+        leadership=", leadership role" if analysis['is_leadership'] else "",
+        tone=analysis['tone'],
+        login_url=login_url(),
+        temp_password=payload.temp_password
+    )
+
+    def check(draft: EmailDraft):
+        if payload.temp_password not in draft.body_html:
+            raise DraftRejected("the temporary password is missing from the email")
+
+    async with checkpoint_store.run(payload.bgv_request_id, "onboarding", {"temp_password": payload.temp_password}):
+        draft, model_calls = await compose(prompt, model, check)
+        sent = _require_success(await send_email_to_candidate.ainvoke({
+            'to_email': payload.candidate_email, 'subject': draft.subject, 'body_html': draft.body_html
+        }), "Sending the onboarding email")
+        _require_success(await transition_bgv_status.ainvoke({
+            'bgv_request_id': payload.bgv_request_id,
+            'status': 'documents_requested',
+            'action': 'request_sent',
+            'message': f"Onboarding email sent: {draft.subject}",
+            'metadata': {'email_message_id': sent.get('message_id'), 'composer': 'structured'}
+        }), "Recording the onboarding")
+
+    return {"subject": draft.subject, "timing": _timing(started, model_calls, 2)}
+
+
+async def compose_reminder(bgv_request_id: int, context, model: str, workflow: Optional[str] = None) -> Dict:
+    """Send a reminder composed in one model call from the precomputed context, then log it."""
+    started = time.perf_counter()
+    prompt = REMINDER_COMPOSE_PROMPT_TEMPLATE.format(
+        candidate_name=context.candidate_name,
+        role=context.role or "not specified",
+        days_pending=context.days_pending,
+        reminder_count=context.reminder_count,
+        last_reminder_at=context.last_reminder_at or "never",
+        urgency=context.urgency,
+        login_url=login_url()
+    )
+
+    async def send():
+        draft, model_calls = await compose(prompt, model)
+        sent = _require_success(await send_email_to_candidate.ainvoke({
+            'to_email': context.candidate_email, 'subject': draft.subject, 'body_html': draft.body_html
+        }), "Sending the reminder")
+        _require_success(await log_agent_action.ainvoke({
+            'bgv_request_id': bgv_request_id,
+            'action': 'reminder_sent',
+            'message': f"Reminder sent ({context.urgency}, day {context.days_pending}): {draft.subject}",
+            'metadata': {'email_message_id': sent.get('message_id'), 'composer': 'structured'}
+        }), "Logging the reminder")
+        return draft, model_calls
+
+    if workflow:
+        async with checkpoint_store.run(bgv_request_id, workflow):
+            draft, model_calls = await send()
+    else:
+        draft, model_calls = await send()
+
+    return {"subject": draft.subject, "timing": _timing(started, model_calls, 2)}
@@ -33,28 +33,26 @@ Standard Documents Required:
 - Aadhaar Card (Address Verification)
 
 Workflow Steps for Credential Sending:
-1. Use fetch_bgv_request to get candidate profile data
-2. Use analyze_candidate_profile to determine seniority and tone
+1. Call fetch_bgv_request (candidate profile data) and analyze_candidate_profile (seniority and tone) together in one turn
+2. Wait for both results
 3. Generate appropriate email content based on analysis
 4. Use send_email_to_candidate to send the email
-5. Use log_agent_action to record the action (action='request_sent')
-6. Use update_bgv_status to change status to 'documents_requested'
+5. Use transition_bgv_status to change status to 'documents_requested' and record the action (action='request_sent') in one call
 
 Workflow Steps for Reminders:
-1. Use fetch_bgv_request to get current status and timeline
-2. Calculate days since initial request (check created_at field)
-3. Adjust tone based on urgency:
-   - 3-5 days: Gentle reminder
-   - 6-10 days: More urgent tone
-   - 10+ days: Strong emphasis on importance
-4. Check previous reminders in agent_logs (look for action='reminder_sent')
-5. Send reminder email
-6. Log the reminder action
+1. Read days pending, previous reminders and urgency from the prompt (no need to fetch them)
+2. Adjust tone based on urgency:
+   - gentle (up to 5 days): Gentle reminder
+   - firm (6-10 days): More urgent tone
+   - urgent (over 10 days): Strong emphasis on importance
+3. Send reminder email
+4. Log the reminder action
 
 Important Rules:
 - ALWAYS use tools to perform actions - never make assumptions
 - Log EVERY significant action you take
 - Verify success of each tool call before proceeding
+- When several tool calls don't depend on each other's results, request them all in the same turn; they run in parallel
 - If a tool fails, explain the error and suggest next steps
 - Be professional and respectful in all communications
 - Never include sensitive data (passwords, etc.) in log messages
@@ -74,13 +72,13 @@ Candidate Information:
 
 Your Task - Complete ALL steps in ONE workflow:
 1. Fetch the candidate's complete profile using fetch_bgv_request
-2. Analyze their seniority level and role to determine appropriate tone
+2. Analyze their seniority level and role using analyze_candidate_profile
+   (steps 1 and 2 are independent: call both tools in the same turn)
 3. Compose a personalized onboarding email that includes BOTH:
    a) Their login credentials (email + temporary password)
    b) Document request (PAN Card and Aadhaar Card)
 4. Send the email using send_email_to_candidate
-5. Log the action using log_agent_action (action='request_sent')
-6. Update status to 'documents_requested' using update_bgv_status
+5. Use transition_bgv_status ONCE to update status to 'documents_requested' and log the action (action='request_sent')
 
 The email MUST include:
 - Personalized greeting (adjust formality based on seniority)
@@ -108,19 +106,91 @@ Send a document submission reminder to a candidate.
 BGV Request ID: {bgv_request_id}
 Trigger: {trigger}
 
+Reminder Context (already computed - do not fetch or recalculate it):
+- Name: {candidate_name}
+- Email: {candidate_email}
+- Role: {role}
+- Days pending: {days_pending}
+- Previous reminders: {reminder_count} (last sent: {last_reminder_at})
+- Urgency: {urgency}
+
 Your Task:
-1. Fetch the BGV request details
-2. Calculate how many days have passed since the request was created
-3. Check if any previous reminders were sent (in agent_logs)
-4. Determine the appropriate reminder tone based on days pending
-5. Compose and send a context-aware reminder email
-6. Log the reminder action (action='reminder_sent')
+1. Compose a reminder email in the tone for the urgency above and send it with send_email_to_candidate
+2. Log the reminder action (action='reminder_sent')
 
 The reminder should be:
 - Polite but clear about the importance
+- Acknowledge previous reminders if any were sent
 - Include login URL again
 - List the required documents
 - More urgent if many days have passed
 
 Begin!
 """
+
+
+COMPOSER_SYSTEM_PROMPT = """You write emails for TraqCheck Background Verification System.
+You are given everything needed about the candidate; return only the email's subject and HTML body.
+
+- Match the tone given for the candidate (friendly for junior, professional for mid-level, formal for senior)
+- Emphasize priority for leadership roles
+- Personalized greeting with the candidate's name, clear instructions, professional closing
+- Use simple, well-formed HTML (paragraphs, lists, bold), no <html>/<head> wrapper
+- Never invent details that are not given to you
+"""
+
+
+ONBOARDING_COMPOSE_PROMPT_TEMPLATE = """
+Write the onboarding email for a new candidate: login credentials AND the document request in ONE email.
+
+Candidate:
+- Name: {candidate_name}
+- Email: {candidate_email}
+- Role: {role}
+- Experience: {total_experience} years ({seniority}{leadership})
+- Tone: {tone}
+
+The email MUST include:
+- Brief introduction to the BGV process
+- Login credentials section:
+  * Login URL: {login_url}
+  * Email: {candidate_email}
+  * Temporary Password: {temp_password}
+  * Instruction to change password after first login
+- Required documents section:
+  * PAN Card (for identity verification)
+  * Aadhaar Card (for address verification)
+- Clear call-to-action to login and upload documents
+"""
+
+
+REMINDER_COMPOSE_PROMPT_TEMPLATE = """
+Write a document submission reminder.
+
+Candidate:
+- Name: {candidate_name}
+- Role: {role}
+- Days pending: {days_pending}
+- Previous reminders: {reminder_count} (last sent: {last_reminder_at})
+- Urgency: {urgency} (gentle: polite nudge; firm: more urgent; urgent: strong emphasis on importance)
+
+The reminder should:
+- Acknowledge previous reminders if any were sent
+- Include the login URL: {login_url}
+- List the required documents: PAN Card and Aadhaar Card
+"""
+
+
+DOCUMENTS_RECEIVED_EMAIL_SUBJECT = "We've received your documents - TraqCheck Background Verification"
+
+DOCUMENTS_RECEIVED_EMAIL_TEMPLATE = """<p>Hi {candidate_name},</p>
+<p>Thank you for submitting your documents. We have received the following:</p>
+<ul>{document_items}</ul>
+<p>Our team will now review them. There is nothing else you need to do for now, and you will not receive further reminders about these documents.</p>
+<p>Best regards,<br>TraqCheck Background Verification</p>
+"""
+
+DOCUMENT_TYPE_LABELS = {
+    'pan': 'PAN Card',
+    'aadhaar': 'Aadhaar Card',
+}
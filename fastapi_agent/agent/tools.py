@@ -1,6 +1,8 @@
 from langchain.tools import tool
 from services.django_client import django_client
 from services.email_service import email_service
+from services.agent_log_buffer import agent_log_buffer
+from services.checkpoints import replayable
 from typing import Dict, Any
 import logging
 
@@ -8,10 +10,10 @@ logger = logging.getLogger(__name__)
 
 
 @tool
-def fetch_bgv_request(bgv_request_id: int) -> dict:
+async def fetch_bgv_request(bgv_request_id: int) -> dict:
     """Fetch complete BGV request data including candidate profile, work experience, education, skills, and current status. Use this tool to get detailed information about a candidate before taking any action."""
     try:
-        data = django_client.fetch_bgv_request(bgv_request_id)
+        data = await django_client.afetch_bgv_request(bgv_request_id)
         return {
             'success': True,
             'data': data
@@ -24,44 +26,47 @@ def fetch_bgv_request(bgv_request_id: int) -> dict:
         }
 
 
+def profile_analysis(bgv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Seniority, tone and leadership classification of a fetched BGV request."""
+    total_exp = bgv_data.get('total_work_experience') or 0
+    role = bgv_data.get('role') or ''
+    work_experiences = bgv_data.get('work_experiences', [])
+    skills = bgv_data.get('skills', [])
+
+    if total_exp <= 3:
+        seniority = "junior"
+        tone = "friendly and encouraging"
+    elif total_exp <= 7:
+        seniority = "mid-level"
+        tone = "professional and direct"
+    else:
+        seniority = "senior"
+        tone = "formal and respectful"
+
+    leadership_keywords = ['cto', 'vp', 'director', 'head', 'lead', 'principal', 'chief']
+    is_leadership = any(keyword in role.lower() for keyword in leadership_keywords)
+
+    return {
+        'seniority': seniority,
+        'tone': tone,
+        'total_experience': total_exp,
+        'role': role,
+        'is_leadership': is_leadership,
+        'num_work_experiences': len(work_experiences),
+        'num_skills': len(skills),
+        'required_documents': ['PAN Card', 'Aadhaar Card'],
+        'recommendation': f"Use {tone} tone for communication. Candidate has {total_exp} years of experience."
+    }
+
+
 @tool
-def analyze_candidate_profile(bgv_request_id: int) -> dict:
-    """Analyze candidate's role, total work experience, and background to determine their seniority level (junior/mid/senior) and appropriate communication tone. Returns analysis summary with seniority classification."""
+async def analyze_candidate_profile(bgv_request_id: int) -> dict:
+    """Analyze candidate's role, total work experience, and background to determine their seniority level (junior/mid/senior) and appropriate communication tone. Returns analysis summary with seniority classification. Independent of fetch_bgv_request, so both can be called in the same turn."""
     try:
-        bgv_data = django_client.fetch_bgv_request(bgv_request_id)
-
-        total_exp = bgv_data.get('total_work_experience', 0)
-        role = bgv_data.get('role', '')
-        work_experiences = bgv_data.get('work_experiences', [])
-        skills = bgv_data.get('skills', [])
-
-        if total_exp <= 3:
-            seniority = "junior"
-            tone = "friendly and encouraging"
-        elif total_exp <= 7:
-            seniority = "mid-level"
-            tone = "professional and direct"
-        else:
-            seniority = "senior"
-            tone = "formal and respectful"
-
-        leadership_keywords = ['cto', 'vp', 'director', 'head', 'lead', 'principal', 'chief']
-        is_leadership = any(keyword in role.lower() for keyword in leadership_keywords)
-
-        analysis = {
-            'success': True,
-            'seniority': seniority,
-            'tone': tone,
-            'total_experience': total_exp,
-            'role': role,
-            'is_leadership': is_leadership,
-            'num_work_experiences': len(work_experiences),
-            'num_skills': len(skills),
-            'required_documents': ['PAN Card', 'Aadhaar Card'],
-            'recommendation': f"Use {tone} tone for communication. Candidate has {total_exp} years of experience."
-        }
+        bgv_data = await django_client.afetch_bgv_request(bgv_request_id)
+        analysis = {'success': True, **profile_analysis(bgv_data)}
 
-        logger.info(f"Profile analysis for BGV #{bgv_request_id}: {seniority} level")
+        logger.info(f"Profile analysis for BGV #{bgv_request_id}: {analysis['seniority']} level")
         return analysis
 
     except Exception as e:
@@ -73,6 +78,7 @@ def analyze_candidate_profile(bgv_request_id: int) -> dict:
 
 
 @tool
+@replayable(lambda to_email, **_: to_email)
 def send_email_to_candidate(to_email: str, subject: str, body_html: str) -> dict:
     """Send a professional HTML email to candidate using AWS SES. Use this for sending credentials, document requests, or reminders. The email body should be well-formatted HTML."""
     try:
@@ -98,6 +104,7 @@ def send_email_to_candidate(to_email: str, subject: str, body_html: str) -> dict
 
 
 @tool
+@replayable(lambda action, **_: action)
 def log_agent_action(bgv_request_id: int, action: str, message: str, metadata: dict = None) -> dict:
     """Log agent action in Django database for audit trail. Action must be one of: 'analysis', 'request_sent', 'reminder_sent'. This creates a permanent record of all agent activities."""
     try:
@@ -105,17 +112,18 @@ def log_agent_action(bgv_request_id: int, action: str, message: str, metadata: d
         if action not in valid_actions:
             raise ValueError(f"Invalid action. Must be one of: {valid_actions}")
 
-        result = django_client.create_agent_log(
+        # Written to Django in the background by the buffered logger
+        agent_log_buffer.add(
             bgv_request_id=bgv_request_id,
             action=action,
             message=message,
             metadata=metadata or {}
         )
 
-        logger.info(f"Logged action '{action}' for BGV #{bgv_request_id}")
+        logger.info(f"Queued action '{action}' log for BGV #{bgv_request_id}")
         return {
             'success': True,
-            'log_id': result.get('id'),
+            'queued': True,
             'action': action
         }
 
@@ -128,14 +136,15 @@ def log_agent_action(bgv_request_id: int, action: str, message: str, metadata: d
 
 
 @tool
-def update_bgv_status(bgv_request_id: int, status: str) -> dict:
+@replayable(lambda status, **_: status)
+async def update_bgv_status(bgv_request_id: int, status: str) -> dict:
     """Update BGVRequest status in Django. Valid statuses: 'pending_analysis', 'documents_requested', 'documents_submitted', 'completed'. Use this to track workflow progression."""
     try:
         valid_statuses = ['pending_analysis', 'documents_requested', 'documents_submitted', 'completed']
         if status not in valid_statuses:
             raise ValueError(f"Invalid status. Must be one of: {valid_statuses}")
 
-        result = django_client.update_bgv_status(
+        result = await django_client.aupdate_bgv_status(
             bgv_request_id=bgv_request_id,
             status=status
         )
@@ -155,10 +164,48 @@ def update_bgv_status(bgv_request_id: int, status: str) -> dict:
         }
 
 
+@tool
+@replayable(lambda status, action, **_: [status, action])
+async def transition_bgv_status(bgv_request_id: int, status: str, action: str, message: str, metadata: dict = None) -> dict:
+    """Update BGVRequest status AND log the agent action in a single atomic call. Prefer this over calling log_agent_action and update_bgv_status separately at the end of a workflow. Valid statuses: 'pending_analysis', 'documents_requested', 'documents_submitted', 'completed'. Action must be one of: 'analysis', 'request_sent', 'reminder_sent'."""
+    try:
+        valid_statuses = ['pending_analysis', 'documents_requested', 'documents_submitted', 'completed']
+        if status not in valid_statuses:
+            raise ValueError(f"Invalid status. Must be one of: {valid_statuses}")
+
+        valid_actions = ['analysis', 'request_sent', 'reminder_sent']
+        if action not in valid_actions:
+            raise ValueError(f"Invalid action. Must be one of: {valid_actions}")
+
+        result = await django_client.atransition_bgv_request(
+            bgv_request_id=bgv_request_id,
+            status=status,
+            action=action,
+            message=message,
+            metadata=metadata or {}
+        )
+
+        logger.info(f"Transitioned BGV #{bgv_request_id} to {status} (action '{action}')")
+        return {
+            'success': True,
+            'bgv_request_id': bgv_request_id,
+            'new_status': status,
+            'log_id': result.get('agent_log_id')
+        }
+
+    except Exception as e:
+        logger.error(f"Tool error - transition_bgv_status: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+
 ALL_TOOLS = [
     fetch_bgv_request,
     analyze_candidate_profile,
     send_email_to_candidate,
     log_agent_action,
-    update_bgv_status
+    update_bgv_status,
+    transition_bgv_status
 ]
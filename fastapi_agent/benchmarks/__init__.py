@@ -0,0 +1,3 @@
+"""
+Benchmarks for agent workflows using local stand-ins for Gemini, Django and SES.
+"""
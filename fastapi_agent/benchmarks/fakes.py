@@ -0,0 +1,276 @@
+"""
+Local stand-ins used by the benchmark harness.
+
+- ScriptedChatModel: a chat model that replays the tool calls a well-behaved
+  Gemini run would make, so agent overhead can be measured without an API key.
+- FakeDjangoAPI: in-memory replacement for the Django endpoints the tools call,
+  with optional simulated latency per call.
+- mocked_ses(): moto-backed SES with the sender identity pre-verified.
+"""
+import asyncio
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import boto3
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from moto import mock_aws
+
+
+BENCH_ENV = {
+    'GOOGLE_API_KEY': 'bench-key',
+    'DJANGO_API_URL': 'http://django.bench',
+    'DJANGO_SERVICE_SECRET': 'bench-secret',
+    'AWS_SES_ACCESS_KEY_ID': 'testing',
+    'AWS_SES_SECRET_ACCESS_KEY': 'testing',
+    'AWS_SES_REGION_NAME': 'us-east-1',
+    'DEFAULT_FROM_EMAIL': 'bench@traqcheck.local',
+    'FRONTEND_URL': 'http://localhost:3000',
+    'LOG_LEVEL': 'WARNING',
+}
+
+
+def _prompt_field(messages: List[BaseMessage], label: str) -> Optional[str]:
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            match = re.search(rf'{label}:\s*(\S+)', message.content)
+            if match:
+                return match.group(1)
+    return None
+
+
+def onboarding_script(messages: List[BaseMessage]) -> List[List[Dict[str, Any]]]:
+    """Tool calls for the onboarding workflow, one list per model turn, in the order the prompt asks for them."""
+    bgv_id = int(_prompt_field(messages, 'BGV Request ID'))
+    email = _prompt_field(messages, 'Email')
+    return [
+        [
+            {'name': 'fetch_bgv_request', 'args': {'bgv_request_id': bgv_id}},
+            {'name': 'analyze_candidate_profile', 'args': {'bgv_request_id': bgv_id}},
+        ],
+        [{'name': 'send_email_to_candidate', 'args': {
+            'to_email': email,
+            'subject': 'Welcome to TraqCheck - Background Verification',
+            'body_html': '<p>Hello,</p><p>Please log in and upload your PAN and Aadhaar cards.</p>',
+        }}],
+        [{'name': 'transition_bgv_status', 'args': {
+            'bgv_request_id': bgv_id, 'status': 'documents_requested',
+            'action': 'request_sent', 'message': 'Onboarding email sent',
+        }}],
+    ]
+
+
+def reminder_script(messages: List[BaseMessage]) -> List[List[Dict[str, Any]]]:
+    """Tool calls for the reminder workflow, one list per model turn; the context is in the prompt."""
+    bgv_id = int(_prompt_field(messages, 'BGV Request ID'))
+    return [
+        [{'name': 'send_email_to_candidate', 'args': {
+            'to_email': _prompt_field(messages, 'Email'),
+            'subject': 'Reminder: documents pending',
+            'body_html': '<p>A gentle reminder to upload your documents.</p>',
+        }}],
+        [{'name': 'log_agent_action', 'args': {
+            'bgv_request_id': bgv_id, 'action': 'reminder_sent', 'message': 'Reminder sent',
+        }}],
+    ]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Fake Gemini model that issues the scripted tool calls for each turn.
+
+    The script is chosen from the prompt and advanced by counting the model
+    turns already in the conversation, so a single instance can serve
+    concurrent runs. `latency` simulates per-call model latency in seconds.
+    With `parallel_tools` off, independent calls are issued one per turn, as
+    a model that doesn't batch tool calls would.
+    """
+
+    latency: float = 0.0
+    parallel_tools: bool = True
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return 'scripted-fake'
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def with_structured_output(self, schema, **kwargs):
+        """Structured-output composer: one call returning `schema` with the prompt's details filled in."""
+        def draft(messages):
+            text = '\n'.join(content for _, content in messages)
+            name = re.search(r'Name:\s*(.+)', text).group(1)
+            password = re.search(r'Temporary Password:\s*(\S+)', text)
+            credentials = f'<p>Your temporary password is <b>{password.group(1)}</b>.</p>' if password else ''
+            return schema(
+                subject='TraqCheck Background Verification',
+                body_html=f'<p>Hello {name},</p>{credentials}<p>Please log in and upload your PAN and Aadhaar cards.</p>',
+            )
+
+        async def adraft(messages):
+            self.calls += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return draft(messages)
+
+        return RunnableLambda(draft, afunc=adraft)
+
+    def _script_for(self, messages: List[BaseMessage]) -> Callable:
+        for message in messages:
+            if isinstance(message, HumanMessage) and 'reminder' in message.content.lower():
+                return reminder_script
+        return onboarding_script
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        turns = self._script_for(messages)(messages)
+        if not self.parallel_tools:
+            turns = [[step] for turn in turns for step in turn]
+        done = sum(1 for message in messages if isinstance(message, AIMessage) and message.tool_calls)
+        if done < len(turns):
+            message = AIMessage(content='', tool_calls=[
+                {'name': step['name'], 'args': step['args'], 'id': f'call_{done}_{n}', 'type': 'tool_call'}
+                for n, step in enumerate(turns[done])
+            ])
+        else:
+            message = AIMessage(content='Workflow completed.')
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class FakeDjangoAPI:
+    """In-memory Django API covering the calls made by the agent tools."""
+
+    @staticmethod
+    def candidate_email(bgv_request_id: int) -> str:
+        return f'bench.candidate{bgv_request_id}@example.com'
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.logs: List[Dict[str, Any]] = []
+        self.statuses: Dict[int, str] = {}
+
+    def fetch_bgv_request(self, bgv_request_id: int) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._bgv_request(bgv_request_id)
+
+    def _bgv_request(self, bgv_request_id: int) -> Dict[str, Any]:
+        created_at = datetime.now(timezone.utc) - timedelta(days=5)
+        return {
+            'id': bgv_request_id,
+            'first_name': 'Bench',
+            'last_name': f'Candidate{bgv_request_id}',
+            'email': self.candidate_email(bgv_request_id),
+            'role': 'Senior Software Engineer',
+            'total_work_experience': 6,
+            'status': self.statuses.get(bgv_request_id, 'documents_requested'),
+            'created_at': created_at.isoformat().replace('+00:00', 'Z'),
+            'work_experiences': [{'role': 'Engineer', 'company_name': f'Company {n}'} for n in range(3)],
+            'skills': [{'skill_name': name} for name in ('Python', 'Django', 'AWS')],
+            'agent_logs': [log for log in self.logs if log['bgv_request_id'] == bgv_request_id],
+        }
+
+    def reminder_context(self, bgv_request_id: int) -> Dict[str, Any]:
+        reminders = [log for log in self.logs if log['bgv_request_id'] == bgv_request_id and log['action'] == 'reminder_sent']
+        return {
+            'candidate_name': f'Bench Candidate{bgv_request_id}',
+            'candidate_email': self.candidate_email(bgv_request_id),
+            'role': 'Senior Software Engineer',
+            'status': self.statuses.get(bgv_request_id, 'documents_requested'),
+            'days_pending': 5,
+            'reminder_count': len(reminders),
+            'last_reminder_at': None,
+            'urgency': 'gentle',
+        }
+
+    def create_agent_log(self, bgv_request_id, action, message, metadata=None) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._agent_log(bgv_request_id, action, message, metadata)
+
+    def _agent_log(self, bgv_request_id, action, message, metadata=None) -> Dict[str, Any]:
+        entry = {
+            'id': len(self.logs) + 1,
+            'bgv_request_id': bgv_request_id,
+            'action': action,
+            'message': message,
+            'metadata': metadata or {},
+        }
+        self.logs.append(entry)
+        return entry
+
+    def create_agent_logs_bulk(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        return {'ids': [self._agent_log(**entry)['id'] for entry in entries]}
+
+    def update_bgv_status(self, bgv_request_id: int, status: str) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._status(bgv_request_id, status)
+
+    def _status(self, bgv_request_id: int, status: str) -> Dict[str, Any]:
+        self.statuses[bgv_request_id] = status
+        return {'id': bgv_request_id, 'status': status}
+
+    def transition_bgv_request(self, bgv_request_id, status, action, message, metadata=None) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._transition(bgv_request_id, status, action, message, metadata)
+
+    def _transition(self, bgv_request_id, status, action, message, metadata=None) -> Dict[str, Any]:
+        previous_status = self.statuses.get(bgv_request_id, 'pending_analysis')
+        self.statuses[bgv_request_id] = status
+        log = self._agent_log(bgv_request_id, action, message, metadata)
+        return {'id': bgv_request_id, 'status': status, 'previous_status': previous_status, 'agent_log_id': log['id']}
+
+    # Async counterparts of DjangoClient's a* methods
+
+    async def afetch_bgv_request(self, bgv_request_id: int) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        return self._bgv_request(bgv_request_id)
+
+    async def afetch_reminder_context(self, bgv_request_id: int) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        return self.reminder_context(bgv_request_id)
+
+    async def acreate_agent_log(self, bgv_request_id, action, message, metadata=None) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        return self._agent_log(bgv_request_id, action, message, metadata)
+
+    async def aupdate_bgv_status(self, bgv_request_id: int, status: str) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        return self._status(bgv_request_id, status)
+
+    async def atransition_bgv_request(self, bgv_request_id, status, action, message, metadata=None) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        return self._transition(bgv_request_id, status, action, message, metadata)
+
+
+@contextmanager
+def mocked_ses(email_service, from_email: str):
+    """Route `email_service` through moto's SES with `from_email` verified."""
+    with mock_aws():
+        client = boto3.client(
+            'ses',
+            region_name='us-east-1',
+            aws_access_key_id='testing',
+            aws_secret_access_key='testing',
+        )
+        client.verify_email_identity(EmailAddress=from_email)
+        original = email_service.ses_client
+        email_service.ses_client = client
+        try:
+            yield client
+        finally:
+            email_service.ses_client = original
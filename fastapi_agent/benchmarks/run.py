@@ -0,0 +1,188 @@
+"""
+Benchmark the agent workflows end to end through the FastAPI app.
+
+Gemini, the Django API and SES are replaced with local stand-ins, so results
+measure the service's own overhead plus any simulated model latency.
+
+Usage (from fastapi_agent/):
+    python -m benchmarks.run --iterations 50 --llm-latency-ms 0 --output benchmarks/baseline.json
+
+Differences between modes show once model and Django latency are simulated,
+e.g. --llm-latency-ms 300 --django-latency-ms 50:
+- --composer structured (one model call per email) vs the default agent loop
+- --sequential-tools (one tool call per model turn) vs parallel tool execution
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+from benchmarks.fakes import BENCH_ENV, FakeDjangoAPI, ScriptedChatModel, mocked_ses
+
+for key, value in BENCH_ENV.items():
+    os.environ.setdefault(key, value)
+# Fresh checkpoints per run, so completed runs from a previous benchmark aren't replayed
+os.environ.setdefault('AGENT_CHECKPOINT_PATH', os.path.join(tempfile.mkdtemp(prefix='bgv-bench-'), 'checkpoints.sqlite3'))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from agent import agent as agent_module  # noqa: E402
+from agent import composer as composer_module  # noqa: E402
+from core.config import settings  # noqa: E402
+from core.rate_limiter import RateLimiter  # noqa: E402
+from services.agent_log_buffer import agent_log_buffer  # noqa: E402
+from services.django_client import django_client  # noqa: E402
+from services.email_service import email_service  # noqa: E402
+
+
+def percentile(samples, pct):
+    """Linear-interpolated percentile of a sorted list."""
+    if not samples:
+        return 0.0
+    rank = (len(samples) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(samples) - 1)
+    return samples[low] + (samples[high] - samples[low]) * (rank - low)
+
+
+def measure(operation, iterations, model, warmup=2):
+    for i in range(warmup):
+        operation(-(i + 1))
+
+    calls_before = model.calls
+    timings = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        op_started = time.perf_counter()
+        operation(i)
+        timings.append(time.perf_counter() - op_started)
+    total = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'throughput_per_sec': round(iterations / total, 2) if total else 0.0,
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'max_ms': round(timings[-1] * 1000, 3),
+        'llm_calls_per_op': round((model.calls - calls_before) / iterations, 2),
+    }
+
+
+def wait_for_job(client, response, poll_interval=0.001):
+    """Poll an accepted job until it finishes and return its final state."""
+    assert response.status_code == 202, response.text
+    job_id = response.json()['job_id']
+    while True:
+        job = client.get(f'/agent/jobs/{job_id}').json()
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(poll_interval)
+
+
+def onboarding(client, fake_django):
+    def operation(i):
+        bgv_id = 10_000 + i
+        response = client.post('/agent/send-credentials', json={
+            'bgv_request_id': bgv_id,
+            'candidate_email': FakeDjangoAPI.candidate_email(bgv_id),
+            'candidate_name': f'Bench Candidate{bgv_id}',
+            'temp_password': 'bench-password',
+        })
+        job = wait_for_job(client, response)
+        assert job['status'] == 'succeeded', job
+    return operation
+
+
+def reminder(client, fake_django):
+    def operation(i):
+        # As sent by Django's reminder sweep, with the context precomputed
+        bgv_id = 20_000 + i
+        response = client.post('/agent/send-reminder', json={
+            'bgv_request_id': bgv_id, 'trigger': 'automated', 'context': fake_django.reminder_context(bgv_id),
+        })
+        job = wait_for_job(client, response)
+        assert job['status'] == 'succeeded', job
+    return operation
+
+
+SCENARIOS = {
+    'onboarding': onboarding,
+    'reminder': reminder,
+}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0, help='Simulated latency per model call')
+    parser.add_argument('--django-latency-ms', type=float, default=0.0, help='Simulated latency per Django API call')
+    parser.add_argument('--composer', choices=['agent', 'structured'], default='agent',
+                        help='Tool-calling agent loop, or one structured-output model call per email')
+    parser.add_argument('--sequential-tools', action='store_true',
+                        help='Have the model issue one tool call per turn instead of batching independent ones')
+    parser.add_argument('--scenario', action='append', dest='scenarios', choices=sorted(SCENARIOS))
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    model = ScriptedChatModel(latency=args.llm_latency_ms / 1000, parallel_tools=not args.sequential_tools)
+    fake_django = FakeDjangoAPI(latency=args.django_latency_ms / 1000)
+    scenarios = args.scenarios or list(SCENARIOS)
+
+    with mocked_ses(email_service, settings.default_from_email), \
+            mock.patch.object(agent_module, 'ChatGoogleGenerativeAI', lambda **kwargs: model), \
+            mock.patch.object(composer_module, 'ChatGoogleGenerativeAI', lambda **kwargs: model), \
+            mock.patch.object(settings, 'email_composer', args.composer), \
+            mock.patch.object(RateLimiter, 'acquire', return_value=True), \
+            mock.patch.object(django_client, 'fetch_bgv_request', fake_django.fetch_bgv_request), \
+            mock.patch.object(django_client, 'create_agent_log', fake_django.create_agent_log), \
+            mock.patch.object(django_client, 'create_agent_logs_bulk', fake_django.create_agent_logs_bulk), \
+            mock.patch.object(django_client, 'update_bgv_status', fake_django.update_bgv_status), \
+            mock.patch.object(django_client, 'transition_bgv_request', fake_django.transition_bgv_request), \
+            mock.patch.object(django_client, 'afetch_bgv_request', fake_django.afetch_bgv_request), \
+            mock.patch.object(django_client, 'acreate_agent_log', fake_django.acreate_agent_log), \
+            mock.patch.object(django_client, 'afetch_reminder_context', fake_django.afetch_reminder_context), \
+            mock.patch.object(django_client, 'aupdate_bgv_status', fake_django.aupdate_bgv_status), \
+            mock.patch.object(django_client, 'atransition_bgv_request', fake_django.atransition_bgv_request):
+        agent_module.reset_agent()
+        composer_module.reset_composers()
+        # Entered as a context manager so one event loop keeps running the accepted jobs
+        with TestClient(main.app) as client:
+            results = {name: measure(SCENARIOS[name](client, fake_django), args.iterations, model) for name in scenarios}
+        agent_log_buffer.flush()
+        agent_module.reset_agent()
+        composer_module.reset_composers()
+
+    report = {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'iterations': args.iterations,
+        'llm_latency_ms': args.llm_latency_ms,
+        'django_latency_ms': args.django_latency_ms,
+        'composer': args.composer,
+        'parallel_tools': not args.sequential_tools,
+        'scenarios': results,
+    }
+
+    for name, stats in results.items():
+        print(
+            f"{name:<12} {stats['throughput_per_sec']:>9.1f}/s  "
+            f"p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms  "
+            f"llm_calls/op={stats['llm_calls_per_op']}"
+        )
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -2,6 +2,8 @@
 Configuration management using Pydantic Settings.
 Loads environment variables from .env file.
 """
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings
 
 
@@ -10,6 +12,22 @@ class Settings(BaseSettings):
 
     google_api_key: str
     gemini_model: str = "gemini-2.0-flash"  # Higher free tier limits (15/min vs 50/day for pro)
+    # Routine workflows run on a faster, cheaper model with its own quota;
+    # the rest (onboarding) keep gemini_model
+    gemini_fast_model: str = "gemini-2.0-flash-lite"
+    fast_model_workflows: List[str] = ["reminder"]
+
+    # Model calls per minute allowed per model (JSON object in the environment), counted
+    # per call by both the agent loop and the composer; models not listed get default_model_rpm
+    model_rate_limits: Dict[str, int] = {
+        "gemini-2.0-flash": 12,  # 80% of 15/min
+        "gemini-2.0-flash-lite": 24,  # 80% of 30/min
+    }
+    default_model_rpm: int = 12
+
+    # "agent" (tool-calling loop) or "structured" (one model call per email, see agent/composer.py)
+    email_composer: str = "agent"
+    composer_max_attempts: int = 2
 
     django_api_url: str
     django_service_secret: str
@@ -22,6 +40,22 @@ class Settings(BaseSettings):
     frontend_url: str
     log_level: str = "INFO"
 
+    # Agent logs are buffered and sent to Django in batches
+    agent_log_batch_size: int = 50
+    agent_log_flush_interval: float = 2.0
+
+    # Results of requests sent with an Idempotency-Key are replayed for this long
+    idempotency_ttl_seconds: int = 86400
+    idempotency_max_entries: int = 10000
+
+    # Workflow runs accepted as background jobs
+    agent_max_concurrent_jobs: int = 8
+    agent_job_ttl_seconds: int = 86400
+
+    # Workflow run checkpoints, so a retried run resumes instead of starting over
+    agent_checkpoint_path: str = "agent_checkpoints.sqlite3"
+    agent_checkpoint_ttl_hours: int = 72
+
     class Config:
         env_file = ".env"
         case_sensitive = False
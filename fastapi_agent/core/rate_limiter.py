@@ -4,9 +4,11 @@ Implements token bucket algorithm for rate limiting.
 """
 import time
 from threading import Lock
-from typing import Optional
+from typing import Dict, Optional
 import logging
 
+from core.config import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -88,12 +90,20 @@ class RateLimiter:
             return self.tokens
 
 
-# Global rate limiter instance
-# Conservative: 12 requests per minute (80% of 15/min limit for gemini-2.0-flash-exp)
-_rate_limiter = RateLimiter(max_requests=12, time_window=60)
-
+# One rate limiter per model, since each model has its own quota
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = Lock()
 
-def get_rate_limiter() -> RateLimiter:
-    """Get the global rate limiter instance."""
-    return _rate_limiter
 
+def get_rate_limiter(model: Optional[str] = None) -> RateLimiter:
+    """
+    Get the rate limiter for a model (default: settings.gemini_model).
+    Budgets come from settings.model_rate_limits.
+    """
+    model = model or settings.gemini_model
+    with _rate_limiters_lock:
+        if model not in _rate_limiters:
+            max_requests = settings.model_rate_limits.get(model, settings.default_model_rpm)
+            logger.info(f"Rate limit for {model}: {max_requests} requests per minute")
+            _rate_limiters[model] = RateLimiter(max_requests=max_requests, time_window=60)
+        return _rate_limiters[model]
@@ -2,21 +2,38 @@
 TraqCheck BGV Agent Service - FastAPI Application
 Main entry point for the LangChain-powered background verification agent.
 """
+import asyncio
 import logging
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import settings
 from models.schemas import (
     SendCredentialsRequest,
     AnalyzeRequestPayload,
     SendReminderRequest,
+    ReminderContext,
+    DocumentsSubmittedRequest,
+    JobResponse,
     AgentResponse
 )
-from agent.agent import get_agent, invoke_agent_with_rate_limit, reset_agent
+from agent.composer import compose_onboarding, compose_reminder, reset_composers
+from agent.agent import get_agent, invoke_agent_with_rate_limit, invoke_workflow, model_for_workflow, reset_agent
+from services.agent_log_buffer import agent_log_buffer
 from agent.prompts import (
     ONBOARDING_PROMPT_TEMPLATE,
-    REMINDER_SENDING_PROMPT_TEMPLATE
+    REMINDER_SENDING_PROMPT_TEMPLATE,
+    DOCUMENTS_RECEIVED_EMAIL_SUBJECT,
+    DOCUMENTS_RECEIVED_EMAIL_TEMPLATE,
+    DOCUMENT_TYPE_LABELS
 )
+from services.django_client import django_client
+from services.email_service import email_service
+from services.idempotency import idempotency_store, request_fingerprint, IdempotencyConflict
+from services.jobs import job_manager
+from html import escape
 from datetime import datetime
 
 logging.basicConfig(
@@ -25,10 +42,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    agent_log_buffer.start()
+    yield
+    # Flush buffered agent logs before shutting down
+    agent_log_buffer.stop()
+
+
 app = FastAPI(
     title="TraqCheck BGV Agent Service",
     version="1.0.0",
-    description="AI-powered background verification agent using LangChain and Google Gemini"
+    description="AI-powered background verification agent using LangChain and Google Gemini",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -47,7 +74,8 @@ async def root():
         "status": "running",
         "service": "TraqCheck BGV Agent Service",
         "version": "1.0.0",
-        "model": settings.gemini_model
+        "model": settings.gemini_model,
+        "fast_model": settings.gemini_fast_model
     }
 
 
@@ -58,24 +86,102 @@ async def health_check():
         "status": "healthy",
         "django_api": settings.django_api_url,
         "gemini_model": settings.gemini_model,
+        "gemini_fast_model": settings.gemini_fast_model,
+        "fast_model_workflows": settings.fast_model_workflows,
+        "email_composer": settings.email_composer,
         "ses_region": settings.aws_ses_region_name
     }
 
 
 @app.post("/agent/reset")
 async def reset_agent_cache():
-    """Reset the cached agent (useful after model changes)."""
+    """Reset the cached agents and composers (useful after model changes)."""
     reset_agent()
+    reset_composers()
     logger.info("Agent cache reset via API")
     return {
         "status": "success",
         "message": "Agent cache reset",
-        "current_model": settings.gemini_model
+        "current_model": settings.gemini_model,
+        "fast_model": settings.gemini_fast_model
     }
 
 
-@app.post("/agent/send-credentials")
-async def onboard_candidate(payload: SendCredentialsRequest):
+async def submit_job(response: Response, kind: str, key: Optional[str], payload, func) -> JobResponse:
+    """
+    Accept a run of `func` as a background job, once per `Idempotency-Key` when one is given.
+    Repeats of the key get the original job with `Idempotent-Replayed: true` (and
+    its callback again if it already finished); a failed job frees the key.
+    """
+    if not key:
+        return job_manager.submit(kind, payload, func)
+
+    scoped_key = f"{kind}:{key}"
+
+    async def start():
+        return job_manager.submit(kind, payload, func, on_failure=lambda: idempotency_store.forget(scoped_key))
+
+    try:
+        job, replayed = await idempotency_store.run(scoped_key, request_fingerprint(payload), start)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if replayed:
+        response.headers['Idempotent-Replayed'] = 'true'
+        job_manager.report(job)
+    return job
+
+
+async def run_onboarding(payload: SendCredentialsRequest):
+    model = model_for_workflow("onboarding")
+    if settings.email_composer == "structured":
+        logger.info(f"Composing onboarding email - BGV #{payload.bgv_request_id}")
+        composed = await compose_onboarding(payload, model)
+        return {
+            "status": "success",
+            "message": "Candidate onboarded: credentials sent and documents requested",
+            "bgv_request_id": payload.bgv_request_id,
+            "agent_output": f"Sent: {composed['subject']}",
+            "agent_reasoning": "Composed with structured output",
+            "timing": composed["timing"]
+        }
+
+    agent = get_agent(model)
+
+    prompt = ONBOARDING_PROMPT_TEMPLATE.format(
+        bgv_request_id=payload.bgv_request_id,
+        candidate_name=payload.candidate_name,
+        candidate_email=payload.candidate_email,
+        temp_password=payload.temp_password
+    )
+
+    logger.info(f"Executing unified onboarding workflow - BGV #{payload.bgv_request_id}")
+    # One onboarding per candidate, so a retry resumes the same checkpointed run
+    result = await invoke_workflow(
+        agent, [("user", prompt)], payload.bgv_request_id, "onboarding",
+        secrets={"temp_password": payload.temp_password}
+    )
+
+    messages = result.get('messages', [])
+    agent_output = messages[-1].content if messages else "Onboarding completed"
+
+    logger.info(f"Agent completed onboarding for BGV #{payload.bgv_request_id}")
+
+    return {
+        "status": "success",
+        "message": "Candidate onboarded: credentials sent and documents requested",
+        "bgv_request_id": payload.bgv_request_id,
+        "agent_output": agent_output,
+        "agent_reasoning": "Check logs for detailed agent steps",
+        "timing": result.get("timing")
+    }
+
+
+@app.post("/agent/send-credentials", status_code=202, response_model=JobResponse)
+async def onboard_candidate(
+    payload: SendCredentialsRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None)
+):
     """
     Complete candidate onboarding: send credentials AND request documents in ONE email.
 
@@ -86,76 +192,158 @@ async def onboard_candidate(payload: SendCredentialsRequest):
     4. Updates BGV status to 'documents_requested'
     5. Logs the action for audit trail
 
-    Called by Django Celery task after candidate creation.
+    Called by Django's outbox relay after candidate creation, with an
+    Idempotency-Key so a redelivered request doesn't email the candidate twice.
+    Returns 202 with the job; the outcome is reported to Django via callback_ref.
     """
     logger.info(f"Received onboarding request for BGV #{payload.bgv_request_id}")
+    return await submit_job(response, "send-credentials", idempotency_key, payload, run_onboarding)
 
-    try:
-        agent = get_agent()
-
-        prompt = ONBOARDING_PROMPT_TEMPLATE.format(
-            bgv_request_id=payload.bgv_request_id,
-            candidate_name=payload.candidate_name,
-            candidate_email=payload.candidate_email,
-            temp_password=payload.temp_password
-        )
 
-        logger.info(f"Executing unified onboarding workflow - BGV #{payload.bgv_request_id}")
-        result = invoke_agent_with_rate_limit(agent, [("user", prompt)])
-
-        messages = result.get('messages', [])
-        agent_output = messages[-1].content if messages else "Onboarding completed"
-
-        logger.info(f"Agent completed onboarding for BGV #{payload.bgv_request_id}")
+async def run_reminder(payload: SendReminderRequest, idempotency_key: Optional[str] = None):
+    model = model_for_workflow("reminder")
+    context = payload.context
+    if context is None:
+        context = ReminderContext(**await django_client.afetch_reminder_context(payload.bgv_request_id))
 
+    if settings.email_composer == "structured":
+        logger.info(f"Composing reminder - BGV #{payload.bgv_request_id}")
+        composed = await compose_reminder(
+            payload.bgv_request_id, context, model,
+            workflow=f"reminder:{idempotency_key}" if idempotency_key else None
+        )
         return {
             "status": "success",
-            "message": "Candidate onboarded: credentials sent and documents requested",
+            "message": "Reminder sent successfully",
             "bgv_request_id": payload.bgv_request_id,
-            "agent_output": agent_output,
-            "agent_reasoning": "Check logs for detailed agent steps"
+            "agent_output": f"Sent: {composed['subject']}",
+            "trigger": payload.trigger,
+            "timing": composed["timing"]
         }
 
-    except Exception as e:
-        logger.error(f"Error in candidate onboarding: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    agent = get_agent(model)
+
+    prompt = REMINDER_SENDING_PROMPT_TEMPLATE.format(
+        bgv_request_id=payload.bgv_request_id,
+        trigger=payload.trigger,
+        candidate_name=context.candidate_name,
+        candidate_email=context.candidate_email,
+        role=context.role or "not specified",
+        days_pending=context.days_pending,
+        reminder_count=context.reminder_count,
+        last_reminder_at=context.last_reminder_at or "never",
+        urgency=context.urgency
+    )
+
+    logger.info(f"Executing agent for reminder sending - BGV #{payload.bgv_request_id}")
+    if idempotency_key:
+        # Retries of the same reminder resume its checkpointed run
+        result = await invoke_workflow(
+            agent, [("user", prompt)], payload.bgv_request_id, f"reminder:{idempotency_key}"
+        )
+    else:
+        result = await invoke_agent_with_rate_limit(agent, [("user", prompt)])
+
+    messages = result.get('messages', [])
+    agent_output = messages[-1].content if messages else "Reminder sent"
+
+    logger.info(f"Agent completed reminder sending for BGV #{payload.bgv_request_id}")
+
+    return {
+        "status": "success",
+        "message": "Reminder sent successfully",
+        "bgv_request_id": payload.bgv_request_id,
+        "agent_output": agent_output,
+        "trigger": payload.trigger,
+        "timing": result.get("timing")
+    }
 
 
-@app.post("/agent/send-reminder")
-async def send_reminder(payload: SendReminderRequest):
+@app.post("/agent/send-reminder", status_code=202, response_model=JobResponse)
+async def send_reminder(
+    payload: SendReminderRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None)
+):
     """
     Send document submission reminder to candidate.
-    Agent generates context-aware reminder based on days pending and previous reminders.
-    Can be triggered manually or automatically via Celery Beat.
+    Agent generates context-aware reminder based on days pending and previous reminders,
+    precomputed by Django: sent as `context` by the sweep, fetched from Django otherwise.
+    Can be triggered manually or automatically via Celery Beat; an Idempotency-Key
+    makes repeats of the same reminder a replay instead of a second email.
+    Returns 202 with the job; poll /agent/jobs/{job_id} for the outcome.
     """
     logger.info(f"Received reminder request for BGV #{payload.bgv_request_id}, trigger: {payload.trigger}")
+    return await submit_job(
+        response, "send-reminder", idempotency_key, payload, partial(run_reminder, idempotency_key=idempotency_key)
+    )
 
-    try:
-        agent = get_agent()
 
-        prompt = REMINDER_SENDING_PROMPT_TEMPLATE.format(
-            bgv_request_id=payload.bgv_request_id,
-            trigger=payload.trigger
-        )
+@app.get("/agent/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Current state of a workflow job, including its result once finished."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
-        logger.info(f"Executing agent for reminder sending - BGV #{payload.bgv_request_id}")
-        result = invoke_agent_with_rate_limit(agent, [("user", prompt)])
 
-        messages = result.get('messages', [])
-        agent_output = messages[-1].content if messages else "Reminder sent"
+@app.post("/agent/documents-submitted")
+async def acknowledge_documents(payload: DocumentsSubmittedRequest):
+    """
+    Acknowledge a document submission to the candidate.
+
+    Delivered by Django's outbox relay, which may redeliver an event; the
+    acknowledgement log (tagged with the event id) makes repeats a no-op.
+    The email is templated, so no LLM call is made.
+    """
+    logger.info(f"Received documents-submitted event #{payload.event_id} for BGV #{payload.bgv_request_id}")
 
-        logger.info(f"Agent completed reminder sending for BGV #{payload.bgv_request_id}")
+    try:
+        bgv_request = (await django_client.afetch_bgv_request(payload.bgv_request_id)).get('data', {})
+        for log in bgv_request.get('agent_logs', []):
+            if log.get('action') == 'documents_acknowledged' and (log.get('metadata') or {}).get('event_id') == payload.event_id:
+                logger.info(f"Event #{payload.event_id} already acknowledged, skipping")
+                return {
+                    "status": "success",
+                    "message": "Already acknowledged",
+                    "bgv_request_id": payload.bgv_request_id,
+                    "duplicate": True
+                }
+
+        document_items = ''.join(
+            f"<li>{escape(DOCUMENT_TYPE_LABELS.get(doc_type, doc_type))}</li>" for doc_type in payload.document_types
+        )
+        result = await asyncio.to_thread(
+            email_service.send_html_email,
+            to_email=payload.candidate_email,
+            subject=DOCUMENTS_RECEIVED_EMAIL_SUBJECT,
+            body_html=DOCUMENTS_RECEIVED_EMAIL_TEMPLATE.format(
+                candidate_name=escape(payload.candidate_name or 'there'),
+                document_items=document_items
+            )
+        )
+
+        await django_client.acreate_agent_log(
+            bgv_request_id=payload.bgv_request_id,
+            action='documents_acknowledged',
+            message='Document submission acknowledged to candidate',
+            metadata={
+                'event_id': payload.event_id,
+                'document_types': payload.document_types,
+                'email_message_id': result.get('message_id')
+            }
+        )
 
         return {
             "status": "success",
-            "message": "Reminder sent successfully",
+            "message": "Document submission acknowledged",
             "bgv_request_id": payload.bgv_request_id,
-            "agent_output": agent_output,
-            "trigger": payload.trigger
+            "duplicate": False
         }
 
     except Exception as e:
-        logger.error(f"Error in reminder sending: {str(e)}")
+        logger.error(f"Error acknowledging documents: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
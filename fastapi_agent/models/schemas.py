@@ -1,8 +1,9 @@
 """
 Pydantic models for request and response schemas.
 """
+from datetime import datetime
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
 
 class SendCredentialsRequest(BaseModel):
@@ -11,6 +12,7 @@ class SendCredentialsRequest(BaseModel):
     candidate_email: EmailStr
     candidate_name: str
     temp_password: str
+    callback_ref: Optional[str] = None  # echoed back to Django when the job finishes
 
 
 class AnalyzeRequestPayload(BaseModel):
@@ -22,10 +24,46 @@ class AnalyzeRequestPayload(BaseModel):
     total_experience: int
 
 
+class ReminderContext(BaseModel):
+    """Reminder facts precomputed by Django (backgroundverification/reminders.py)"""
+    candidate_name: str
+    candidate_email: EmailStr
+    role: str = ""
+    status: str
+    days_pending: int
+    reminder_count: int
+    last_reminder_at: Optional[str] = None
+    urgency: str  # "gentle", "firm" or "urgent"
+
+
 class SendReminderRequest(BaseModel):
     """Request body for sending document reminder"""
     bgv_request_id: int
     trigger: str = "manual"  # "manual" or "automated"
+    context: Optional[ReminderContext] = None  # fetched from Django when not sent
+    callback_ref: Optional[str] = None  # echoed back to Django when the job finishes
+
+
+class DocumentsSubmittedRequest(BaseModel):
+    """Outbox event from Django: the candidate submitted documents"""
+    bgv_request_id: int
+    candidate_email: EmailStr
+    candidate_name: str
+    document_types: List[str] = []
+    event_id: int
+
+
+class JobResponse(BaseModel):
+    """State of an accepted agent workflow run"""
+    job_id: str
+    kind: str
+    status: str  # "queued", "running", "succeeded" or "failed"
+    bgv_request_id: int
+    callback_ref: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
 
 
 class AgentResponse(BaseModel):
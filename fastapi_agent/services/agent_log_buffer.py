@@ -0,0 +1,141 @@
+"""
+Buffered agent logging.
+
+Agent log entries are queued in memory and sent to Django's bulk endpoint from
+a background thread, either when a batch fills up or on a fixed interval, so a
+tool call never waits on a Django round-trip just to write an audit entry.
+
+Entries are kept for the next flush only when Django can't be reached or
+answers 5xx. A batch Django rejects (4xx) is split until the rejected entries
+are found; those are logged and dropped so they can't hold up later entries.
+"""
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import settings
+from services.django_client import DjangoAPIError, django_client
+
+logger = logging.getLogger(__name__)
+
+
+class AgentLogBuffer:
+    """Thread-safe buffer that flushes agent logs to Django in batches"""
+
+    def __init__(self, batch_size: int = 50, flush_interval: float = 2.0, max_pending: int = 5000):
+        """
+        Initialize the buffer.
+
+        Args:
+            batch_size: Flush as soon as this many entries are pending
+            flush_interval: Maximum seconds an entry waits before being flushed
+            max_pending: Entries kept for retry after failed flushes; the oldest are dropped beyond this
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, bgv_request_id: int, action: str, message: str, metadata: Dict[str, Any] = None):
+        """Queue an agent log entry for the next flush."""
+        with self._lock:
+            self._pending.append({
+                'bgv_request_id': bgv_request_id,
+                'action': action,
+                'message': message,
+                'metadata': metadata or {}
+            })
+            should_wake = len(self._pending) >= self.batch_size
+        self.start()
+        if should_wake:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Send all pending entries to Django. Returns the number of entries written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            written = 0
+            for start in range(0, len(batch), self.batch_size):
+                chunk = batch[start:start + self.batch_size]
+                chunk_written, unsent = self._send(chunk)
+                written += chunk_written
+                if unsent:
+                    self._requeue(unsent + batch[start + len(chunk):])
+                    break
+            return written
+
+    def _send(self, chunk: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Write `chunk` to Django. Returns (entries written, entries to retry).
+
+        A 4xx rejects the whole chunk, so it is halved until the offending
+        entries are isolated and dropped; the rest are still written.
+        """
+        try:
+            django_client.create_agent_logs_bulk(chunk)
+            return len(chunk), []
+        except DjangoAPIError as e:
+            if e.status_code >= 500:
+                logger.error(f"Failed to flush {len(chunk)} agent logs, will retry: {str(e)}")
+                return 0, chunk
+            if len(chunk) == 1:
+                logger.error(f"Dropping agent log rejected by Django ({e.status_code}): {chunk[0]!r}: {str(e)}")
+                return 0, []
+        except Exception as e:
+            logger.error(f"Failed to flush {len(chunk)} agent logs, will retry: {str(e)}")
+            return 0, chunk
+
+        middle = len(chunk) // 2
+        written, unsent = self._send(chunk[:middle])
+        if unsent:
+            return written, unsent + chunk[middle:]
+        more, unsent = self._send(chunk[middle:])
+        return written + more, unsent
+
+    def _requeue(self, entries: List[Dict[str, Any]]):
+        with self._lock:
+            self._pending = entries + self._pending
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                logger.error(f"Agent log buffer full, dropping {overflow} oldest entries")
+                self._pending = self._pending[overflow:]
+
+    def start(self):
+        """Start the background flusher if it is not already running."""
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='agent-log-flusher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background flusher and flush whatever is still pending."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval + 30)
+        self.flush()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+agent_log_buffer = AgentLogBuffer(
+    batch_size=settings.agent_log_batch_size,
+    flush_interval=settings.agent_log_flush_interval
+)
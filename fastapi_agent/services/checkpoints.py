@@ -0,0 +1,269 @@
+"""
+Durable checkpoints for agent workflow runs.
+
+A run is keyed by BGV request id and workflow name. While it executes, the
+conversation is saved after every agent step and the results of side-effect
+tools (emails, status changes, audit logs) are recorded. When the same run
+is started again after a failure:
+- a run that already completed returns its recorded conversation without
+  calling the model
+- an interrupted run continues from its last saved step instead of starting
+  the conversation over
+- a side-effect tool call that already succeeded returns its recorded result
+  instead of running again, so the candidate is not emailed twice
+
+Checkpoints live in a SQLite file (AGENT_CHECKPOINT_PATH) shared by all
+workers on the host, and are dropped after AGENT_CHECKPOINT_TTL_HOURS.
+Secrets passed to `run()` (the temporary password) are stored as placeholders
+and filled back in from the retried request. The async entry points (`run()`,
+`Run.save`/`Run.complete`, async tools) do their SQLite I/O in a worker thread
+so a slow disk or a locked database never stalls the event loop.
+"""
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, messages_from_dict, messages_to_dict
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_run: ContextVar[Optional["Run"]] = ContextVar("agent_run", default=None)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agent_runs (
+    bgv_request_id INTEGER NOT NULL,
+    workflow TEXT NOT NULL,
+    status TEXT NOT NULL,
+    messages TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (bgv_request_id, workflow)
+);
+CREATE TABLE IF NOT EXISTS agent_tool_results (
+    bgv_request_id INTEGER NOT NULL,
+    workflow TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    call_key TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (bgv_request_id, workflow, tool, call_key)
+);
+"""
+
+
+def _resumable(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Drop a trailing model turn whose tool calls never got results (the run died mid-step)."""
+    if messages and isinstance(messages[-1], AIMessage) and messages[-1].tool_calls:
+        return messages[:-1]
+    return messages
+
+
+def _redact(text: str, secrets: Dict[str, str]) -> str:
+    for name, value in secrets.items():
+        text = text.replace(json.dumps(value)[1:-1], f"{{{{{name}}}}}")
+    return text
+
+
+def _restore(text: str, secrets: Dict[str, str]) -> str:
+    for name, value in secrets.items():
+        text = text.replace(f"{{{{{name}}}}}", json.dumps(value)[1:-1])
+    return text
+
+
+class Run:
+    """One checkpointed workflow run"""
+
+    def __init__(self, store: "CheckpointStore", bgv_request_id: int, workflow: str,
+                 status: Optional[str], messages: List[BaseMessage], secrets: Dict[str, str]):
+        self.store = store
+        self.bgv_request_id = bgv_request_id
+        self.workflow = workflow
+        self.status = status
+        self.messages = messages
+        self.secrets = secrets
+
+    @property
+    def completed(self) -> bool:
+        return self.status == "completed"
+
+    async def save(self, messages: List[BaseMessage]):
+        """Checkpoint the conversation so far."""
+        self.messages = list(messages)
+        await asyncio.to_thread(self.store.save_run, self, "running")
+
+    async def complete(self, messages: List[BaseMessage]):
+        self.messages = list(messages)
+        self.status = "completed"
+        await asyncio.to_thread(self.store.save_run, self, "completed")
+
+
+class CheckpointStore:
+    """SQLite-backed store of workflow runs and their recorded tool results"""
+
+    def __init__(self, path: str, ttl_hours: int = 72):
+        """
+        Initialize the store. The database is created on first use.
+
+        Args:
+            path: SQLite file path
+            ttl_hours: Runs not updated for this long are dropped
+        """
+        self.path = path
+        self.ttl_hours = ttl_hours
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self._local = threading.local()
+        self._next_purge = 0.0
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """This thread's connection (opened once), inside a transaction."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with self._init_lock:
+                conn = sqlite3.connect(self.path, timeout=30)
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(SCHEMA)
+                    self._initialized = True
+            # With WAL this still survives a process crash; only an OS crash can lose the last steps
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        with conn:
+            yield conn
+
+    @asynccontextmanager
+    async def run(self, bgv_request_id: int, workflow: str,
+                  secrets: Optional[Dict[str, str]] = None) -> AsyncIterator[Run]:
+        """
+        Load (or start) the run and make it current for tool calls made inside the block.
+
+        Args:
+            bgv_request_id: ID of the BGV request
+            workflow: Workflow name, unique per BGV request
+            secrets: `{name: value}` pairs never written to the store in clear
+        """
+        secrets = {name: value for name, value in (secrets or {}).items() if value}
+        row = await asyncio.to_thread(self._load_run, bgv_request_id, workflow)
+
+        status, messages = (row[0], messages_from_dict(json.loads(_restore(row[1], secrets)))) if row else (None, [])
+        if status and status != "completed":
+            messages = _resumable(messages)
+            logger.info(f"Resuming {workflow} run for BGV #{bgv_request_id} from step {len(messages)}")
+
+        run = Run(self, bgv_request_id, workflow, status, messages, secrets)
+        token = _current_run.set(run)
+        try:
+            yield run
+        finally:
+            _current_run.reset(token)
+
+    def _load_run(self, bgv_request_id: int, workflow: str):
+        self.purge_expired()
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT status, messages FROM agent_runs WHERE bgv_request_id = ? AND workflow = ?",
+                (bgv_request_id, workflow)
+            ).fetchone()
+
+    def save_run(self, run: Run, status: str):
+        messages = _redact(json.dumps(messages_to_dict(run.messages)), run.secrets)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO agent_runs (bgv_request_id, workflow, status, messages, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (bgv_request_id, workflow) DO UPDATE SET "
+                "status = excluded.status, messages = excluded.messages, updated_at = excluded.updated_at",
+                (run.bgv_request_id, run.workflow, status, messages, time.time())
+            )
+
+    def tool_result(self, run: Run, tool: str, call_key: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result FROM agent_tool_results "
+                "WHERE bgv_request_id = ? AND workflow = ? AND tool = ? AND call_key = ?",
+                (run.bgv_request_id, run.workflow, tool, call_key)
+            ).fetchone()
+        return json.loads(_restore(row[0], run.secrets)) if row else None
+
+    def record_tool_result(self, run: Run, tool: str, call_key: str, result: Dict[str, Any]):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO agent_tool_results "
+                "(bgv_request_id, workflow, tool, call_key, result, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (run.bgv_request_id, run.workflow, tool, call_key,
+                 _redact(json.dumps(result, default=str), run.secrets), time.time())
+            )
+
+    def purge_expired(self):
+        """Drop expired runs, at most once a minute."""
+        now = time.time()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + 60
+        cutoff = now - self.ttl_hours * 3600
+        with self._connect() as conn:
+            conn.execute("DELETE FROM agent_runs WHERE updated_at < ?", (cutoff,))
+            conn.execute("DELETE FROM agent_tool_results WHERE created_at < ?", (cutoff,))
+
+
+def current_run() -> Optional[Run]:
+    return _current_run.get()
+
+
+def replayable(call_key: Callable[..., Any]):
+    """
+    Record a side-effect tool's successful results in the current run and replay
+    them when the run is retried. `call_key(**kwargs)` identifies "the same call"
+    across retries, where the model may word its arguments differently.
+    """
+    def decorator(func):
+        def recorded(kwargs):
+            run = current_run()
+            if run is None:
+                return None, None, None
+            key = json.dumps(call_key(**kwargs), sort_keys=True, default=str)
+            result = run.store.tool_result(run, func.__name__, key)
+            if result is not None:
+                logger.info(f"Replaying recorded {func.__name__} result for BGV #{run.bgv_request_id}")
+                result = {**result, 'replayed': True}
+            return run, key, result
+
+        def record(run, key, result):
+            if run is not None and result.get('success'):
+                run.store.record_tool_result(run, func.__name__, key, result)
+            return result
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(**kwargs):
+                # to_thread copies the context, so the current run is visible there
+                run, key, result = await asyncio.to_thread(recorded, kwargs)
+                if result is not None:
+                    return result
+                result = await func(**kwargs)
+                return await asyncio.to_thread(record, run, key, result)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            run, key, result = recorded(kwargs)
+            if result is not None:
+                return result
+            return record(run, key, func(**kwargs))
+        return wrapper
+    return decorator
+
+
+checkpoint_store = CheckpointStore(
+    path=settings.agent_checkpoint_path,
+    ttl_hours=settings.agent_checkpoint_ttl_hours
+)
@@ -2,11 +2,19 @@
 import httpx
 from core.config import settings
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 logger = logging.getLogger(__name__)
 
 
+class DjangoAPIError(Exception):
+    """Django answered with an error status"""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
 class DjangoClient:
     """HTTP client for Django API communication"""
 
@@ -98,6 +106,39 @@ class DjangoClient:
             logger.error(f"Error creating agent log: {str(e)}")
             raise Exception(f"Django API error: {str(e)}")
 
+    def create_agent_logs_bulk(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Create many AgentLog entries, possibly for different BGV requests, in one call.
+
+        Args:
+            entries: List of dicts with bgv_request_id, action, message and metadata
+
+        Returns:
+            dict: Response with the created log ids
+
+        Raises:
+            DjangoAPIError: If Django answers with an error status
+            Exception: If API call fails
+        """
+        url = f"{self.base_url}/api/bgv/agent-logs/bulk/"
+        logger.info(f"Creating {len(entries)} agent logs in bulk")
+
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.post(url, json={'entries': entries}, headers=self.headers)
+                response.raise_for_status()
+
+                data = response.json()
+                logger.info(f"Successfully created {len(entries)} agent logs")
+                return data
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error creating agent logs: {e.response.status_code}")
+            raise DjangoAPIError(f"Failed to create agent logs: {e.response.text}", e.response.status_code)
+        except Exception as e:
+            logger.error(f"Error creating agent logs: {str(e)}")
+            raise Exception(f"Django API error: {str(e)}")
+
     def update_bgv_status(
         self,
         bgv_request_id: int,
@@ -137,5 +178,177 @@ class DjangoClient:
             logger.error(f"Error updating BGV status: {str(e)}")
             raise Exception(f"Django API error: {str(e)}")
 
+    def transition_bgv_request(
+        self,
+        bgv_request_id: int,
+        status: str,
+        action: str,
+        message: str,
+        metadata: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Update BGVRequest status and create an AgentLog entry in one atomic call.
+
+        Args:
+            bgv_request_id: ID of the BGV request
+            status: New status ('pending_analysis', 'documents_requested', etc.)
+            action: Log action type ('analysis', 'request_sent', 'reminder_sent')
+            message: Log message
+            metadata: Additional log metadata (optional)
+
+        Returns:
+            dict: Acknowledgement with id, status, previous_status and agent_log_id
+
+        Raises:
+            Exception: If API call fails
+        """
+        url = f"{self.base_url}/api/bgv/{bgv_request_id}/transition/"
+        logger.info(f"Transitioning BGV #{bgv_request_id} to {status} with action: {action}")
+
+        payload = {
+            'status': status,
+            'action': action,
+            'message': message,
+            'metadata': metadata or {}
+        }
+
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.post(url, json=payload, headers=self.headers)
+                response.raise_for_status()
+
+                data = response.json()
+                logger.info(f"Successfully transitioned BGV #{bgv_request_id}")
+                return data
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error transitioning BGV request: {e.response.status_code}")
+            raise Exception(f"Failed to transition BGV request: {e.response.text}")
+        except Exception as e:
+            logger.error(f"Error transitioning BGV request: {str(e)}")
+            raise Exception(f"Django API error: {str(e)}")
+
+    async def _arequest(self, method: str, url: str, action: str, **kwargs) -> Dict[str, Any]:
+        """
+        Send one request without blocking the event loop.
+
+        Args:
+            method: HTTP method
+            url: Full URL
+            action: What the call does, for errors (e.g. "fetch BGV request")
+
+        Raises:
+            Exception: If API call fails
+        """
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.request(method, url, headers=self.headers, **kwargs)
+                response.raise_for_status()
+                return response.json()
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error trying to {action}: {e.response.status_code}")
+            raise Exception(f"Failed to {action}: {e.response.text}")
+        except Exception as e:
+            logger.error(f"Error trying to {action}: {str(e)}")
+            raise Exception(f"Django API error: {str(e)}")
+
+    async def afetch_bgv_request(self, bgv_request_id: int) -> Dict[str, Any]:
+        """Async version of fetch_bgv_request."""
+        logger.info(f"Fetching BGV request #{bgv_request_id} from Django")
+        data = await self._arequest("GET", f"{self.base_url}/api/bgv/{bgv_request_id}/", "fetch BGV request")
+        logger.info(f"Successfully fetched BGV request #{bgv_request_id}")
+        return data
+
+    async def afetch_reminder_context(self, bgv_request_id: int) -> Dict[str, Any]:
+        """
+        Fetch the precomputed reminder context (days pending, previous reminders, urgency).
+
+        Args:
+            bgv_request_id: ID of the BGV request
+
+        Returns:
+            dict: Context fields of ReminderContext, plus bgv_request_id
+        """
+        logger.info(f"Fetching reminder context for BGV #{bgv_request_id} from Django")
+        response = await self._arequest(
+            "GET", f"{self.base_url}/api/bgv/{bgv_request_id}/reminder-context/", "fetch reminder context"
+        )
+        return response.get('data', response)
+
+    async def acreate_agent_log(
+        self,
+        bgv_request_id: int,
+        action: str,
+        message: str,
+        metadata: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """Async version of create_agent_log."""
+        logger.info(f"Creating agent log for BGV #{bgv_request_id}, action: {action}")
+        data = await self._arequest(
+            "POST", f"{self.base_url}/api/bgv/{bgv_request_id}/agent-log/", "create agent log",
+            json={'action': action, 'message': message, 'metadata': metadata or {}}
+        )
+        logger.info(f"Successfully created agent log #{data.get('id')}")
+        return data
+
+    async def aupdate_bgv_status(self, bgv_request_id: int, status: str) -> Dict[str, Any]:
+        """Async version of update_bgv_status."""
+        logger.info(f"Updating BGV #{bgv_request_id} status to: {status}")
+        data = await self._arequest(
+            "PATCH", f"{self.base_url}/api/bgv/{bgv_request_id}/", "update BGV status", json={'status': status}
+        )
+        logger.info(f"Successfully updated BGV #{bgv_request_id} status")
+        return data
+
+    async def atransition_bgv_request(
+        self,
+        bgv_request_id: int,
+        status: str,
+        action: str,
+        message: str,
+        metadata: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """Async version of transition_bgv_request."""
+        logger.info(f"Transitioning BGV #{bgv_request_id} to {status} with action: {action}")
+        data = await self._arequest(
+            "POST", f"{self.base_url}/api/bgv/{bgv_request_id}/transition/", "transition BGV request",
+            json={'status': status, 'action': action, 'message': message, 'metadata': metadata or {}}
+        )
+        logger.info(f"Successfully transitioned BGV #{bgv_request_id}")
+        return data
+
+    def report_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Report a finished agent job to Django.
+
+        Args:
+            job: Job state, including the callback_ref Django sent with the request
+
+        Returns:
+            dict: Acknowledgement
+
+        Raises:
+            Exception: If API call fails
+        """
+        url = f"{self.base_url}/api/bgv/agent-jobs/callback/"
+        logger.info(f"Reporting agent job {job['job_id']} ({job['status']}) to Django")
+
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.post(url, json=job, headers=self.headers)
+                response.raise_for_status()
+
+                data = response.json()
+                logger.info(f"Successfully reported agent job {job['job_id']}")
+                return data
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error reporting agent job: {e.response.status_code}")
+            raise Exception(f"Failed to report agent job: {e.response.text}")
+        except Exception as e:
+            logger.error(f"Error reporting agent job: {str(e)}")
+            raise Exception(f"Django API error: {str(e)}")
+
 
 django_client = DjangoClient()
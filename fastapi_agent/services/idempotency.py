@@ -0,0 +1,118 @@
+"""
+Idempotency-Key support for agent endpoints.
+
+Django redelivers a request when it gives up waiting for a response, even if
+the agent already ran and sent the email. Results (for workflow endpoints, the
+accepted job) are kept in a small in-memory TTL store keyed by the caller's
+`Idempotency-Key`:
+- a repeat of a completed key gets the stored result without running the agent
+- a repeat that arrives while the first run is still going awaits that same run
+  instead of starting a second one
+- failed runs are not stored, so a retry after an error runs again; `forget()`
+  does the same for a stored result that later turns out to have failed
+
+The store lives in the process, so deduplication only covers requests handled
+by the same uvicorn worker: the service must run as a single worker.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from pydantic import BaseModel
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request body."""
+
+
+def request_fingerprint(payload: BaseModel) -> str:
+    """Hash of the request body, used to reject a key reused for another request."""
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """TTL store of completed results plus the runs currently in flight, per key"""
+
+    def __init__(self, ttl_seconds: int = 86400, max_entries: int = 10000):
+        """
+        Initialize the store.
+
+        Args:
+            ttl_seconds: How long a completed result is replayed for
+            max_entries: Completed results kept; the oldest are dropped beyond this
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._results: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+    async def run(self, key: str, fingerprint: str, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run `func` once per key and share its result.
+
+        Returns:
+            `(result, replayed)`, where `replayed` is True if this call did not start the run
+
+        Raises:
+            IdempotencyConflict: If `key` was used with a different fingerprint
+        """
+        self._expire()
+
+        stored = self._results.get(key)
+        if stored is not None:
+            _, stored_fingerprint, result = stored
+            self._check(key, stored_fingerprint, fingerprint)
+            logger.info(f"Replaying stored result for idempotency key {key}")
+            return result, True
+
+        running = self._in_flight.get(key)
+        if running is not None:
+            running_fingerprint, task = running
+            self._check(key, running_fingerprint, fingerprint)
+            logger.info(f"Joining in-flight run for idempotency key {key}")
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(func())
+        self._in_flight[key] = (fingerprint, task)
+        task.add_done_callback(lambda done: self._finish(key, fingerprint, done))
+        # Shielded so a client disconnect doesn't cancel the run other callers are waiting on
+        return await asyncio.shield(task), False
+
+    def forget(self, key: str):
+        """Drop the stored result for `key` so the next request with it runs again."""
+        self._results.pop(key, None)
+
+    def _check(self, key: str, expected: str, fingerprint: str):
+        if expected != fingerprint:
+            raise IdempotencyConflict(f"Idempotency-Key {key} was already used for a different request")
+
+    def _finish(self, key: str, fingerprint: str, task: asyncio.Future):
+        self._in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._results[key] = (time.monotonic() + self.ttl_seconds, fingerprint, task.result())
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def _expire(self):
+        # Entries share one TTL, so insertion order is expiry order
+        now = time.monotonic()
+        while self._results:
+            expires_at, _, _ = next(iter(self._results.values()))
+            if expires_at > now:
+                break
+            self._results.popitem(last=False)
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    max_entries=settings.idempotency_max_entries
+)
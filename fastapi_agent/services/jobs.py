@@ -0,0 +1,126 @@
+"""
+Background jobs for agent workflows.
+
+Workflow endpoints answer 202 with a job id as soon as a run is accepted,
+instead of holding the caller's connection open for the whole LLM
+conversation. The run happens in a background task; callers either poll
+`GET /agent/jobs/{id}` or send a `callback_ref`, in which case the finished
+job is POSTed to Django's `/api/bgv/agent-jobs/callback/` with that reference.
+
+At most `agent_max_concurrent_jobs` runs execute at once; the others wait as
+"queued". Finished jobs are kept for `agent_job_ttl_seconds`. Jobs, like the
+limit, live in the process, so the service runs as a single uvicorn worker.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Set
+from uuid import uuid4
+
+from core.config import settings
+from models.schemas import JobResponse
+from services.django_client import django_client
+
+logger = logging.getLogger(__name__)
+
+
+class JobManager:
+    """In-process registry and runner for agent workflow jobs"""
+
+    def __init__(self, max_concurrent: int = 8, ttl_seconds: int = 86400, callback_attempts: int = 3):
+        """
+        Initialize the manager.
+
+        Args:
+            max_concurrent: Workflow runs allowed to execute at the same time
+            ttl_seconds: How long finished jobs can still be fetched
+            callback_attempts: Tries at reporting a finished job to Django
+        """
+        self.max_concurrent = max_concurrent
+        self.ttl_seconds = ttl_seconds
+        self.callback_attempts = callback_attempts
+        self._jobs: Dict[str, JobResponse] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Keep references so running tasks aren't garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, kind: str, payload, func: Callable, on_failure: Optional[Callable[[], None]] = None) -> JobResponse:
+        """
+        Accept a run of `func(payload)` and start it in the background.
+
+        Args:
+            kind: Workflow name, e.g. "send-credentials"
+            payload: Request body; must have bgv_request_id and callback_ref
+            func: Async workflow function, run as a background task
+            on_failure: Called if the run raises
+
+        Returns:
+            The queued job
+        """
+        self._expire()
+        job = JobResponse(
+            job_id=uuid4().hex,
+            kind=kind,
+            status="queued",
+            bgv_request_id=payload.bgv_request_id,
+            callback_ref=payload.callback_ref,
+            created_at=datetime.now(timezone.utc)
+        )
+        self._jobs[job.job_id] = job
+        self._spawn(self._run(job, func, payload, on_failure))
+        logger.info(f"Accepted {kind} job {job.job_id} for BGV #{job.bgv_request_id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[JobResponse]:
+        return self._jobs.get(job_id)
+
+    def report(self, job: JobResponse):
+        """Send a finished job's callback again (e.g. when Django redelivers the request)."""
+        if job.callback_ref and job.finished_at:
+            self._spawn(self._report(job))
+
+    def _spawn(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: JobResponse, func: Callable, payload, on_failure: Optional[Callable[[], None]]):
+        async with self._semaphore:
+            job.status = "running"
+            try:
+                job.result = await func(payload)
+                job.status = "succeeded"
+            except Exception as e:
+                logger.error(f"{job.kind} job {job.job_id} failed: {str(e)}")
+                job.error = str(e)
+                job.status = "failed"
+                if on_failure:
+                    on_failure()
+            job.finished_at = datetime.now(timezone.utc)
+        await self._report(job)
+
+    async def _report(self, job: JobResponse):
+        if not job.callback_ref:
+            return
+        for attempt in range(self.callback_attempts):
+            try:
+                await asyncio.to_thread(django_client.report_job, job.model_dump(mode="json"))
+                return
+            except Exception as e:
+                logger.warning(f"Callback for job {job.job_id} failed (attempt {attempt + 1}): {str(e)}")
+                if attempt + 1 < self.callback_attempts:
+                    await asyncio.sleep(2 ** attempt)
+        # Django redelivers the request once its callback timeout passes
+        logger.error(f"Giving up on callback for job {job.job_id}")
+
+    def _expire(self):
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager(
+    max_concurrent=settings.agent_max_concurrent_jobs,
+    ttl_seconds=settings.agent_job_ttl_seconds
+)
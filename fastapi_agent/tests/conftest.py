@@ -0,0 +1,16 @@
+"""
+Shared setup for the agent service tests.
+
+Settings are read from the environment when `core.config` is imported, so the
+benchmark stand-in values (benchmarks/fakes.py) are filled in first, with a
+throwaway checkpoint file. Run from fastapi_agent/:
+    python -m pytest
+"""
+import os
+import tempfile
+
+from benchmarks.fakes import BENCH_ENV
+
+for key, value in BENCH_ENV.items():
+    os.environ.setdefault(key, value)
+os.environ.setdefault('AGENT_CHECKPOINT_PATH', os.path.join(tempfile.mkdtemp(prefix='bgv-tests-'), 'checkpoints.sqlite3'))
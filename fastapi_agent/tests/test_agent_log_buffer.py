@@ -0,0 +1,104 @@
+import httpx
+import pytest
+
+from benchmarks.fakes import FakeDjangoAPI
+from services import agent_log_buffer as agent_log_buffer_module
+from services.agent_log_buffer import AgentLogBuffer
+from services.django_client import DjangoAPIError
+
+
+class FlakyDjangoAPI(FakeDjangoAPI):
+    """
+    Bulk endpoint that takes its outcome from `failures` (an exception to raise,
+    or None to succeed) while any are queued, and rejects entries with an invalid
+    message.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.failures = []
+        self.batches = []
+
+    def create_agent_logs_bulk(self, entries):
+        self.batches.append(len(entries))
+        failure = self.failures.pop(0) if self.failures else None
+        if failure:
+            raise failure
+        if any(entry['message'] == 'invalid' for entry in entries):
+            raise DjangoAPIError("400 Bad Request: message is invalid", 400)
+        return super().create_agent_logs_bulk(entries)
+
+
+@pytest.fixture
+def django_api(monkeypatch):
+    api = FlakyDjangoAPI()
+    monkeypatch.setattr(agent_log_buffer_module, 'django_client', api)
+    return api
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    buffer = AgentLogBuffer(batch_size=4, flush_interval=60, max_pending=10)
+    # Flushed by the tests, not the background thread
+    monkeypatch.setattr(buffer, 'start', lambda: None)
+    return buffer
+
+
+def fill(buffer, messages):
+    for message in messages:
+        buffer.add(1, 'analysis', message)
+
+
+def written(django_api):
+    return [log['message'] for log in django_api.logs]
+
+
+def test_flush_sends_batches(buffer, django_api):
+    fill(buffer, [f'log {n}' for n in range(10)])
+    assert buffer.flush() == 10
+    assert django_api.batches == [4, 4, 2]
+    assert written(django_api) == [f'log {n}' for n in range(10)]
+    assert buffer.flush() == 0
+
+
+def test_unreachable_django_keeps_entries_in_order(buffer, django_api):
+    fill(buffer, ['first', 'second'])
+    django_api.failures = [httpx.ConnectError("connection refused")]
+    assert buffer.flush() == 0
+    fill(buffer, ['third'])
+    assert buffer.flush() == 3
+    assert written(django_api) == ['first', 'second', 'third']
+
+
+def test_server_error_requeues_the_unsent_batches(buffer, django_api):
+    fill(buffer, [f'log {n}' for n in range(10)])
+    django_api.failures = [None, DjangoAPIError("503 Service Unavailable", 503)]
+    assert buffer.flush() == 4
+    assert buffer.flush() == 6
+    assert written(django_api) == [f'log {n}' for n in range(10)]
+
+
+def test_rejected_entries_are_split_out_and_dropped(buffer, django_api):
+    fill(buffer, ['log 0', 'invalid', 'log 2', 'log 3', 'log 4', 'invalid'])
+    assert buffer.flush() == 4
+    assert written(django_api) == ['log 0', 'log 2', 'log 3', 'log 4']
+    assert buffer.flush() == 0
+
+
+def test_server_error_while_splitting_keeps_the_rest(buffer, django_api):
+    fill(buffer, ['log 0', 'log 1', 'invalid', 'log 3'])
+    # Rejected, so split: the first half goes through, the second hits a 503 and waits for the next flush
+    django_api.failures = [
+        DjangoAPIError("400 Bad Request", 400), None, DjangoAPIError("503 Service Unavailable", 503)
+    ]
+    assert buffer.flush() == 2
+    assert buffer.flush() == 1
+    assert written(django_api) == ['log 0', 'log 1', 'log 3']
+
+
+def test_requeued_entries_are_capped(buffer, django_api):
+    fill(buffer, [f'log {n}' for n in range(12)])
+    django_api.failures = [httpx.ConnectError("connection refused")]
+    assert buffer.flush() == 0
+    assert buffer.flush() == 10
+    assert written(django_api)[0] == 'log 2'
@@ -0,0 +1,140 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from services.checkpoints import CheckpointStore, replayable
+
+PASSWORD = 'Tmp#pass-123'
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / 'checkpoints.sqlite3'))
+
+
+def stored_text(store):
+    with sqlite3.connect(store.path) as conn:
+        runs = conn.execute("SELECT messages FROM agent_runs").fetchall()
+        results = conn.execute("SELECT result FROM agent_tool_results").fetchall()
+    return ' '.join(row[0] for row in runs + results)
+
+
+def email_tool():
+    """A side-effect tool that counts its sends."""
+    sent = []
+
+    @replayable(lambda to_email, **_: to_email)
+    def send_email(to_email, body):
+        sent.append(body)
+        return {'success': 'fail' not in body, 'message_id': f'msg-{len(sent)}', 'body': body}
+
+    return send_email, sent
+
+
+def test_recorded_tool_result_is_replayed_on_retry(store):
+    send_email, sent = email_tool()
+
+    async def attempt(body):
+        async with store.run(1, 'onboarding'):
+            return send_email(to_email='asha@example.com', body=body)
+
+    first = asyncio.run(attempt('Welcome'))
+    # The model words the retried call differently; the call key still matches
+    again = asyncio.run(attempt('Welcome aboard'))
+    assert sent == ['Welcome']
+    assert again == {**first, 'replayed': True}
+
+    # Calls outside a run aren't replayed
+    send_email(to_email='asha@example.com', body='No run')
+    assert sent == ['Welcome', 'No run']
+
+
+def test_unsuccessful_results_are_not_recorded(store):
+    send_email, sent = email_tool()
+
+    async def attempt(body):
+        async with store.run(1, 'onboarding'):
+            return send_email(to_email='asha@example.com', body=body)
+
+    assert asyncio.run(attempt('fail'))['success'] is False
+    assert asyncio.run(attempt('Welcome'))['success'] is True
+    assert sent == ['fail', 'Welcome']
+
+
+def test_async_tools_are_replayed_with_io_off_the_event_loop(store, monkeypatch):
+    calls = []
+    io_threads = set()
+    tool_result = store.tool_result
+
+    def watched_tool_result(*args):
+        io_threads.add(threading.get_ident())
+        return tool_result(*args)
+
+    monkeypatch.setattr(store, 'tool_result', watched_tool_result)
+
+    @replayable(lambda status, **_: status)
+    async def update_status(status):
+        calls.append(status)
+        return {'success': True, 'status': status}
+
+    async def attempt():
+        async with store.run(1, 'reminder:1'):
+            return await update_status(status='reminder_sent'), threading.get_ident()
+
+    first, loop_thread = asyncio.run(attempt())
+    again, _ = asyncio.run(attempt())
+    assert calls == ['reminder_sent']
+    assert again == {**first, 'replayed': True}
+    assert io_threads and loop_thread not in io_threads
+
+
+def test_interrupted_run_resumes_from_its_last_step(store):
+    conversation = [
+        HumanMessage('Onboard BGV #1'),
+        AIMessage('', tool_calls=[{'name': 'fetch_bgv_request', 'args': {'bgv_request_id': 1}, 'id': 'call-1'}]),
+        ToolMessage('{"first_name": "Asha"}', tool_call_id='call-1'),
+        # The process died before this turn's tool ran
+        AIMessage('', tool_calls=[{'name': 'send_email', 'args': {'to_email': 'a@example.com'}, 'id': 'call-2'}]),
+    ]
+
+    async def interrupted():
+        async with store.run(1, 'onboarding') as run:
+            await run.save(conversation)
+
+    async def resume():
+        async with store.run(1, 'onboarding') as run:
+            resumed = (run.status, run.completed, list(run.messages))
+            await run.complete(run.messages + [AIMessage('Done')])
+        async with store.run(1, 'onboarding') as run:
+            return resumed, (run.status, run.completed, run.messages[-1].content)
+
+    asyncio.run(interrupted())
+    resumed, finished = asyncio.run(resume())
+    assert resumed == ('running', False, conversation[:3])
+    assert finished == ('completed', True, 'Done')
+
+
+def test_secrets_are_stored_as_placeholders(store):
+    send_email, _ = email_tool()
+    secrets = {'temp_password': PASSWORD}
+
+    async def attempt(secrets):
+        async with store.run(1, 'onboarding', secrets) as run:
+            result = send_email(to_email='asha@example.com', body=f'Your password is {PASSWORD}')
+            await run.save([HumanMessage(f'Send the password "{PASSWORD}"')])
+            return result
+
+    asyncio.run(attempt(secrets))
+    text = stored_text(store)
+    assert PASSWORD not in text
+    assert '{{temp_password}}' in text
+
+    async def reload(secrets):
+        async with store.run(1, 'onboarding', secrets) as run:
+            return run.messages[0].content, send_email(to_email='asha@example.com', body='retry')['body']
+
+    # The retried request carries the password, which is filled back in
+    assert asyncio.run(reload(secrets)) == (f'Send the password "{PASSWORD}"', f'Your password is {PASSWORD}')
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from agent import composer as composer_module
+from agent.composer import DraftRejected, EmailDraft, compose, compose_onboarding
+from benchmarks.fakes import FakeDjangoAPI
+from core import rate_limiter as rate_limiter_module
+from core.config import settings
+from models.schemas import SendCredentialsRequest
+from services.checkpoints import CheckpointStore
+
+MODEL = 'composer-test-model'
+BODY = '<p>Hello Asha,</p><p>Please log in and upload your PAN and Aadhaar cards.</p>'
+
+
+class ScriptedComposer:
+    """Structured-output stand-in returning the queued drafts (EmailDraft, dict or None) in turn."""
+
+    def __init__(self, *drafts):
+        self.drafts = list(drafts)
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return self.drafts.pop(0)
+
+
+class RecordingTool:
+    """Side-effect tool stand-in that records its inputs."""
+
+    def __init__(self, result):
+        self.result = result
+        self.inputs = []
+
+    async def ainvoke(self, tool_input):
+        self.inputs.append(tool_input)
+        return self.result
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters(monkeypatch):
+    monkeypatch.setattr(rate_limiter_module, '_rate_limiters', {})
+    monkeypatch.setattr(settings, 'composer_max_attempts', 3)
+
+
+@pytest.fixture
+def use_composer(monkeypatch):
+    def use(*drafts):
+        composer = ScriptedComposer(*drafts)
+        monkeypatch.setitem(composer_module._composers, MODEL, composer)
+        return composer
+    return use
+
+
+def test_draft_is_validated():
+    draft = EmailDraft(subject='  Your\n background   verification ', body_html=f'  {BODY}\n')
+    assert (draft.subject, draft.body_html) == ('Your background verification', BODY)
+
+    for fields in [
+        {'subject': 'Hi', 'body_html': BODY},
+        {'subject': 'Documents', 'body_html': 'Hello Asha, please log in and upload your PAN and Aadhaar cards.'},
+        {'subject': 'Documents', 'body_html': '<p>Short</p>'},
+    ]:
+        with pytest.raises(ValidationError):
+            EmailDraft(**fields)
+
+
+def test_invalid_drafts_are_retried(use_composer):
+    composer = use_composer(
+        None,
+        {'subject': 'Documents', 'body_html': 'not html ' * 10},
+        {'subject': 'Documents', 'body_html': BODY},
+    )
+
+    draft, model_calls = asyncio.run(compose('prompt', MODEL))
+    assert (draft, model_calls, composer.calls) == (EmailDraft(subject='Documents', body_html=BODY), 3, 3)
+    # Every attempt is a model call against the model's budget
+    limiter = rate_limiter_module.get_rate_limiter(MODEL)
+    assert limiter.get_available_tokens() == limiter.max_requests - 3
+
+
+def test_gives_up_after_max_attempts(use_composer):
+    rejected = EmailDraft(subject='Documents', body_html=BODY)
+    composer = use_composer(rejected, rejected, rejected, rejected)
+
+    def check(draft):
+        raise DraftRejected('the temporary password is missing from the email')
+
+    with pytest.raises(ValueError, match='No acceptable email draft: the temporary password is missing'):
+        asyncio.run(compose('prompt', MODEL, check))
+    assert composer.calls == settings.composer_max_attempts
+
+
+def test_onboarding_email_must_carry_the_password(use_composer, monkeypatch, tmp_path):
+    payload = SendCredentialsRequest(
+        bgv_request_id=7, candidate_email='asha@example.com', candidate_name='Asha Rao', temp_password='Tmp#pass-123'
+    )
+    composer = use_composer(
+        EmailDraft(subject='Welcome', body_html=BODY),
+        EmailDraft(subject='Welcome', body_html=f'{BODY}<p>Your temporary password is <b>Tmp#pass-123</b>.</p>'),
+    )
+    send_email = RecordingTool({'success': True, 'message_id': 'msg-1'})
+    transition = RecordingTool({'success': True})
+    monkeypatch.setattr(composer_module, 'django_client', FakeDjangoAPI())
+    monkeypatch.setattr(composer_module, 'checkpoint_store', CheckpointStore(str(tmp_path / 'checkpoints.sqlite3')))
+    monkeypatch.setattr(composer_module, 'send_email_to_candidate', send_email)
+    monkeypatch.setattr(composer_module, 'transition_bgv_status', transition)
+
+    result = asyncio.run(compose_onboarding(payload, MODEL))
+    assert (result['subject'], result['timing']['model_turns'], composer.calls) == ('Welcome', 2, 2)
+    assert len(send_email.inputs) == 1
+    assert 'Tmp#pass-123' in send_email.inputs[0]['body_html']
+    assert transition.inputs[0]['status'] == 'documents_requested'
+    assert transition.inputs[0]['metadata'] == {'email_message_id': 'msg-1', 'composer': 'structured'}
@@ -0,0 +1,120 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services import idempotency as idempotency_module
+from services.idempotency import IdempotencyConflict, IdempotencyStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the store's clock; the event loop keeps the real one
+    monkeypatch.setattr(idempotency_module, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def counting_run(result='job-1', delay=0):
+    """Workflow stand-in that counts its runs."""
+    calls = []
+
+    async def run():
+        calls.append(result)
+        await asyncio.sleep(delay)
+        return result
+
+    return run, calls
+
+
+def test_completed_key_is_replayed(clock):
+    store = IdempotencyStore(ttl_seconds=60)
+    run, calls = counting_run()
+
+    async def scenario():
+        return await store.run('key', 'body', run), await store.run('key', 'body', run)
+
+    assert asyncio.run(scenario()) == (('job-1', False), ('job-1', True))
+    assert calls == ['job-1']
+
+
+def test_result_expires_after_ttl(clock):
+    store = IdempotencyStore(ttl_seconds=60)
+    run, calls = counting_run()
+
+    async def scenario():
+        await store.run('key', 'body', run)
+        clock.now += 59
+        replayed = await store.run('key', 'body', run)
+        clock.now += 2
+        return replayed, await store.run('key', 'body', run)
+
+    assert asyncio.run(scenario()) == (('job-1', True), ('job-1', False))
+    assert calls == ['job-1', 'job-1']
+
+
+def test_oldest_results_are_dropped_beyond_max_entries(clock):
+    store = IdempotencyStore(ttl_seconds=60, max_entries=2)
+
+    async def scenario():
+        for key in ['a', 'b', 'c']:
+            await store.run(key, 'body', counting_run(key)[0])
+
+    asyncio.run(scenario())
+    assert list(store._results) == ['b', 'c']
+
+
+def test_concurrent_requests_share_the_in_flight_run(clock):
+    store = IdempotencyStore()
+    run, calls = counting_run(delay=0.01)
+
+    async def scenario():
+        return await asyncio.gather(*(store.run('key', 'body', run) for _ in range(3)))
+
+    assert asyncio.run(scenario()) == [('job-1', False), ('job-1', True), ('job-1', True)]
+    assert calls == ['job-1']
+    assert store._in_flight == {}
+
+
+def test_key_reused_for_another_body_conflicts(clock):
+    store = IdempotencyStore()
+    run, calls = counting_run(delay=0.01)
+
+    async def scenario():
+        first = asyncio.ensure_future(store.run('key', 'body', run))
+        await asyncio.sleep(0)
+        # Rejected while the first run is in flight and once it has completed
+        with pytest.raises(IdempotencyConflict):
+            await store.run('key', 'other body', run)
+        await first
+        with pytest.raises(IdempotencyConflict):
+            await store.run('key', 'other body', run)
+
+    asyncio.run(scenario())
+    assert calls == ['job-1']
+
+
+def test_failed_and_forgotten_runs_run_again(clock):
+    store = IdempotencyStore()
+    run, calls = counting_run()
+
+    async def fail():
+        raise RuntimeError('model unavailable')
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.run('key', 'body', fail)
+        await store.run('key', 'body', run)
+        store.forget('key')
+        return await store.run('key', 'body', run)
+
+    assert asyncio.run(scenario()) == ('job-1', False)
+    assert calls == ['job-1', 'job-1']
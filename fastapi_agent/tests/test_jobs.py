@@ -0,0 +1,150 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fakes import FakeDjangoAPI
+from services import jobs as jobs_module
+from services.django_client import DjangoAPIError
+from services.jobs import JobManager
+
+
+class CallbackDjangoAPI(FakeDjangoAPI):
+    """Job callback endpoint that raises the queued `failures` before accepting reports."""
+
+    def __init__(self):
+        super().__init__()
+        self.failures = []
+        self.attempts = 0
+        self.reports = []
+
+    def report_job(self, job):
+        self.attempts += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        self.reports.append(job)
+        return {'detail': 'Callback applied'}
+
+
+@pytest.fixture
+def django_api(monkeypatch):
+    api = CallbackDjangoAPI()
+    monkeypatch.setattr(jobs_module, 'django_client', api)
+    return api
+
+
+@pytest.fixture
+def backoffs(monkeypatch):
+    """Callback retry delays, recorded instead of slept."""
+    delays = []
+
+    async def sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(jobs_module.asyncio, 'sleep', sleep)
+    return delays
+
+
+def payload(bgv_request_id=1, callback_ref='outbox:1'):
+    return SimpleNamespace(bgv_request_id=bgv_request_id, callback_ref=callback_ref)
+
+
+async def settle(manager):
+    while manager._tasks:
+        await asyncio.gather(*manager._tasks)
+
+
+def test_runs_beyond_max_concurrent_queue(django_api):
+    manager = JobManager(max_concurrent=2)
+    running = []
+    peak = []
+    release = asyncio.Event()
+
+    async def workflow(payload):
+        running.append(payload.bgv_request_id)
+        peak.append(len(running))
+        await release.wait()
+        running.remove(payload.bgv_request_id)
+        return {'sent': True}
+
+    async def scenario():
+        jobs = [manager.submit('send-reminder', payload(n), workflow) for n in range(5)]
+        await asyncio.sleep(0.01)
+        states = [job.status for job in jobs]
+        release.set()
+        await settle(manager)
+        return states, jobs
+
+    states, jobs = asyncio.run(scenario())
+    assert states == ['running', 'running', 'queued', 'queued', 'queued']
+    assert max(peak) == 2
+    assert [job.status for job in jobs] == ['succeeded'] * 5
+    assert len(django_api.reports) == 5
+
+
+def test_failed_run_is_reported_and_calls_on_failure(django_api):
+    manager = JobManager()
+    failed = []
+
+    async def workflow(payload):
+        raise RuntimeError('model unavailable')
+
+    async def scenario():
+        job = manager.submit('send-credentials', payload(), workflow, on_failure=lambda: failed.append(True))
+        await settle(manager)
+        return job
+
+    job = asyncio.run(scenario())
+    assert (job.status, job.error, failed) == ('failed', 'model unavailable', [True])
+    assert django_api.reports[0]['status'] == 'failed'
+    assert manager.get(job.job_id) is job
+
+
+def test_callback_is_retried_with_backoff(django_api, backoffs):
+    manager = JobManager(callback_attempts=3)
+    django_api.failures = [DjangoAPIError('409 Conflict: not waiting on a job yet', 409), ConnectionError('down')]
+
+    async def workflow(payload):
+        return {'sent': True}
+
+    async def scenario():
+        job = manager.submit('send-credentials', payload(), workflow)
+        await settle(manager)
+        return job
+
+    job = asyncio.run(scenario())
+    assert django_api.attempts == 3
+    assert backoffs == [1, 2]
+    assert django_api.reports == [job.model_dump(mode='json')]
+
+
+def test_callback_gives_up_after_the_last_attempt(django_api, backoffs):
+    manager = JobManager(callback_attempts=2)
+    django_api.failures = [ConnectionError('down')] * 3
+
+    async def workflow(payload):
+        return {'sent': True}
+
+    async def scenario():
+        job = manager.submit('send-credentials', payload(), workflow)
+        await settle(manager)
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == 'succeeded'
+    assert (django_api.attempts, backoffs, django_api.reports) == (2, [1], [])
+
+
+def test_job_without_callback_ref_is_not_reported(django_api):
+    manager = JobManager()
+
+    async def workflow(payload):
+        return {'sent': True}
+
+    async def scenario():
+        job = manager.submit('send-reminder', payload(callback_ref=None), workflow)
+        await settle(manager)
+        return job
+
+    assert asyncio.run(scenario()).status == 'succeeded'
+    assert django_api.attempts == 0
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from langchain.agents import create_agent
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+
+from agent.agent import invoke_agent_with_rate_limit
+from benchmarks.fakes import ScriptedChatModel
+
+ONBOARDING_PROMPT = 'Onboard the candidate.\nBGV Request ID: 7\nEmail: asha@example.com'
+
+
+class Tracker:
+    """Counts the tool calls running at the same time."""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.calls = []
+
+    async def call(self, name):
+        self.calls.append(name)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.02)
+        self.running -= 1
+        return {'success': True}
+
+
+def onboarding_tools(tracker):
+    @tool
+    async def fetch_bgv_request(bgv_request_id: int) -> dict:
+        """Fetch the BGV request."""
+        return await tracker.call('fetch_bgv_request')
+
+    @tool
+    async def analyze_candidate_profile(bgv_request_id: int) -> dict:
+        """Analyse the candidate profile."""
+        return await tracker.call('analyze_candidate_profile')
+
+    @tool
+    async def send_email_to_candidate(to_email: str, subject: str, body_html: str) -> dict:
+        """Send an email to the candidate."""
+        return await tracker.call('send_email_to_candidate')
+
+    @tool
+    async def transition_bgv_status(bgv_request_id: int, status: str, action: str, message: str) -> dict:
+        """Change the request status and log it."""
+        return await tracker.call('transition_bgv_status')
+
+    return [fetch_bgv_request, analyze_candidate_profile, send_email_to_candidate, transition_bgv_status]
+
+
+@pytest.mark.parametrize('parallel_tools, peak, model_turns', [(True, 2, 4), (False, 1, 5)])
+def test_tool_calls_in_one_turn_run_concurrently(parallel_tools, peak, model_turns):
+    tracker = Tracker()
+    agent = create_agent(model=ScriptedChatModel(parallel_tools=parallel_tools), tools=onboarding_tools(tracker))
+
+    result = asyncio.run(invoke_agent_with_rate_limit(agent, [HumanMessage(ONBOARDING_PROMPT)]))
+    assert tracker.calls[2:] == ['send_email_to_candidate', 'transition_bgv_status']
+    assert tracker.peak == peak
+    assert result['timing']['max_parallel_tool_calls'] == peak
+    assert (result['timing']['model_turns'], result['timing']['tool_calls']) == (model_turns, 4)
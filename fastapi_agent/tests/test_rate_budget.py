@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from langchain.agents import create_agent
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+
+from agent.agent import ModelRateLimit, invoke_agent_with_rate_limit, model_for_workflow
+from benchmarks.fakes import ScriptedChatModel
+from core import rate_limiter as rate_limiter_module
+from core.config import settings
+from core.rate_limiter import RateLimiter, get_rate_limiter
+
+REMINDER_PROMPT = 'Send a document reminder.\nBGV Request ID: 7\nEmail: asha@example.com'
+
+
+@tool
+def send_email_to_candidate(to_email: str, subject: str, body_html: str) -> dict:
+    """Send an email to the candidate."""
+    return {'success': True, 'to_email': to_email}
+
+
+@tool
+def log_agent_action(bgv_request_id: int, action: str, message: str) -> dict:
+    """Log an agent action."""
+    return {'success': True, 'action': action}
+
+
+@pytest.fixture
+def budgets(monkeypatch):
+    """Fresh limiters, with budgets for the two routed models."""
+    monkeypatch.setattr(rate_limiter_module, '_rate_limiters', {})
+    monkeypatch.setattr(settings, 'model_rate_limits', {settings.gemini_model: 4, settings.gemini_fast_model: 10})
+    return settings.model_rate_limits
+
+
+def scripted_agent(model_name):
+    model = ScriptedChatModel()
+    agent = create_agent(
+        model=model,
+        tools=[send_email_to_candidate, log_agent_action],
+        middleware=[ModelRateLimit(model_name)],
+    )
+    return agent, model
+
+
+def test_each_model_has_its_own_budget(budgets, monkeypatch):
+    monkeypatch.setattr(settings, 'default_model_rpm', 3)
+    fast, main = get_rate_limiter(settings.gemini_fast_model), get_rate_limiter()
+    assert fast is get_rate_limiter(model_for_workflow('reminder'))
+    assert main is get_rate_limiter(model_for_workflow('onboarding'))
+    assert (fast.max_requests, main.max_requests, get_rate_limiter('unlisted').max_requests) == (10, 4, 3)
+
+    for _ in range(4):
+        assert fast.acquire(wait=False)
+    # Reminders spent the fast model's budget only
+    assert (fast.get_available_tokens(), main.get_available_tokens()) == (6, 4)
+
+
+def test_agent_run_spends_one_token_per_model_call(budgets):
+    agent, model = scripted_agent(settings.gemini_fast_model)
+    limiter = get_rate_limiter(settings.gemini_fast_model)
+
+    result = asyncio.run(invoke_agent_with_rate_limit(agent, [HumanMessage(REMINDER_PROMPT)]))
+    # Two tool-calling turns and the closing answer
+    assert model.calls == result['timing']['model_turns'] == 3
+    assert limiter.get_available_tokens() == 10 - 3
+    assert get_rate_limiter().get_available_tokens() == 4
+
+
+def test_exhausted_budget_stops_the_model_call(budgets, monkeypatch):
+    limiter = RateLimiter(max_requests=1)
+    # Fail instead of waiting for the refill
+    monkeypatch.setattr(limiter, 'acquire', lambda wait=True: RateLimiter.acquire(limiter, wait=False))
+    rate_limiter_module._rate_limiters[settings.gemini_fast_model] = limiter
+    agent, model = scripted_agent(settings.gemini_fast_model)
+
+    with pytest.raises(Exception, match='Rate limiter failed'):
+        asyncio.run(invoke_agent_with_rate_limit(agent, [HumanMessage(REMINDER_PROMPT)], max_retries=0))
+    assert model.calls == 1